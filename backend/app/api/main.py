@@ -2,11 +2,13 @@
 Main FastAPI application for Job Matching Platform
 """
 import logging
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from app.config import settings
-from app.database import connect_to_mongo, close_mongo_connection
+from app.database import DatabaseTimeout, connect_to_mongo, close_mongo_connection
 from app.routes_auth import router as auth_router
 from app.routes_profile import router as profile_router
 from app.routes_jobs import router as jobs_router
@@ -14,6 +16,11 @@ from app.routes_analytics import router as analytics_router
 from app.routes_jobs_public import router as jobs_public_router
 from app.routes_quick_signup import router as quick_signup_router
 from app.routes_constants import router as constants_router
+from app.jobs_snapshot import jobs_snapshot
+from app.jobs_sync import jobs_sync
+from app.supabase_db import pool_stats
+from app.instrumentation import finish_request, route_metrics, start_request
+from app.resilience import db_breaker
 
 # Configure logging
 logging.basicConfig(
@@ -34,12 +41,17 @@ async def lifespan(app: FastAPI):
     # Initialize Supabase Client
     await connect_to_mongo()
     
+    # Keep in-memory job indexes in sync with the jobs table (or, with a shared
+    # jobs snapshot, with the file the syncing worker writes)
+    sync_task = asyncio.create_task(jobs_sync.run_forever())
+    
     logger.info("Application startup complete")
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    sync_task.cancel()
     await close_mongo_connection()
     logger.info("Application shutdown complete")
 
@@ -61,6 +73,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def query_instrumentation(request: Request, call_next):
+    """Attach per-request database totals as Server-Timing and feed the per-route histograms"""
+    stats = start_request()
+    start = time.perf_counter()
+    response = await call_next(request)
+    total_ms = (time.perf_counter() - start) * 1000
+    response.headers["Server-Timing"] = stats.server_timing(total_ms)
+    route = request.scope.get("route")
+    finish_request(getattr(route, "path", request.url.path), stats)
+    return response
+
+
+@app.exception_handler(DatabaseTimeout)
+async def database_timeout_handler(request: Request, exc: DatabaseTimeout):
+    """A hung database call surfaces as a bounded-time 504 instead of a stuck request"""
+    logger.error(f"{request.method} {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "Database request timed out"}
+    )
+
+
 # Include routers
 app.include_router(constants_router)  # Constants (public)
 app.include_router(jobs_public_router)  # Public endpoints first (no auth)
@@ -83,8 +118,19 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+    """Health check endpoint, with Supabase connection pool, circuit breaker and jobs snapshot state"""
+    return {
+        "status": "healthy",
+        "db_pool": pool_stats(),
+        "db_breaker": db_breaker.stats(),
+        "jobs_snapshot": jobs_snapshot.stats(),
+    }
+
+
+@app.get("/metrics/queries")
+async def query_metrics():
+    """Per-route database round trip and latency histograms"""
+    return route_metrics.snapshot()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,262 @@
+"""
+Prefix autocomplete for roles, companies, locations and skills
+
+One prefix trie per kind, seeded from app/constants.py and weighted by how
+many active jobs carry each value. JobsSync keeps the weights current, so
+companies and roles the scraper finds are offered as soon as their rows
+sync. Every word start of a value is indexed ("eng" finds "Backend
+Engineer"). Each trie node caches its best suggestions, and an update only
+clears the caches on its own paths, so repeated prefixes are served
+straight from a node.
+"""
+import heapq
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from app.constants import COMMON_SKILLS, ENGINEERING_ROLES, LOCATIONS
+from app.jobs_sync import jobs_sync
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("role", "company", "location", "skill")
+
+AUTOCOMPLETE_COLUMNS = ("id", "role", "company", "location", "skills_required", "extracted_skills", "is_active")
+
+# Suggestions cached per trie node; the most any request can ask for
+MAX_SUGGESTIONS = 20
+
+# Nodes stop branching at this depth; longer prefixes filter the deepest node's values
+MAX_DEPTH = 16
+
+# Longer corpus values are scraping noise, not suggestions
+MAX_VALUE_LENGTH = 80
+
+
+def normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def _word_starts(key: str) -> List[str]:
+    """Suffixes of `key` starting at each word, truncated to MAX_DEPTH"""
+    starts = [0] + [i + 1 for i, ch in enumerate(key) if ch == " "]
+    return [key[i:i + MAX_DEPTH] for i in starts]
+
+
+class _Entry:
+    __slots__ = ("key", "value", "seeded", "count")
+
+    def __init__(self, key: str, value: str):
+        self.key = key
+        self.value = value
+        self.seeded = False
+        self.count = 0
+
+    @property
+    def weight(self) -> int:
+        # Seeded values rank above unseen ones; beyond that, job count decides
+        return self.count + (1 if self.seeded else 0)
+
+
+def _rank_key(entry: _Entry):
+    # Heaviest first, alphabetical on ties (for heapq.nsmallest)
+    return -entry.weight, entry.value
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: Optional[set] = None  # values whose indexed path ends here
+        self.top: Optional[List[_Entry]] = None
+
+
+class PrefixTrie:
+    """Word-start prefix trie with per-node cached top suggestions"""
+
+    def __init__(self):
+        self.root = _Node()
+
+    def _path(self, text: str, create: bool = False) -> List[_Node]:
+        nodes = [self.root]
+        for ch in text:
+            child = nodes[-1].children.get(ch)
+            if child is None:
+                if not create:
+                    return []
+                child = nodes[-1].children[ch] = _Node()
+            nodes.append(child)
+        return nodes
+
+    def add(self, entry: _Entry):
+        for suffix in _word_starts(entry.key):
+            path = self._path(suffix, create=True)
+            if path[-1].entries is None:
+                path[-1].entries = set()
+            path[-1].entries.add(entry)
+            for node in path:
+                node.top = None
+
+    def discard(self, entry: _Entry):
+        for suffix in _word_starts(entry.key):
+            path = self._path(suffix)
+            if path and path[-1].entries:
+                path[-1].entries.discard(entry)
+            for node in path:
+                node.top = None
+
+    def touch(self, entry: _Entry):
+        """Drop cached suggestions that may rank `entry` by its old weight"""
+        for suffix in _word_starts(entry.key):
+            for node in self._path(suffix):
+                node.top = None
+
+    @staticmethod
+    def _subtree(node: _Node) -> set:
+        found = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.entries:
+                found.update(current.entries)
+            stack.extend(current.children.values())
+        return found
+
+    def top(self, prefix: str, limit: int) -> List[_Entry]:
+        path = self._path(prefix[:MAX_DEPTH])
+        if not path:
+            return []
+        node = path[-1]
+        if len(prefix) > MAX_DEPTH:
+            needle = " " + prefix
+            matches = [e for e in self._subtree(node) if needle in " " + e.key]
+            return heapq.nsmallest(limit, matches, key=_rank_key)
+        if node.top is None:
+            node.top = heapq.nsmallest(MAX_SUGGESTIONS, self._subtree(node), key=_rank_key)
+        return node.top[:limit]
+
+
+class Autocomplete:
+    """Per-kind prefix tries over the constants and the jobs corpus, refreshed from JobsSync"""
+
+    def __init__(self, seeds: Dict[str, Iterable[str]]):
+        self._seeds = {kind: list(values) for kind, values in seeds.items()}
+        self._lock = threading.Lock()
+        self._build([])
+
+    def _terms(self, row: dict) -> tuple:
+        """(kind, value) pairs a job contributes, one per distinct value"""
+        terms = {}
+        for kind in ("role", "company", "location"):
+            value = row.get(kind)
+            if isinstance(value, str) and value.strip() and len(value) <= MAX_VALUE_LENGTH:
+                terms[(kind, normalize(value))] = value.strip()
+        for skill in (row.get("skills_required") or []) + (row.get("extracted_skills") or []):
+            if isinstance(skill, str) and skill.strip() and len(skill) <= MAX_VALUE_LENGTH:
+                terms.setdefault(("skill", normalize(skill)), skill.strip())
+        return tuple((kind, key, value) for (kind, key), value in terms.items())
+
+    def _build(self, rows: List[dict]):
+        tries = {kind: PrefixTrie() for kind in KINDS}
+        entries = {kind: {} for kind in KINDS}
+        for kind, values in self._seeds.items():
+            for value in values:
+                key = normalize(value)
+                if key and key not in entries[kind]:
+                    entry = entries[kind][key] = _Entry(key, value)
+                    entry.seeded = True
+        job_terms = {}
+        for row in rows:
+            if row.get("is_active") is False:
+                continue
+            terms = self._terms(row)
+            job_terms[str(row["id"])] = terms
+            for kind, key, value in terms:
+                entry = entries[kind].get(key)
+                if entry is None:
+                    entry = entries[kind][key] = _Entry(key, value)
+                entry.count += 1
+        for kind in KINDS:
+            for entry in entries[kind].values():
+                tries[kind].add(entry)
+        with self._lock:
+            self._tries = tries
+            self._entries = entries
+            self._job_terms = job_terms
+
+    def _adjust(self, kind: str, key: str, value: str, delta: int):
+        entries = self._entries[kind]
+        entry = entries.get(key)
+        if entry is None:
+            if delta <= 0:
+                return
+            entry = entries[key] = _Entry(key, value)
+            entry.count = delta
+            self._tries[kind].add(entry)
+            return
+        entry.count += delta
+        if entry.weight <= 0:
+            del entries[key]
+            self._tries[kind].discard(entry)
+        else:
+            self._tries[kind].touch(entry)
+
+    def _discard(self, job_id: str):
+        for kind, key, value in self._job_terms.pop(job_id, ()):
+            self._adjust(kind, key, value, -1)
+
+    def reset(self, rows: List[dict]):
+        """Rebuild every trie from the constants and a full load"""
+        self._build(rows)
+        logger.info(
+            "Autocomplete rebuilt: "
+            + ", ".join(f"{len(self._entries[kind])} {kind}s" for kind in KINDS)
+        )
+
+    def upsert(self, rows: List[dict]):
+        """Apply inserted or updated rows; only the values they touch change"""
+        with self._lock:
+            for row in rows:
+                job_id = str(row["id"])
+                self._discard(job_id)
+                if row.get("is_active") is False:
+                    continue
+                terms = self._terms(row)
+                self._job_terms[job_id] = terms
+                for kind, key, value in terms:
+                    self._adjust(kind, key, value, 1)
+
+    def remove(self, job_ids: Iterable[str]):
+        with self._lock:
+            for job_id in job_ids:
+                self._discard(str(job_id))
+
+    def suggest(self, prefix: str, kind: Optional[str] = None, limit: int = 8) -> List[dict]:
+        """
+        Best suggestions for `prefix` by job count, across all kinds unless `kind` is given.
+
+        Returns:
+            [{"value", "kind", "jobs"}, ...]
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        kinds = (kind,) if kind else KINDS
+        with self._lock:
+            found = [
+                (entry, k)
+                for k in kinds
+                for entry in self._tries[k].top(prefix, limit)
+            ]
+            best = heapq.nsmallest(limit, found, key=lambda item: _rank_key(item[0]))
+            return [{"value": entry.value, "kind": k, "jobs": entry.count} for entry, k in best]
+
+
+autocomplete = Autocomplete({
+    "role": ENGINEERING_ROLES,
+    "location": LOCATIONS,
+    "skill": COMMON_SKILLS,
+})
+jobs_sync.subscribe(autocomplete, AUTOCOMPLETE_COLUMNS)
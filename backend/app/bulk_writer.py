@@ -0,0 +1,144 @@
+"""
+Chunked, retrying bulk upserts for the scraper write path
+
+A scrape batch is written in chunks of BULK_WRITE_CHUNK_SIZE rows with
+`returning=minimal`, so PostgREST doesn't echo every row back:
+- transient failures (timeouts, connection errors, 5xx) are retried with
+  jittered exponential backoff;
+- a chunk the database rejects (bad value, constraint) is bisected until
+  the offending rows are isolated, and the rest of the chunk is written.
+
+Each call returns a BulkWriteResult with per-chunk accounting and the
+rows that could not be written.
+
+Usage:
+    result = BulkWriter(client, "jobs", on_conflict="job_id").upsert(rows)
+"""
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from postgrest import APIError
+from postgrest.types import ReturnMethod
+
+from app.config import settings
+from app.resilience import is_backend_failure
+
+logger = logging.getLogger(__name__)
+
+
+def is_transient(exc: Exception) -> bool:
+    """Errors worth retrying as-is; anything else is a problem with the rows"""
+    if is_backend_failure(exc):
+        return True
+    # Gateway/proxy errors reach postgrest-py without a Postgres error code
+    return isinstance(exc, APIError) and not exc.code
+
+
+@dataclass
+class BulkWriteResult:
+    written: int = 0
+    chunks: int = 0
+    chunks_ok: int = 0
+    retries: int = 0
+    failed_rows: List[dict] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.failed_rows)
+
+    def summary(self) -> str:
+        return (
+            f"{self.written} written, {self.failed} failed, "
+            f"{self.chunks_ok}/{self.chunks} chunks clean, {self.retries} retries"
+        )
+
+
+class BulkWriter:
+    """Upsert a list of rows into one table in retrying, self-isolating chunks"""
+
+    def __init__(
+        self,
+        client,
+        table: str,
+        on_conflict: str = "",
+        chunk_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.client = client
+        self.table = table
+        self.on_conflict = on_conflict
+        self.chunk_size = chunk_size or settings.BULK_WRITE_CHUNK_SIZE
+        self.max_retries = settings.BULK_WRITE_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_seconds = settings.BULK_WRITE_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        self.sleep = sleep
+
+    def _dedupe(self, rows: List[dict]) -> List[dict]:
+        """
+        Keep the last row per conflict key: Postgres rejects an upsert that
+        touches the same row twice. Rows with a NULL in the key never
+        conflict (NULLs are distinct in unique constraints) and are all kept.
+        """
+        keys = [c.strip() for c in self.on_conflict.split(",") if c.strip()]
+        if not keys:
+            return rows
+        latest = {}
+        for row in rows:
+            key = tuple(row.get(k) for k in keys)
+            latest[object() if None in key else key] = row
+        return list(latest.values())
+
+    def _send(self, rows: List[dict], result: BulkWriteResult):
+        """One upsert request, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.client.table(self.table).upsert(
+                    rows, on_conflict=self.on_conflict, returning=ReturnMethod.minimal
+                ).execute()
+                return
+            except Exception as e:
+                if not is_transient(e) or attempt == self.max_retries:
+                    raise
+                result.retries += 1
+                delay = self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning(f"Bulk upsert into {self.table} failed ({e}); retrying in {delay:.2f}s")
+                self.sleep(delay)
+
+    def _write(self, rows: List[dict], result: BulkWriteResult) -> bool:
+        """Write rows, bisecting on rejection. Returns True if no row failed."""
+        try:
+            self._send(rows, result)
+            result.written += len(rows)
+            return True
+        except Exception as e:
+            if is_transient(e):
+                # Still failing after retries: splitting won't help
+                result.failed_rows.extend(rows)
+                result.errors.append(f"{len(rows)} rows: {e}")
+                return False
+            if len(rows) == 1:
+                result.failed_rows.extend(rows)
+                result.errors.append(f"row rejected: {e}")
+                return False
+        middle = len(rows) // 2
+        left = self._write(rows[:middle], result)
+        right = self._write(rows[middle:], result)
+        return left and right
+
+    def upsert(self, rows: List[dict]) -> BulkWriteResult:
+        result = BulkWriteResult()
+        rows = self._dedupe(rows)
+        for start in range(0, len(rows), self.chunk_size):
+            result.chunks += 1
+            if self._write(rows[start:start + self.chunk_size], result):
+                result.chunks_ok += 1
+        if result.failed:
+            logger.error(f"Bulk upsert into {self.table}: {result.summary()}; first error: {result.errors[0]}")
+        else:
+            logger.info(f"Bulk upsert into {self.table}: {result.summary()}")
+        return result
@@ -0,0 +1,235 @@
+"""
+Column encodings for the jobs snapshot and their memory-mapped file format
+
+A snapshot file is a fixed layout that every worker can map read-only and
+index without parsing or copying it:
+
+    b"JOBSNAP1" | header length (u64) | JSON header | sections...
+
+The header holds free-form metadata plus, per column, its kind and the
+offsets of its sections (8-byte aligned, native byte order):
+- "u32":  one uint32 per row
+- "text": uint32 offsets (rows + 1) into a UTF-8 blob
+- "json": like text, each cell JSON-encoded (None, numbers, lists)
+- "dict": uint32 codes per row into a "json" column of distinct values
+
+Mapped columns decode a cell only when it is read, so a worker's memory
+holds the pages it touches, shared with every other worker through the
+page cache. `splice` derives a new column from an old one by copying the
+encoded bytes or codes of unchanged ranges, so applying a delta doesn't
+decode the rows it leaves alone.
+"""
+import json
+import mmap
+import os
+import struct
+from array import array
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+MAGIC = b"JOBSNAP1"
+
+
+class DictionaryColumn:
+    """Low-cardinality column stored as codes into a table of distinct values"""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: Sequence, codes: Sequence[int]):
+        self.values = values
+        self.codes = codes
+
+    @classmethod
+    def encode(cls, raw: Iterable) -> "DictionaryColumn":
+        table = {}
+        codes = array("I", (table.setdefault(value, len(table)) for value in raw))
+        return cls(tuple(table), codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, position: int):
+        return self.values[self.codes[position]]
+
+    def matching_codes(self, predicate) -> set:
+        return {code for code in range(len(self.values)) if predicate(self.values[code])}
+
+
+class _EncodedColumn:
+    """Variable-width cells in a mapped (or spliced) blob, decoded on access"""
+
+    __slots__ = ("offsets", "data", "as_json")
+
+    def __init__(self, offsets: Sequence[int], data: Union[bytes, memoryview], as_json: bool):
+        self.offsets = offsets
+        self.data = data
+        self.as_json = as_json
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position: int):
+        if position < 0:
+            position += len(self)
+        text = str(self.data[self.offsets[position]:self.offsets[position + 1]], "utf-8")
+        return json.loads(text) if self.as_json else text
+
+
+def _encode_cell(value, as_json: bool) -> bytes:
+    if as_json:
+        return json.dumps(value, separators=(",", ":"), default=str).encode()
+    return value.encode()
+
+
+def _encode_cells(values: Iterable, as_json: bool) -> Tuple[bytes, bytes]:
+    if isinstance(values, _EncodedColumn) and values.as_json == as_json:
+        return values.offsets.tobytes(), bytes(values.data)
+    offsets = array("I", [0])
+    blob = bytearray()
+    for value in values:
+        blob += _encode_cell(value, as_json)
+        offsets.append(len(blob))
+    return offsets.tobytes(), bytes(blob)
+
+
+def splice(column: Sequence, segments: List[Union[range, list]]) -> Sequence:
+    """
+    A new column in the representation of `column`, concatenating
+    `segments`: a range copies those positions of `column` (encoded bytes,
+    dictionary codes or cell references, never decoded), a list holds new
+    cell values.
+    """
+    if isinstance(column, DictionaryColumn):
+        values = list(column.values)
+        table = {value: code for code, value in enumerate(values)}
+        codes = array("I")
+        for segment in segments:
+            if isinstance(segment, range):
+                codes.frombytes(column.codes[segment.start:segment.stop].tobytes())
+                continue
+            for value in segment:
+                code = table.get(value)
+                if code is None:
+                    code = table[value] = len(values)
+                    values.append(value)
+                codes.append(code)
+        return DictionaryColumn(tuple(values), codes)
+
+    if isinstance(column, _EncodedColumn):
+        old_offsets = np.frombuffer(column.offsets, dtype=np.uint32).astype(np.int64)
+        offsets = [np.zeros(1, dtype=np.int64)]
+        data = bytearray()
+        for segment in segments:
+            if isinstance(segment, range):
+                start, end = old_offsets[segment.start], old_offsets[segment.stop]
+                offsets.append(old_offsets[segment.start + 1:segment.stop + 1] + (len(data) - start))
+                data += column.data[start:end]
+                continue
+            ends = []
+            for value in segment:
+                data += _encode_cell(value, column.as_json)
+                ends.append(len(data))
+            offsets.append(np.array(ends, dtype=np.int64))
+        return _EncodedColumn(np.concatenate(offsets).astype(np.uint32), bytes(data), column.as_json)
+
+    return tuple(chain.from_iterable(
+        column[segment.start:segment.stop] if isinstance(segment, range) else segment
+        for segment in segments
+    ))
+
+
+class _Writer:
+    def __init__(self):
+        self.body = bytearray()
+
+    def section(self, payload: bytes) -> int:
+        self.body += bytes(-len(self.body) % 8)
+        start = len(self.body)
+        self.body += payload
+        return start
+
+    def cells(self, values: Iterable, as_json: bool) -> dict:
+        offsets, blob = _encode_cells(values, as_json)
+        return {"offsets": self.section(offsets), "data": self.section(blob), "data_len": len(blob)}
+
+
+def write_columns(path: str, meta: dict, columns: Dict[str, Tuple[str, Any]]):
+    """
+    Write columns to `path` atomically: a temp file in the same directory,
+    fsynced, then renamed over the old one. Readers that mapped the old
+    file keep a valid view of it.
+
+    Args:
+        columns: name -> (kind, data); "dict" data is a DictionaryColumn
+    """
+    writer = _Writer()
+    sections = {}
+    for name, (kind, data) in columns.items():
+        if kind == "u32":
+            sections[name] = {"kind": kind, "count": len(data), "data": writer.section(array("I", data).tobytes())}
+        elif kind in ("text", "json"):
+            sections[name] = {"kind": kind, "count": len(data), **writer.cells(data, kind == "json")}
+        elif kind == "dict":
+            codes = writer.section(array("I", data.codes).tobytes())
+            sections[name] = {
+                "kind": kind, "count": len(data), "codes": codes,
+                "values": {"count": len(data.values), **writer.cells(data.values, True)},
+            }
+        else:
+            raise ValueError(f"Unknown column kind: {kind}")
+
+    header = json.dumps({"meta": meta, "columns": sections}, separators=(",", ":")).encode()
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(writer.body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def map_columns(path: str) -> Tuple[dict, Dict[str, Sequence], int]:
+    """
+    Map a file from write_columns read-only.
+
+    Returns:
+        (meta, name -> column sequence, mapped size in bytes)
+
+    Raises:
+        ValueError: If the file is not a snapshot file
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a jobs snapshot file")
+    (header_len,) = struct.unpack_from("<Q", view, len(MAGIC))
+    base = len(MAGIC) + 8 + header_len
+    header = json.loads(str(view[len(MAGIC) + 8:base], "utf-8"))
+
+    def u32(offset: int, count: int) -> memoryview:
+        return view[base + offset:base + offset + 4 * count].cast("I")
+
+    def cells(section: dict, as_json: bool) -> _EncodedColumn:
+        data = view[base + section["data"]:base + section["data"] + section["data_len"]]
+        return _EncodedColumn(u32(section["offsets"], section["count"] + 1), data, as_json)
+
+    columns = {}
+    for name, section in header["columns"].items():
+        kind = section["kind"]
+        if kind == "u32":
+            columns[name] = u32(section["data"], section["count"])
+        elif kind in ("text", "json"):
+            columns[name] = cells(section, kind == "json")
+        else:
+            values = cells(section["values"], True)
+            columns[name] = DictionaryColumn(
+                tuple(values[i] for i in range(len(values))), u32(section["codes"], section["count"])
+            )
+    return header["meta"], columns, len(mapped)
+
@@ -20,6 +20,10 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_KEY: Optional[str] = None
     
+    # "supabase", or "sqlite" for the local stand-in (app/database/sqlite_backend.py)
+    DATABASE_BACKEND: str = "supabase"
+    SQLITE_PATH: str = "local_db.sqlite3"  # ":memory:" for a throwaway database
+    
     # JWT Authentication
     JWT_SECRET_KEY: str = "default-secret-key-change-in-production"
     JWT_ALGORITHM: str = "HS256"
@@ -42,6 +46,67 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     
+    # In-memory job indexes
+    JOBS_SYNC_INTERVAL_SECONDS: int = 30
+    JOBS_SYNC_FULL_REFRESH_SECONDS: int = 600
+    SKILL_INDEX_MAX_CANDIDATES: int = 2000
+    SKILL_INDEX_MAX_OBSERVED_SKILLS: int = 500  # user skills outside the corpus vocabulary
+    FACET_MAX_VALUES: int = 20  # per free-text facet (location, job_type)
+    
+    # Jobs snapshot shared by all workers through a memory-mapped file (see app/jobs_snapshot.py);
+    # unset keeps a per-process in-memory snapshot
+    JOBS_SNAPSHOT_PATH: Optional[str] = None
+    JOBS_SNAPSHOT_POLL_SECONDS: float = 1.0
+    
+    # Personalized feed cache
+    FEED_CACHE_TTL_SECONDS: int = 300
+    FEED_CACHE_MAX_ENTRIES: int = 2000
+    FEED_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64MB
+    
+    # Supabase HTTP connection pool (see app/supabase_db.py)
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = 50
+    SUPABASE_HTTP_MAX_KEEPALIVE: int = 20
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    SUPABASE_HTTP_CONNECT_TIMEOUT: float = 5.0
+    SUPABASE_HTTP_READ_TIMEOUT: float = 15.0
+    SUPABASE_HTTP_POOL_TIMEOUT: float = 5.0
+    SUPABASE_HTTP2: bool = True  # used when the h2 package is installed
+    
+    # Database calls (run in a thread pool, see app/database/executor.py)
+    DB_EXECUTOR_MAX_WORKERS: int = 32
+    DB_QUERY_TIMEOUT_SECONDS: float = 10.0
+    DB_BATCH_TIMEOUT_SECONDS: float = 30.0  # multi-query helpers (feed ranking, id fetches)
+    
+    # Listing totals cache
+    COUNT_CACHE_TTL_SECONDS: int = 60
+    COUNT_CACHE_MAX_ENTRIES: int = 5000
+
+    # Profile cache
+    PROFILE_CACHE_TTL_SECONDS: int = 60
+    PROFILE_CACHE_MAX_ENTRIES: int = 2000
+
+    # External job_id -> internal id map (see app/job_ids.py)
+    JOB_ID_CACHE_MAX_ENTRIES: int = 50000
+
+    # Scraper bulk writes (see app/bulk_writer.py)
+    BULK_WRITE_CHUNK_SIZE: int = 500
+    BULK_WRITE_MAX_RETRIES: int = 3
+    BULK_WRITE_BACKOFF_SECONDS: float = 0.5  # doubled per retry, with jitter
+
+    # Degraded mode (see app/resilience.py)
+    DB_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive backend failures before the circuit opens
+    DB_BREAKER_RESET_SECONDS: float = 30.0
+    LISTING_SNAPSHOT_MAX_ENTRIES: int = 500
+    LISTING_REFRESH_ATTEMPTS: int = 3
+    LISTING_REFRESH_BACKOFF_SECONDS: float = 2.0  # doubled per attempt
+
+    # Query instrumentation (see app/instrumentation.py)
+    QUERY_ROUND_TRIP_BUDGET: int = 5  # database calls per request before a warning
+    # Per-route overrides. Feeds on a cold cache: profile + up to SKILL_INDEX_MAX_CANDIDATES / 200
+    # candidate id chunks (app/skill_index.py) when the jobs snapshot can't serve them + page rows
+    QUERY_ROUND_TRIP_BUDGETS: dict = {"/api/jobs/personalized": 12, "/api/jobs/recommendations": 12}
+    QUERY_BUDGET_ENFORCE: bool = False  # dev/CI: raise instead of warn when a route exceeds its budget
+    
     # Tesseract OCR
     TESSERACT_CMD: Optional[str] = None  # Path to tesseract executable
     
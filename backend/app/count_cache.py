@@ -0,0 +1,162 @@
+"""
+Cached listing totals
+
+Listing endpoints used to ask PostgREST for count="exact" on every page,
+which makes Postgres count every matching row per request. Totals are now
+cached per normalized filter signature with a short TTL. Unfiltered
+listings use the planner's row estimate instead of a full count.
+
+Job totals are dropped whenever the jobs sync sees new or changed rows
+(the scraper writes from another process) and when this process writes a
+batch itself; saved-job totals are adjusted in place on save/unsave.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from app.config import settings
+from app.jobs_sync import jobs_sync
+
+logger = logging.getLogger(__name__)
+
+JOBS_NAMESPACE = "jobs"
+
+
+def saved_jobs_namespace(user_id: str) -> str:
+    return f"saved_jobs:{user_id}"
+
+
+def filter_signature(**filters) -> tuple:
+    """
+    Normalized, hashable form of a listing's filters.
+    Unset values are dropped and the rest sorted by name, so equivalent
+    requests share a cache entry. Callers lowercase values that only feed
+    case-insensitive (ilike) filters.
+    """
+    return tuple(sorted(
+        (name, value) for name, value in filters.items()
+        if value is not None and value is not False and value != ""
+    ))
+
+
+def count_rows(table, apply_filters: Callable, planned: bool = False) -> Optional[int]:
+    """
+    Run a head-only count query.
+
+    Args:
+        table: Table builder (e.g. get_jobs_collection())
+        apply_filters: Adds the listing's filters to a select builder
+        planned: Use the planner estimate instead of an exact count
+    """
+    query = table.select("id", count="planned" if planned else "exact", head=True)
+    return apply_filters(query).execute().count
+
+
+class CountCache:
+    """TTL + LRU cache of listing totals keyed by (namespace, signature)"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_count(self, namespace: str, signature: tuple, count: Callable[[], Optional[int]]) -> Optional[int]:
+        """
+        Return the cached total, or call `count` and cache its result.
+        A failing count is logged and returns None so the listing still renders.
+        """
+        key = (namespace, signature)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return entry[0]
+            generation = self._generation
+
+        try:
+            total = count()
+        except Exception as e:
+            logger.warning(f"Count query failed for {namespace}: {e}")
+            return None
+        if total is None:
+            return None
+        with self._lock:
+            if generation != self._generation:
+                # Invalidated while counting; serve it but don't cache it
+                return total
+            self._entries[key] = (total, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return total
+
+    def peek(self, namespace: str, signature: tuple) -> Tuple[Optional[int], int]:
+        """
+        Cached total (or None) plus the generation to pass to `store`,
+        for callers that fetch the count together with their page.
+        """
+        key = (namespace, signature)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return entry[0], self._generation
+            return None, self._generation
+
+    def store(self, namespace: str, signature: tuple, total: Optional[int], generation: int):
+        """Cache a total counted since `peek` returned `generation`"""
+        if total is None:
+            return
+        key = (namespace, signature)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (total, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def adjust(self, namespace: str, signature: tuple, delta: int):
+        """
+        Apply a known change (e.g. one job saved) to a cached total in place,
+        keeping it warm instead of invalidating it. In-flight counts are not cached.
+        """
+        key = (namespace, signature)
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (max(0, entry[0] + delta), entry[1])
+
+    def invalidate(self, namespace: str):
+        """Drop every total cached under a namespace"""
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    # jobs_sync subscriber: any change to the jobs table makes job totals stale
+    def reset(self, rows: List[dict]):
+        self.invalidate(JOBS_NAMESPACE)
+
+    def upsert(self, rows: List[dict]):
+        self.invalidate(JOBS_NAMESPACE)
+
+
+count_cache = CountCache(
+    ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES,
+)
+jobs_sync.subscribe(count_cache, ())
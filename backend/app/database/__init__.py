@@ -4,6 +4,8 @@ when app/database/ is a package (folder) rather than a single file.
 """
 import logging
 from app.supabase_db import get_supabase_client
+from app.database.executor import DatabaseTimeout, execute, run_db, shutdown_executor
+from app.instrumentation import traced_table
 
 logger = logging.getLogger(__name__)
 
@@ -19,20 +21,20 @@ async def connect_to_mongo():
         logger.error(f"Supabase Init Error: {e}")
 
 async def close_mongo_connection():
-    """Legacy Adapter: No-op for Supabase"""
-    pass
+    """Stop the database thread pool"""
+    shutdown_executor()
 
 def get_database():
     return get_supabase_client()
 
 def get_users_collection():
-    return get_supabase_client().table('local_users')
+    return traced_table(get_supabase_client().table('local_users'), 'local_users')
 
 def get_profiles_collection():
-    return get_supabase_client().table('profiles')
+    return traced_table(get_supabase_client().table('profiles'), 'profiles')
 
 def get_jobs_collection():
-    return get_supabase_client().table('jobs')
+    return traced_table(get_supabase_client().table('jobs'), 'jobs')
 
 def get_saved_jobs_collection():
-    return get_supabase_client().table('saved_jobs')
+    return traced_table(get_supabase_client().table('saved_jobs'), 'saved_jobs')
@@ -0,0 +1,77 @@
+"""
+Run blocking supabase-py calls off the event loop
+
+Route handlers are `async def`, but the supabase-py builders do blocking
+HTTP in `.execute()`. Queries are handed to a bounded thread pool and
+awaited with a timeout, so one slow query no longer stalls every other
+request in the worker.
+
+Usage:
+    res = await execute(get_jobs_collection().select("id").eq("id", job_id))
+    rows = await run_db(fetch_jobs_by_ids, ids, timeout=settings.DB_BATCH_TIMEOUT_SECONDS)
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+class DatabaseTimeout(Exception):
+    """A database call did not finish within its timeout"""
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.DB_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="db",
+        )
+    return _executor
+
+
+async def run_db(fn: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+    """
+    Run a blocking database function in the pool.
+
+    Args:
+        timeout: Seconds to wait, including time queued for a worker
+                 (defaults to DB_QUERY_TIMEOUT_SECONDS)
+
+    Raises:
+        DatabaseTimeout: If the call takes longer than the timeout. The
+                         worker thread finishes the call in the background.
+    """
+    loop = asyncio.get_running_loop()
+    # Carry the request context (query instrumentation) into the worker thread
+    context = contextvars.copy_context()
+    future = loop.run_in_executor(get_executor(), functools.partial(context.run, fn, *args, **kwargs))
+    timeout = settings.DB_QUERY_TIMEOUT_SECONDS if timeout is None else timeout
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        name = getattr(fn, "__qualname__", repr(fn))
+        logger.warning(f"Database call {name} timed out after {timeout}s")
+        raise DatabaseTimeout(f"Database call timed out after {timeout}s")
+
+
+async def execute(query, timeout: Optional[float] = None):
+    """Await `query.execute()` for any supabase-py request builder"""
+    return await run_db(query.execute, timeout=timeout)
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
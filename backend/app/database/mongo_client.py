@@ -2,8 +2,13 @@ import os
 import logging
 from datetime import datetime
 # from pymongo import MongoClient... # Removed
-from supabase import create_client, Client
+from supabase import Client
 from dotenv import load_dotenv
+from app.bulk_writer import BulkWriter
+from app.count_cache import JOBS_NAMESPACE, count_cache
+from app.job_features import compute_job_features
+from app.config import settings
+from app.supabase_db import create_pooled_client, get_supabase_client
 
 load_dotenv()
 
@@ -13,12 +18,17 @@ SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
 
 class SupabaseHandler:
     def __init__(self):
-        if not SUPABASE_URL or not SUPABASE_KEY:
+        if settings.DATABASE_BACKEND == "sqlite":
+             # Local stand-in shared with the API process settings
+             self.client = get_supabase_client()
+             logging.info("SQLite Client (Scraper) initialized.")
+        elif not SUPABASE_URL or not SUPABASE_KEY:
              logging.error("Supabase Credentials Missing in Scraper Handler")
              self.client = None
         else:
-             self.client = create_client(SUPABASE_URL, SUPABASE_KEY)
+             self.client = create_pooled_client(SUPABASE_URL, SUPABASE_KEY)
              logging.info("Supabase Client (Scraper) initialized.")
+        self.last_write = None  # BulkWriteResult of the last insert_jobs call
 
     def reset_database(self):
         """Clear jobs table (Danger!)"""
@@ -35,12 +45,10 @@ class SupabaseHandler:
         pass # Not needed for Supabase/Postgres (managed via SQL)
 
     def insert_jobs(self, jobs: list):
-        """Insert multiple jobs, ignoring duplicates."""
+        """Upsert multiple jobs on job_id. Returns the number of rows written."""
         if not jobs or not self.client:
             return 0
         
-        inserted_count = 0
-        
         # Prepare jobs for Supabase schema
         # Jobs coming from Scraper might have different fields.
         # We map them to our 'jobs' table:
@@ -48,64 +56,71 @@ class SupabaseHandler:
         # posted_at, is_remote, job_type, salary_range
         
         formatted_batch = []
+        malformed = 0
         for job in jobs:
-            formatted_job = {
-                # "id": ... generate or let db do it? DB default is uuid_generate_v4()
-                "company": job.get("company", "Unknown"),
-                "role": job.get("role", "Unknown"),
-                "location": job.get("location"),
-                "description": job.get("description"),
-                "is_remote": job.get("is_remote", False),
-                "source_url": job.get("url"), # map url -> source_url
-                "job_id": job.get("job_id"), # external id
-                "posted_at": job.get("posted_at").isoformat(),
-                "job_type": job.get("type"), # map type -> job_type
-                "salary_range": job.get("salary"), # map salary -> salary_range
-                # "experience_level": job.get("experience") # map
-            }
+            try:
+                formatted_job = {
+                    # "id": ... generate or let db do it? DB default is uuid_generate_v4()
+                    "company": job.get("company", "Unknown"),
+                    "role": job.get("role", "Unknown"),
+                    "location": job.get("location"),
+                    "description": job.get("description"),
+                    "is_remote": job.get("is_remote", False),
+                    "source_url": job.get("url"), # map url -> source_url
+                    "job_id": job.get("job_id"), # external id
+                    "posted_at": job.get("posted_at").isoformat(),
+                    "job_type": job.get("type"), # map type -> job_type
+                    "salary_range": job.get("salary"), # map salary -> salary_range
+                    # "experience_level": job.get("experience") # map
+                }
+                formatted_job.update(compute_job_features(formatted_job))
+            except Exception as e:
+                malformed += 1
+                logging.error(f"Skipping malformed job {job.get('job_id')}: {e}")
+                continue
             formatted_batch.append(formatted_job)
         
-        # Upsert batch (using upsert to avoid dups on job_id if unique constraint exists)
-        # We assumed job_id is unique in SQL schema.
-        try:
-            res = self.client.table("jobs").upsert(formatted_batch, on_conflict="job_id").execute()
-            # Count inserted? Upsert returns data.
-            if res.data:
-                inserted_count = len(res.data)
-        except Exception as e:
-             logging.error(f"Supabase Insert Error: {e}")
-             
-        return inserted_count
+        # Upsert in chunks (job_id is unique in the SQL schema); rejected rows are isolated
+        # instead of losing the batch
+        result = BulkWriter(self.client, "jobs", on_conflict="job_id").upsert(formatted_batch)
+        self.last_write = result
+        if result.written:
+            count_cache.invalidate(JOBS_NAMESPACE)
+        if result.failed or malformed:
+            failed_ids = [row.get("job_id") for row in result.failed_rows[:10]]
+            logging.error(f"Supabase Insert: {result.failed} rows rejected, {malformed} malformed (e.g. {failed_ids})")
+        
+        return result.written
 
     def insert_invalid_jobs(self, jobs: list):
         """Insert multiple invalid jobs."""
         if not jobs or not self.client:
             return 0
         
-        inserted_count = 0
         formatted_batch = []
         for job in jobs:
-            formatted_job = {
-                "job_id": job.get("job_id"),
-                "company": job.get("company", "Unknown"),
-                "role": job.get("role", "Unknown"),
-                "location": job.get("location"),
-                "description": job.get("description"),
-                "source_url": job.get("url"),
-                "posted_at": job.get("posted_at").isoformat(),
-                "reason": "Verification Failed", # Or allow passing reason
-                "checked_at": datetime.utcnow().isoformat()
-            }
+            try:
+                formatted_job = {
+                    "job_id": job.get("job_id"),
+                    "company": job.get("company", "Unknown"),
+                    "role": job.get("role", "Unknown"),
+                    "location": job.get("location"),
+                    "description": job.get("description"),
+                    "source_url": job.get("url"),
+                    "posted_at": job.get("posted_at").isoformat(),
+                    "reason": "Verification Failed", # Or allow passing reason
+                    "checked_at": datetime.utcnow().isoformat()
+                }
+            except Exception as e:
+                logging.error(f"Skipping malformed invalid job {job.get('job_id')}: {e}")
+                continue
             formatted_batch.append(formatted_job)
         
-        try:
-            res = self.client.table("invalid_jobs").upsert(formatted_batch, on_conflict="job_id").execute()
-            if res.data:
-                inserted_count = len(res.data)
-        except Exception as e:
-             logging.error(f"Supabase Invalid Job Insert Error: {e}")
+        result = BulkWriter(self.client, "invalid_jobs", on_conflict="job_id").upsert(formatted_batch)
+        if result.failed:
+            logging.error(f"Supabase Invalid Job Insert: {result.failed} rows rejected")
              
-        return inserted_count
+        return result.written
 
     def get_latest_jobs(self, limit=50):
         if not self.client: return []
@@ -0,0 +1,660 @@
+"""
+SQLite stand-in for the Supabase tables
+
+Implements the subset of the supabase-py / PostgREST query builder the
+backend uses, so the API, scrapers and benchmarks run on a laptop or CI
+box with no network. Enable it with DATABASE_BACKEND=sqlite (and
+SQLITE_PATH, ":memory:" for a throwaway database).
+
+Supported:
+    table(name).select(columns, count=..., head=...)   incl. one-level embeds: "*, jobs(id,role)", "jobs!inner(...)"
+    .insert(rows) / .upsert(rows, on_conflict=..., ignore_duplicates=...) / .update(values) / .delete()
+    .eq .neq .lt .lte .gt .gte .like .ilike .in_ .is_ .or_ (logic trees with and()/or(), quoted values)
+    .order(column, desc=..., nullsfirst=...) (chainable) .range .limit .execute
+
+Rows come back as PostgREST would return them: uuids and timestamps as
+strings, arrays as lists, jsonb as dicts. Unknown columns, unique
+violations and foreign key violations (saved_jobs.job_id -> jobs.id)
+raise postgrest.APIError with the PostgREST/Postgres codes.
+The schema mirrors create_tables.py and sql/*.sql, including indexes and
+the jobs updated_at trigger.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest import APIError, APIResponse
+
+from app.instrumentation import add_payload_bytes, tracing_query
+
+logger = logging.getLogger(__name__)
+
+# Column types per table (see create_tables.py and sql/*.sql)
+TABLES: Dict[str, Dict[str, str]] = {
+    "local_users": {
+        "id": "uuid",
+        "email": "text",
+        "password_hash": "text",
+        "name": "text",
+        "is_active": "bool",
+        "created_at": "timestamptz",
+        "last_login": "timestamptz",
+    },
+    "profiles": {
+        "id": "uuid",
+        "user_id": "uuid",
+        "full_name": "text",
+        "experience_years": "int",
+        "preferred_role": "text",
+        "preferred_location": "text",
+        "skills": "text[]",
+        "resume_url": "text",
+        "parsing_status": "text",
+        "parsed_data": "jsonb",
+        "created_at": "timestamptz",
+    },
+    "jobs": {
+        "id": "uuid",
+        "job_id": "text",
+        "company": "text",
+        "role": "text",
+        "location": "text",
+        "description": "text",
+        "salary_range": "text",
+        "job_type": "text",
+        "is_remote": "bool",
+        "experience_level": "text",
+        "skills_required": "text[]",
+        "posted_at": "timestamptz",
+        "source_url": "text",
+        "is_active": "bool",
+        "updated_at": "timestamptz",
+        "min_years_experience": "int",
+        "max_years_experience": "int",
+        "salary_min": "numeric",
+        "salary_max": "numeric",
+        "salary_currency": "text",
+        "company_tier": "int",
+        "extracted_skills": "text[]",
+        "role_tokens": "text[]",
+    },
+    "saved_jobs": {
+        "id": "uuid",
+        "user_id": "uuid",
+        "job_id": "uuid",
+        "notes": "text",
+        "saved_at": "timestamptz",
+    },
+    "invalid_jobs": {
+        "id": "uuid",
+        "job_id": "text",
+        "company": "text",
+        "role": "text",
+        "location": "text",
+        "description": "text",
+        "source_url": "text",
+        "reason": "text",
+        "checked_at": "timestamptz",
+        "posted_at": "timestamptz",
+        "is_remote": "bool",
+        "job_type": "text",
+        "salary_range": "text",
+    },
+}
+
+# SQL column defaults that are constants
+STATIC_DEFAULTS = {
+    ("local_users", "is_active"): "1",
+    ("profiles", "parsing_status"): "'pending'",
+    ("jobs", "is_remote"): "0",
+    ("jobs", "is_active"): "1",
+}
+
+# Columns defaulting to now()
+NOW_DEFAULTS = {
+    "local_users": ("created_at",),
+    "profiles": ("created_at",),
+    "jobs": ("posted_at", "updated_at"),
+    "saved_jobs": ("saved_at",),
+    "invalid_jobs": ("checked_at",),
+}
+
+# Columns bumped to now() on every write (trigger in sql/jobs_updated_at.sql)
+TOUCH_COLUMNS = {"jobs": "updated_at"}
+
+UNIQUE_KEYS = {
+    "local_users": [("email",)],
+    "profiles": [("user_id",)],
+    "jobs": [("job_id",)],
+    "saved_jobs": [("user_id", "job_id")],
+    "invalid_jobs": [("job_id",)],
+}
+
+INDEXES = [
+    "create index if not exists jobs_posted_at_idx on jobs (posted_at desc, id desc)",
+    "create index if not exists jobs_updated_at_idx on jobs (updated_at)",
+    "create index if not exists jobs_min_years_experience_idx on jobs (min_years_experience)",
+    "create index if not exists jobs_company_tier_idx on jobs (company_tier) where company_tier > 0",
+    "create index if not exists jobs_location_idx on jobs (location)",
+    "create index if not exists saved_jobs_user_saved_at_idx on saved_jobs (user_id, saved_at desc, id desc)",
+]
+
+# Enforced foreign keys: (table, column) -> (referenced table, column)
+FOREIGN_KEYS = {
+    ("saved_jobs", "job_id"): ("jobs", "id"),
+}
+
+# Embeddable relations: (table, embedded table) -> (local column, remote column)
+RELATIONS = {
+    ("saved_jobs", "jobs"): ("job_id", "id"),
+    ("saved_jobs", "local_users"): ("user_id", "id"),
+    ("profiles", "local_users"): ("user_id", "id"),
+}
+
+_SQL_TYPES = {"int": "integer", "numeric": "real", "bool": "integer"}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _timestamp(value) -> Optional[str]:
+    """Normalize a timestamp to UTC ISO text so string order is time order"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        text = str(value).strip().replace(" ", "T", 1)
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            return str(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _encode(ctype: str, value):
+    """Python/PostgREST value -> SQLite value"""
+    if value is None:
+        return None
+    if ctype in ("text[]", "jsonb"):
+        return json.dumps(value, default=str)
+    if ctype == "bool":
+        if isinstance(value, str):
+            return 1 if value.lower() in ("true", "t", "1") else 0
+        return 1 if value else 0
+    if ctype == "int":
+        return int(float(value)) if isinstance(value, str) else int(value)
+    if ctype == "numeric":
+        return float(value)
+    if ctype == "timestamptz":
+        return _timestamp(value)
+    return str(value)
+
+
+def _decode(ctype: str, value):
+    """SQLite value -> what PostgREST would return"""
+    if value is None:
+        return None
+    if ctype in ("text[]", "jsonb"):
+        return json.loads(value)
+    if ctype == "bool":
+        return bool(value)
+    return value
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quoted:
+            current.append(ch)
+            if ch == "\\" and i + 1 < len(text):
+                current.append(text[i + 1])
+                i += 1
+            elif ch == '"':
+                quoted = False
+        elif ch == '"':
+            quoted = True
+            current.append(ch)
+        elif ch == "(":
+            depth += 1
+            current.append(ch)
+        elif ch == ")":
+            depth -= 1
+            current.append(ch)
+        elif ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    if current or parts:
+        parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _like_pattern(pattern: str) -> str:
+    # PostgREST accepts * as an alias for % in like/ilike
+    return str(pattern).replace("*", "%")
+
+
+def _integrity_error(e: sqlite3.IntegrityError) -> APIError:
+    """Postgres error code for a constraint failure"""
+    code = "23503" if "FOREIGN KEY" in str(e) else "23505"
+    return APIError({"code": code, "message": str(e)})
+
+
+class SQLiteDatabase:
+    """One SQLite connection shared by every table builder, guarded by a lock"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        self.conn.execute("pragma foreign_keys=on")
+        if path != ":memory:":
+            self.conn.execute("pragma journal_mode=wal")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.lock:
+            for table, columns in TABLES.items():
+                defs = []
+                for name, ctype in columns.items():
+                    col = f"{_quote_ident(name)} {_SQL_TYPES.get(ctype, 'text')}"
+                    if name == "id":
+                        col += " primary key"
+                    reference = FOREIGN_KEYS.get((table, name))
+                    if reference is not None:
+                        col += f" references {reference[0]} ({_quote_ident(reference[1])})"
+                    default = STATIC_DEFAULTS.get((table, name))
+                    if default is not None:
+                        col += f" default {default}"
+                    defs.append(col)
+                for key in UNIQUE_KEYS.get(table, []):
+                    defs.append(f"unique ({', '.join(_quote_ident(c) for c in key)})")
+                self.conn.execute(f"create table if not exists {table} ({', '.join(defs)})")
+            for statement in INDEXES:
+                self.conn.execute(statement)
+
+    def query(self, sql: str, params: List[Any] = ()) -> List[sqlite3.Row]:
+        with self.lock:
+            try:
+                return self.conn.execute(sql, params).fetchall()
+            except sqlite3.IntegrityError as e:
+                raise _integrity_error(e)
+            except sqlite3.OperationalError as e:
+                raise APIError({"code": "42703" if "no such column" in str(e) else "XX000", "message": str(e)})
+
+    def write_many(self, statements: List[Tuple[str, List[Any]]]) -> List[sqlite3.Row]:
+        """Run write statements in one transaction and collect their RETURNING rows"""
+        rows = []
+        with self.lock:
+            try:
+                self.conn.execute("begin")
+                for sql, params in statements:
+                    rows.extend(self.conn.execute(sql, params).fetchall())
+                self.conn.execute("commit")
+            except sqlite3.IntegrityError as e:
+                self.conn.execute("rollback")
+                raise _integrity_error(e)
+            except Exception:
+                self.conn.execute("rollback")
+                raise
+        return rows
+
+
+class SQLiteClient:
+    """Drop-in for supabase.Client where only `.table()` is used"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.db = SQLiteDatabase(path)
+        logger.info(f"Using SQLite database backend at {path}")
+
+    def table(self, name: str) -> "SQLiteRequestBuilder":
+        if name not in TABLES:
+            raise APIError({"code": "42P01", "message": f'relation "public.{name}" does not exist'})
+        return SQLiteRequestBuilder(self.db, name)
+
+    from_ = table
+
+
+class SQLiteRequestBuilder:
+    """Counterpart of postgrest's SyncRequestBuilder for one table"""
+
+    def __init__(self, db: SQLiteDatabase, table: str):
+        self.db = db
+        self.table = table
+
+    def select(self, *columns: str, count: Optional[str] = None, head: Optional[bool] = None) -> "SQLiteQuery":
+        return SQLiteQuery(self.db, self.table, "select", columns=",".join(columns) or "*", count=count, head=head)
+
+    def insert(self, json, *, count=None, returning="representation", upsert=False, default_to_null=True) -> "SQLiteQuery":
+        return SQLiteQuery(self.db, self.table, "insert", payload=json, returning=returning)
+
+    def upsert(self, json, *, count=None, returning="representation", ignore_duplicates=False,
+               on_conflict="", default_to_null=True) -> "SQLiteQuery":
+        return SQLiteQuery(
+            self.db, self.table, "upsert", payload=json, returning=returning,
+            on_conflict=on_conflict, ignore_duplicates=ignore_duplicates,
+        )
+
+    def update(self, json, *, count=None, returning="representation") -> "SQLiteQuery":
+        return SQLiteQuery(self.db, self.table, "update", payload=json, returning=returning)
+
+    def delete(self, *, count=None, returning="representation") -> "SQLiteQuery":
+        return SQLiteQuery(self.db, self.table, "delete", returning=returning)
+
+
+class SQLiteQuery:
+    """Filter/modifier builder; `execute()` runs it and returns an APIResponse"""
+
+    def __init__(self, db: SQLiteDatabase, table: str, method: str, columns: str = "*",
+                 count: Optional[str] = None, head: Optional[bool] = None, payload=None,
+                 returning: str = "representation", on_conflict: str = "", ignore_duplicates: bool = False):
+        self.db = db
+        self.table = table
+        self.schema = TABLES[table]
+        self.method = method
+        self.columns = columns
+        self.count = count
+        self.head = head
+        self.payload = payload
+        self.returning = returning
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        self._where: List[str] = []
+        self._params: List[Any] = []
+        self._order: List[str] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    # --- filters -------------------------------------------------------
+
+    def _column_type(self, column: str) -> str:
+        if column not in self.schema:
+            raise APIError({"code": "42703", "message": f"column {self.table}.{column} does not exist"})
+        return self.schema[column]
+
+    def _condition(self, column: str, op: str, value, negate: bool = False) -> Tuple[str, List[Any]]:
+        ctype = self._column_type(column)
+        col = _quote_ident(column)
+        if op == "is":
+            text = str(value).lower() if value is not None else "null"
+            if text == "null":
+                sql, params = f"{col} is null", []
+            elif text in ("true", "false"):
+                sql, params = f"{col} = ?", [1 if text == "true" else 0]
+            else:
+                raise APIError({"code": "PGRST100", "message": f"unsupported is value {value}"})
+        elif op == "in":
+            values = value
+            if isinstance(value, str):
+                values = [_unquote(v) for v in _split_top_level(value.strip().strip("()"))]
+            values = list(values)
+            if not values:
+                sql, params = "0", []
+            else:
+                sql = f"{col} in ({', '.join('?' for _ in values)})"
+                params = [_encode(ctype, v) for v in values]
+        elif op in ("like", "ilike"):
+            # SQLite LIKE is case-insensitive for ASCII, which matches ilike
+            if op == "like":
+                sql = f"{col} glob ?"
+                params = [_like_pattern(value).replace("%", "*").replace("_", "?")]
+            else:
+                sql, params = f"{col} like ?", [_like_pattern(value)]
+        else:
+            operators = {"eq": "=", "neq": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+            if op not in operators:
+                raise APIError({"code": "PGRST100", "message": f"unsupported operator {op}"})
+            sql, params = f"{col} {operators[op]} ?", [_encode(ctype, value)]
+        if negate:
+            sql = f"not ({sql})"
+        return sql, params
+
+    def _parse_logic(self, text: str) -> Tuple[str, List[Any]]:
+        """One PostgREST logic-tree item: col.op.value, and(...), or(...), optionally not.-prefixed"""
+        negate = False
+        if text.startswith("not.") and text[4:].startswith(("and(", "or(")):
+            negate, text = True, text[4:]
+        for joiner in ("and", "or"):
+            if text.startswith(joiner + "(") and text.endswith(")"):
+                parts = [self._parse_logic(item) for item in _split_top_level(text[len(joiner) + 1:-1])]
+                sql = "(" + f" {joiner} ".join(p[0] for p in parts) + ")"
+                params = [param for p in parts for param in p[1]]
+                return (f"not {sql}" if negate else sql), params
+        column, rest = text.split(".", 1)
+        if rest.startswith("not."):
+            negate, rest = True, rest[4:]
+        op, value = rest.split(".", 1)
+        if op == "in":
+            return self._condition(column, op, value, negate)
+        return self._condition(column, op, _unquote(value), negate)
+
+    def _add(self, sql: str, params: List[Any]):
+        self._where.append(sql)
+        self._params.extend(params)
+        return self
+
+    def eq(self, column: str, value):
+        return self._add(*self._condition(column, "eq", value))
+
+    def neq(self, column: str, value):
+        return self._add(*self._condition(column, "neq", value))
+
+    def lt(self, column: str, value):
+        return self._add(*self._condition(column, "lt", value))
+
+    def lte(self, column: str, value):
+        return self._add(*self._condition(column, "lte", value))
+
+    def gt(self, column: str, value):
+        return self._add(*self._condition(column, "gt", value))
+
+    def gte(self, column: str, value):
+        return self._add(*self._condition(column, "gte", value))
+
+    def like(self, column: str, pattern: str):
+        return self._add(*self._condition(column, "like", pattern))
+
+    def ilike(self, column: str, pattern: str):
+        return self._add(*self._condition(column, "ilike", pattern))
+
+    def in_(self, column: str, values):
+        return self._add(*self._condition(column, "in", values))
+
+    def is_(self, column: str, value):
+        return self._add(*self._condition(column, "is", value))
+
+    def or_(self, filters: str, reference_table: Optional[str] = None):
+        return self._add(*self._parse_logic(f"or({filters})"))
+
+    # --- modifiers -----------------------------------------------------
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None, foreign_table=None):
+        self._column_type(column)
+        if nullsfirst is None:
+            nullsfirst = desc  # Postgres: NULLS LAST for ASC, NULLS FIRST for DESC
+        direction = "desc" if desc else "asc"
+        nulls = "first" if nullsfirst else "last"
+        self._order.append(f"{_quote_ident(column)} {direction} nulls {nulls}")
+        return self
+
+    def limit(self, size: int, *, foreign_table=None):
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table=None):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # --- execution -----------------------------------------------------
+
+    def _where_sql(self) -> str:
+        return (" where " + " and ".join(self._where)) if self._where else ""
+
+    def _parse_columns(self) -> Tuple[List[str], Dict[str, List[str]], List[str]]:
+        """Split a select string into own columns, embedded relations and the !inner embeds"""
+        own, embeds, inner_joins = [], {}, []
+        for item in _split_top_level(self.columns):
+            if "(" in item and item.endswith(")"):
+                name, inner = item[:-1].split("(", 1)
+                name, _, hint = name.split(":")[-1].partition("!")
+                name = name.strip()
+                if hint.strip() == "inner":
+                    inner_joins.append(name)
+                if (self.table, name) not in RELATIONS:
+                    raise APIError({
+                        "code": "PGRST200",
+                        "message": f"Could not find a relationship between '{self.table}' and '{name}'",
+                    })
+                embeds[name] = [c.strip() for c in _split_top_level(inner)] or ["*"]
+            elif item == "*":
+                own.extend(c for c in self.schema if c not in own)
+            else:
+                column = item.split(":")[-1].strip()
+                self._column_type(column)
+                if column not in own:
+                    own.append(column)
+        return own, embeds, inner_joins
+
+    def _decode_row(self, row: sqlite3.Row, columns: List[str], schema: Dict[str, str]) -> dict:
+        return {c: _decode(schema[c], row[c]) for c in columns}
+
+    def _select(self) -> APIResponse:
+        own, embeds, inner_joins = self._parse_columns()
+        fetch = list(own)
+        for name in embeds:
+            local = RELATIONS[(self.table, name)][0]
+            if local not in fetch:
+                fetch.append(local)
+
+        # !inner embeds drop rows without a related row, before counting and paging
+        where = list(self._where)
+        for name in inner_joins:
+            local, remote = RELATIONS[(self.table, name)]
+            where.append(f"{_quote_ident(local)} in (select {_quote_ident(remote)} from {name})")
+        where_sql = (" where " + " and ".join(where)) if where else ""
+
+        count = None
+        if self.count:
+            count = self.db.query(f"select count(*) from {self.table}{where_sql}", self._params)[0][0]
+        if self.head:
+            return APIResponse(data=[], count=count)
+
+        sql = f"select {', '.join(_quote_ident(c) for c in fetch) or '1'} from {self.table}{where_sql}"
+        if self._order:
+            sql += " order by " + ", ".join(self._order)
+        if self._limit is not None:
+            sql += f" limit {int(self._limit)} offset {int(self._offset)}"
+        elif self._offset:
+            sql += f" limit -1 offset {int(self._offset)}"
+        rows = [self._decode_row(r, fetch, self.schema) for r in self.db.query(sql, self._params)]
+
+        for name, columns in embeds.items():
+            local, remote = RELATIONS[(self.table, name)]
+            keys = list({r[local] for r in rows if r.get(local) is not None})
+            related = {}
+            if keys:
+                inner = SQLiteQuery(self.db, name, "select", columns=",".join(columns + [remote]))
+                for match in inner.in_(remote, keys).execute().data:
+                    related[match[remote]] = match
+            for row in rows:
+                match = related.get(row.get(local))
+                if match is not None and remote not in columns and "*" not in columns:
+                    match = {k: v for k, v in match.items() if k != remote}
+                row[name] = match
+
+        if len(fetch) != len(own):
+            rows = [{k: v for k, v in row.items() if k in own or k in embeds} for row in rows]
+        return APIResponse(data=rows, count=count)
+
+    def _prepare_row(self, row: dict, insert: bool) -> Dict[str, Any]:
+        values = {}
+        for column, value in row.items():
+            if column not in self.schema:
+                raise APIError({
+                    "code": "PGRST204",
+                    "message": f"Could not find the '{column}' column of '{self.table}' in the schema cache",
+                })
+            values[column] = _encode(self.schema[column], value)
+        if insert:
+            if "id" in self.schema and values.get("id") is None:
+                values["id"] = str(uuid.uuid4())
+            for column in NOW_DEFAULTS.get(self.table, ()):
+                if values.get(column) is None:
+                    values[column] = _now()
+        touch = TOUCH_COLUMNS.get(self.table)
+        if touch:
+            values[touch] = _now()
+        return values
+
+    def _returning(self) -> str:
+        return " returning *" if self.returning == "representation" else ""
+
+    def _write(self) -> APIResponse:
+        statements = []
+        if self.method in ("insert", "upsert"):
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            conflict = [c.strip() for c in (self.on_conflict or "id").split(",") if c.strip()]
+            for row in rows:
+                values = self._prepare_row(row, insert=True)
+                columns = list(values)
+                sql = (
+                    f"insert into {self.table} ({', '.join(_quote_ident(c) for c in columns)}) "
+                    f"values ({', '.join('?' for _ in columns)})"
+                )
+                if self.method == "upsert":
+                    target = ", ".join(_quote_ident(c) for c in conflict)
+                    updates = [c for c in row if c not in conflict and c != "id"]
+                    touch = TOUCH_COLUMNS.get(self.table)
+                    if touch and touch not in updates:
+                        updates.append(touch)
+                    if self.ignore_duplicates or not updates:
+                        sql += f" on conflict ({target}) do nothing"
+                    else:
+                        assignments = ", ".join(f"{_quote_ident(c)} = excluded.{_quote_ident(c)}" for c in updates)
+                        sql += f" on conflict ({target}) do update set {assignments}"
+                statements.append((sql + self._returning(), [values[c] for c in columns]))
+        elif self.method == "update":
+            values = self._prepare_row(self.payload, insert=False)
+            assignments = ", ".join(f"{_quote_ident(c)} = ?" for c in values)
+            sql = f"update {self.table} set {assignments}{self._where_sql()}{self._returning()}"
+            statements.append((sql, list(values.values()) + self._params))
+        elif self.method == "delete":
+            statements.append((f"delete from {self.table}{self._where_sql()}{self._returning()}", self._params))
+
+        rows = self.db.write_many(statements)
+        columns = list(self.schema)
+        return APIResponse(data=[self._decode_row(r, columns, self.schema) for r in rows], count=None)
+
+    def execute(self) -> APIResponse:
+        res = self._select() if self.method == "select" else self._write()
+        if tracing_query():
+            # Size of the equivalent PostgREST JSON body
+            add_payload_bytes(len(json.dumps(res.data, default=str)))
+        return res
@@ -0,0 +1,232 @@
+"""
+Facet counts for the public job filters
+
+Each job gets a slot number, and every facet value keeps a bitmap (a
+Python int) of the slots holding it, kept in step with the jobs table by
+JobsSync. A filter set is ANDed into one bitmap and each facet value's
+count is a popcount of its intersection with it, so all facets for a
+search come back from one call without touching the database.
+
+Counts are disjunctive: the location and remote facets ignore their own
+filter, so picking "Pune" still shows how many jobs the other locations
+have.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.jobs_sync import jobs_sync
+from app.search_index import search_fields, search_index
+
+logger = logging.getLogger(__name__)
+
+FACET_COLUMNS = (
+    "id", "location", "is_remote", "job_type", "min_years_experience",
+    "salary_min", "salary_currency", "is_active",
+)
+
+FACETS = ("location", "is_remote", "job_type", "experience", "salary")
+# min_years backs the experience filter; it isn't returned as a facet
+_COLUMNS = FACETS + ("min_years",)
+
+NOT_SPECIFIED = "Not specified"
+
+# Same labels as EXPERIENCE_HIERARCHY: (label, min years exclusive upper bound)
+EXPERIENCE_BUCKETS = (("0-1", 1), ("1-3", 3), ("3-5", 5), ("5-8", 8), ("8-12", 12), ("12+", None))
+
+# Annual INR salary_min buckets, in lakhs
+SALARY_BUCKETS = (("0-5L", 5), ("5-10L", 10), ("10-20L", 20), ("20-40L", 40), ("40L+", None))
+OTHER_CURRENCY = "Other currency"
+_LAKH = 100_000
+
+
+def experience_bucket(min_years: Optional[int]) -> str:
+    if min_years is None:
+        return NOT_SPECIFIED
+    for label, upper in EXPERIENCE_BUCKETS:
+        if upper is None or min_years < upper:
+            return label
+
+
+def salary_bucket(salary_min: Optional[float], currency: Optional[str]) -> str:
+    if salary_min is None:
+        return NOT_SPECIFIED
+    if currency not in (None, "INR"):
+        return OTHER_CURRENCY
+    for label, upper in SALARY_BUCKETS:
+        if upper is None or salary_min < upper * _LAKH:
+            return label
+
+
+def _bitmap(slots: Iterable[int]) -> int:
+    """Build a bitmap from slot numbers in one pass"""
+    buffer = bytearray()
+    for slot in slots:
+        byte = slot >> 3
+        if byte >= len(buffer):
+            buffer.extend(bytes(byte + 1 - len(buffer)))
+        buffer[byte] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _values(row: dict) -> tuple:
+    """Facet values of a row, in _COLUMNS order"""
+    location = (row.get("location") or "").strip() or NOT_SPECIFIED
+    return (
+        location,
+        bool(row.get("is_remote")),
+        (row.get("job_type") or "").strip() or NOT_SPECIFIED,
+        experience_bucket(row.get("min_years_experience")),
+        salary_bucket(row.get("salary_min"), row.get("salary_currency")),
+        row.get("min_years_experience"),
+    )
+
+
+class FacetIndex:
+    """Facet value -> slot bitmaps over the active jobs, refreshed from JobsSync"""
+
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._doc_values: Dict[str, tuple] = {}
+        self._bitmaps: Dict[str, Dict[object, int]] = {c: {} for c in _COLUMNS}
+        self._all = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _add(self, job_id: str, values: tuple):
+        slot = self._free.pop() if self._free else len(self._slots)
+        bit = 1 << slot
+        self._slots[job_id] = slot
+        self._doc_values[job_id] = values
+        self._all |= bit
+        for column, value in zip(_COLUMNS, values):
+            bitmaps = self._bitmaps[column]
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+
+    def _discard(self, job_id: str):
+        slot = self._slots.pop(job_id, None)
+        if slot is None:
+            return
+        mask = ~(1 << slot)
+        self._all &= mask
+        for column, value in zip(_COLUMNS, self._doc_values.pop(job_id)):
+            bitmaps = self._bitmaps[column]
+            remaining = bitmaps[value] & mask
+            if remaining:
+                bitmaps[value] = remaining
+            else:
+                del bitmaps[value]
+        self._free.append(slot)
+
+    def reset(self, rows: List[dict]):
+        """Rebuild with dense slots from a full load"""
+        active = [r for r in rows if r.get("is_active") is not False]
+        slots_by_value = {c: {} for c in _COLUMNS}
+        doc_values = {}
+        for slot, row in enumerate(active):
+            values = _values(row)
+            doc_values[str(row["id"])] = values
+            for column, value in zip(_COLUMNS, values):
+                slots_by_value[column].setdefault(value, []).append(slot)
+        with self._lock:
+            self._slots = {job_id: slot for slot, job_id in enumerate(doc_values)}
+            self._free = []
+            self._doc_values = doc_values
+            self._bitmaps = {
+                column: {value: _bitmap(slots) for value, slots in by_value.items()}
+                for column, by_value in slots_by_value.items()
+            }
+            self._all = _bitmap(range(len(doc_values)))
+        logger.info(f"Facet index rebuilt: {len(doc_values)} jobs")
+
+    def upsert(self, rows: List[dict]):
+        """Apply inserted or updated rows; deactivated jobs leave the index"""
+        with self._lock:
+            for row in rows:
+                job_id = str(row["id"])
+                self._discard(job_id)
+                if row.get("is_active") is not False:
+                    self._add(job_id, _values(row))
+
+    def remove(self, job_ids: Iterable[str]):
+        with self._lock:
+            for job_id in job_ids:
+                self._discard(str(job_id))
+
+    def _union(self, column: str, predicate) -> int:
+        result = 0
+        for value, bitmap in self._bitmaps[column].items():
+            if predicate(value):
+                result |= bitmap
+        return result
+
+    def counts(
+        self,
+        location: Optional[str] = None,
+        remote_only: bool = False,
+        experience: Optional[int] = None,
+        search: Optional[str] = None,
+        search_type: Optional[str] = None,
+    ) -> dict:
+        """
+        Counts per facet value for the public listing filters.
+
+        Returns:
+            {"total": jobs matching every filter,
+             "facets": {facet: [{"value", "count"}, ...]}} with zero counts omitted
+        """
+        # Resolve the search outside the lock; it takes the search index's own
+        matched = search_index.matches(search, search_fields(search_type)) if search else None
+        with self._lock:
+            base = self._all
+            if matched is not None:
+                base &= _bitmap(self._slots[job_id] for job_id in matched if job_id in self._slots)
+            if experience is not None:
+                base &= self._union("min_years", lambda years: years is None or years <= experience + 1)
+            location_filter = remote_filter = self._all
+            if location:
+                needle = location.lower()
+                location_filter = self._union(
+                    "location", lambda value: value != NOT_SPECIFIED and needle in value.lower()
+                )
+            if remote_only:
+                remote_filter = self._bitmaps["is_remote"].get(True, 0)
+
+            filters = {
+                "location": base & remote_filter,
+                "is_remote": base & location_filter,
+            }
+            everything = base & location_filter & remote_filter
+            facets = {}
+            for facet in FACETS:
+                within = filters.get(facet, everything)
+                counts = [
+                    (value, (bitmap & within).bit_count())
+                    for value, bitmap in self._bitmaps[facet].items()
+                ]
+                facets[facet] = [(value, count) for value, count in counts if count]
+            total = everything.bit_count()
+
+        return {"total": total, "facets": {facet: _ordered(facet, values) for facet, values in facets.items()}}
+
+
+def _ordered(facet: str, values: List[tuple]) -> List[dict]:
+    """Buckets in their natural order; free-text facets by count, top FACET_MAX_VALUES"""
+    if facet == "experience":
+        order = [label for label, _ in EXPERIENCE_BUCKETS] + [NOT_SPECIFIED]
+        values.sort(key=lambda item: order.index(item[0]))
+    elif facet == "salary":
+        order = [label for label, _ in SALARY_BUCKETS] + [OTHER_CURRENCY, NOT_SPECIFIED]
+        values.sort(key=lambda item: order.index(item[0]))
+    else:
+        values.sort(key=lambda item: (-item[1], str(item[0])))
+        del values[settings.FACET_MAX_VALUES:]
+    return [{"value": value, "count": count} for value, count in values]
+
+
+facet_index = FacetIndex()
+jobs_sync.subscribe(facet_index, FACET_COLUMNS)
@@ -0,0 +1,133 @@
+"""
+Per-user ranked feed cache
+
+The personalized feed is ranked once per user and search, and the full
+ranking is kept as compact (job id, score) arrays. Follow-up pages are
+served from the cached ranking with an opaque cursor token instead of
+re-fetching the profile and rescoring every candidate.
+
+Entries expire after a TTL, are evicted LRU beyond an entry and byte cap,
+are dropped when the user's profile changes, and are ignored once the
+jobs sync version moves. The cache is per process.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.pagination import decode_token, encode_token
+
+logger = logging.getLogger(__name__)
+
+
+class RankedFeed:
+    """A user's full feed ranking plus the profile view it was scored with"""
+
+    __slots__ = ("job_ids", "scores", "context", "jobs_version", "created_at")
+
+    def __init__(self, job_ids: Sequence[str], scores: Sequence[int], context: dict, jobs_version: int):
+        self.job_ids = np.array([str(j) for j in job_ids], dtype=np.bytes_)
+        self.scores = np.asarray(scores, dtype=np.int32)
+        self.context = context
+        self.jobs_version = jobs_version
+        self.created_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.job_ids.nbytes + self.scores.nbytes
+
+    def page(self, offset: int, limit: int) -> list:
+        """(job id, score) pairs for one page"""
+        ids = self.job_ids[offset:offset + limit]
+        scores = self.scores[offset:offset + limit]
+        return [(job_id.decode(), int(score)) for job_id, score in zip(ids, scores)]
+
+
+class FeedCache:
+    """TTL + LRU cache of RankedFeed entries with a memory cap"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, RankedFeed]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key):
+        feed = self._entries.pop(key, None)
+        if feed is not None:
+            self._bytes -= feed.nbytes
+
+    def get(self, key: tuple, jobs_version: int) -> Optional[RankedFeed]:
+        with self._lock:
+            feed = self._entries.get(key)
+            if feed is None:
+                return None
+            expired = time.monotonic() - feed.created_at > self.ttl_seconds
+            if expired or feed.jobs_version != jobs_version:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return feed
+
+    def put(self, key: tuple, feed: RankedFeed):
+        if feed.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = feed
+            self._bytes += feed.nbytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def invalidate_user(self, user_id: str):
+        """Drop every cached feed for a user (keys start with the user id)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+def encode_cursor(offset: int, jobs_version: int) -> str:
+    """Opaque next-page token"""
+    return encode_token({"o": offset, "v": jobs_version})
+
+
+def decode_cursor(token: str) -> Tuple[int, int]:
+    """
+    Decode a token from encode_cursor.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    payload = decode_token(token)
+    try:
+        offset, version = int(payload["o"]), int(payload["v"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if offset < 0:
+        raise ValueError("Invalid cursor: negative offset")
+    return offset, version
+
+
+feed_cache = FeedCache(
+    ttl_seconds=settings.FEED_CACHE_TTL_SECONDS,
+    max_entries=settings.FEED_CACHE_MAX_ENTRIES,
+    max_bytes=settings.FEED_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,267 @@
+"""
+Per-query database instrumentation
+
+Every table accessor in app.database returns its builder wrapped in
+TracedQuery, so each `.execute()` is recorded with its table, operation,
+latency, row count and response payload size. Records are attached to the
+current request (a contextvar set by the API middleware, carried into the
+DB thread pool by run_db) and summed into per-route histograms.
+
+Per request:
+    Server-Timing: db;dur=12.4;desc="3 queries, 41 rows, 18.2 KB", app;dur=20.9
+
+Aggregated:
+    GET /metrics/queries -> route_metrics.snapshot()
+
+With QUERY_BUDGET_ENFORCE on (dev/CI), a route that makes more database
+round trips than its budget raises RoundTripBudgetExceeded.
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("select", "insert", "upsert", "update", "delete")
+
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 8, 13)
+DB_MS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+BACKGROUND_ROUTE = "<background>"
+
+
+class RoundTripBudgetExceeded(AssertionError):
+    """A route made more database round trips than its configured budget"""
+
+
+@dataclass
+class QueryRecord:
+    table: str
+    operation: str
+    duration_ms: float = 0.0
+    rows: int = 0
+    payload_bytes: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class RequestStats:
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def round_trips(self) -> int:
+        return len(self.queries)
+
+    @property
+    def db_ms(self) -> float:
+        return sum(q.duration_ms for q in self.queries)
+
+    @property
+    def rows(self) -> int:
+        return sum(q.rows for q in self.queries)
+
+    @property
+    def payload_bytes(self) -> int:
+        return sum(q.payload_bytes for q in self.queries)
+
+    def server_timing(self, total_ms: Optional[float] = None) -> str:
+        """Value for the Server-Timing response header"""
+        noun = "query" if self.round_trips == 1 else "queries"
+        desc = f"{self.round_trips} {noun}, {self.rows} rows, {self.payload_bytes / 1024:.1f} KB"
+        header = f'db;dur={self.db_ms:.1f};desc="{desc}"'
+        if total_ms is not None:
+            header += f", app;dur={total_ms:.1f}"
+        return header
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+_current_query: ContextVar[Optional[QueryRecord]] = ContextVar("current_query", default=None)
+
+
+def start_request() -> RequestStats:
+    """Begin collecting queries for the current request context"""
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def current_request() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def tracing_query() -> bool:
+    """True while a traced query is executing in this context"""
+    return _current_query.get() is not None
+
+
+def add_payload_bytes(n: int):
+    """Called by the transport (or SQLite backend) as the response body is read"""
+    record = _current_query.get()
+    if record is not None:
+        record.payload_bytes += n
+
+
+def _row_count(data: Any) -> int:
+    if isinstance(data, list):
+        return len(data)
+    return 1 if data else 0
+
+
+class _Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> dict:
+        labels = [str(b) for b in self.bounds] + ["+Inf"]
+        return {"buckets": dict(zip(labels, self.counts)), "sum": round(self.total, 3), "max": round(self.max, 3)}
+
+
+class RouteMetrics:
+    """Per-route histograms of round trips and database time per request"""
+
+    def __init__(self):
+        self._routes: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _route(self, route: str) -> dict:
+        entry = self._routes.get(route)
+        if entry is None:
+            entry = self._routes[route] = {
+                "requests": 0,
+                "queries": 0,
+                "errors": 0,
+                "payload_bytes": 0,
+                "round_trips": _Histogram(ROUND_TRIP_BUCKETS),
+                "db_ms": _Histogram(DB_MS_BUCKETS),
+                "tables": {},
+            }
+        return entry
+
+    def observe_request(self, route: str, stats: RequestStats):
+        with self._lock:
+            entry = self._route(route)
+            entry["requests"] += 1
+            entry["round_trips"].observe(stats.round_trips)
+            entry["db_ms"].observe(stats.db_ms)
+            for query in stats.queries:
+                self._add_query(entry, query)
+
+    def observe_query(self, route: str, query: QueryRecord):
+        """Queries made outside a request (sync loop, scrapers)"""
+        with self._lock:
+            entry = self._route(route)
+            entry["requests"] += 1
+            entry["round_trips"].observe(1)
+            entry["db_ms"].observe(query.duration_ms)
+            self._add_query(entry, query)
+
+    @staticmethod
+    def _add_query(entry: dict, query: QueryRecord):
+        entry["queries"] += 1
+        entry["payload_bytes"] += query.payload_bytes
+        if query.error:
+            entry["errors"] += 1
+        key = f"{query.operation} {query.table}"
+        entry["tables"][key] = entry["tables"].get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                route: {
+                    **{k: v for k, v in entry.items() if k not in ("round_trips", "db_ms", "tables")},
+                    "round_trips": entry["round_trips"].snapshot(),
+                    "db_ms": entry["db_ms"].snapshot(),
+                    "tables": dict(entry["tables"]),
+                }
+                for route, entry in self._routes.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_metrics = RouteMetrics()
+
+
+def round_trip_budget(route: str) -> int:
+    return settings.QUERY_ROUND_TRIP_BUDGETS.get(route, settings.QUERY_ROUND_TRIP_BUDGET)
+
+
+def finish_request(route: str, stats: RequestStats):
+    """Record a finished request; enforces the round-trip budget in dev mode"""
+    route_metrics.observe_request(route, stats)
+    budget = round_trip_budget(route)
+    if stats.round_trips > budget:
+        calls = ", ".join(f"{q.operation} {q.table}" for q in stats.queries)
+        message = f"{route} made {stats.round_trips} database round trips (budget {budget}): {calls}"
+        if settings.QUERY_BUDGET_ENFORCE:
+            raise RoundTripBudgetExceeded(message)
+        logger.warning(message)
+
+
+class TracedQuery:
+    """Proxy for a supabase-py request builder that records `.execute()`"""
+
+    __slots__ = ("_builder", "_table", "_operation")
+
+    def __init__(self, builder, table: str, operation: str = "select"):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                operation = name if name in OPERATIONS else self._operation
+                return TracedQuery(result, self._table, operation)
+            return result
+
+        return call
+
+    def execute(self):
+        record = QueryRecord(self._table, self._operation)
+        token = _current_query.set(record)
+        start = time.perf_counter()
+        try:
+            res = self._builder.execute()
+            record.rows = _row_count(res.data)
+            return res
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            record.duration_ms = (time.perf_counter() - start) * 1000
+            _current_query.reset(token)
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.queries.append(record)
+            else:
+                route_metrics.observe_query(BACKGROUND_ROUTE, record)
+
+
+def traced_table(builder, table: str) -> TracedQuery:
+    return TracedQuery(builder, table)
@@ -0,0 +1,122 @@
+"""
+Derived job feature columns computed once at ingest time
+
+Scrapers call compute_job_features() on each formatted row before the
+upsert, so request handlers and database filters can read numeric and
+normalized columns instead of re-parsing raw text on every request.
+See sql/job_features.sql for the matching schema.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from app.constants import COMMON_SKILLS
+from app.job_scoring import company_tier, parse_experience_level
+from app.skill_matcher import get_skill_matcher
+
+# Columns written by compute_job_features
+FEATURE_COLUMNS = (
+    "min_years_experience",
+    "max_years_experience",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "company_tier",
+    "extracted_skills",
+    "role_tokens",
+)
+
+SKILL_VOCABULARY = frozenset(s.lower().strip() for s in COMMON_SKILLS if s and s.strip())
+
+_AMOUNT = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(crores?|cr|lakhs?|lpa|l|k|m)?\b")
+# Between the two bounds of a range ("10-15 lpa", "₹12 to ₹18l")
+_RANGE_SEPARATOR = re.compile(r"\s*(?:-|–|to)\s*[₹$€£]?\s*")
+_UNIT_MULTIPLIERS = {
+    "k": 1_000, "m": 1_000_000,
+    "l": 100_000, "lpa": 100_000, "lakh": 100_000, "lakhs": 100_000,
+    "cr": 10_000_000, "crore": 10_000_000, "crores": 10_000_000,
+}
+_CURRENCY_MARKERS = (
+    ("₹", "INR"), ("inr", "INR"), ("lpa", "INR"), ("lakh", "INR"), ("crore", "INR"),
+    ("$", "USD"), ("usd", "USD"), ("€", "EUR"), ("eur", "EUR"), ("£", "GBP"), ("gbp", "GBP"),
+)
+_ROLE_TOKEN = re.compile(r"[a-z0-9+#.]+")
+
+
+def parse_experience_range(exp_text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (min, max) years from experience_level text.
+    The minimum follows parse_experience_level; the maximum is only set for explicit ranges.
+    """
+    min_years = parse_experience_level(exp_text)
+    if min_years is None:
+        return None, None
+    range_match = re.match(r'(\d+)\s*[-–]\s*(\d+)', exp_text.strip().lower())
+    max_years = int(range_match.group(2)) if range_match else None
+    return min_years, max_years
+
+
+def parse_salary_range(salary: Optional[str]) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+    """
+    Normalize salary text to (min, max, currency).
+
+    Examples:
+        "₹12L - ₹18L" -> (1200000.0, 1800000.0, "INR")
+        "500000.0-800000.0 INR" -> (500000.0, 800000.0, "INR")
+        "$120k" -> (120000.0, 120000.0, "USD")
+        "10-15 LPA" -> (1000000.0, 1500000.0, "INR")  # a trailing unit covers the whole range
+        "Not disclosed" -> (None, None, None)
+    """
+    text = (salary or "").strip().lower()
+    if not text or text in ("nan", "none", "not disclosed", "hidden"):
+        return None, None, None
+
+    matches = list(_AMOUNT.finditer(text))
+    units = [match.group(2) for match in matches]
+    for i in reversed(range(len(matches) - 1)):
+        if not units[i] and _RANGE_SEPARATOR.fullmatch(text, matches[i].end(), matches[i + 1].start()):
+            units[i] = units[i + 1]
+    amounts = []
+    for match, unit in zip(matches, units):
+        try:
+            value = float(match.group(1).replace(",", ""))
+        except ValueError:
+            continue
+        amounts.append(value * _UNIT_MULTIPLIERS.get(unit or "", 1))
+    if not amounts:
+        return None, None, None
+
+    currency = next((code for marker, code in _CURRENCY_MARKERS if marker in text), None)
+    return min(amounts), max(amounts), currency
+
+
+def extract_job_skills(description: Optional[str], skills_required: Optional[List[str]] = None) -> List[str]:
+    """Normalized skills_required plus vocabulary skills found in the description"""
+    skills = {s.lower().strip() for s in (skills_required or []) if s and s.strip()}
+    skills.update(get_skill_matcher(SKILL_VOCABULARY).match(description or ""))
+    return sorted(skills)
+
+
+def role_tokens(role: Optional[str]) -> List[str]:
+    """Lowercased, de-duplicated tokens of a role title"""
+    return sorted(set(_ROLE_TOKEN.findall((role or "").lower())))
+
+
+def compute_job_features(job: dict) -> dict:
+    """
+    Derived columns for a formatted job row (jobs table schema).
+
+    Returns:
+        Dict with the keys in FEATURE_COLUMNS
+    """
+    min_years, max_years = parse_experience_range(job.get("experience_level"))
+    salary_min, salary_max, currency = parse_salary_range(job.get("salary_range"))
+    return {
+        "min_years_experience": min_years,
+        "max_years_experience": max_years,
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "salary_currency": currency,
+        "company_tier": company_tier(job.get("company")),
+        "extracted_skills": extract_job_skills(job.get("description"), job.get("skills_required")),
+        "role_tokens": role_tokens(job.get("role")),
+    }
@@ -0,0 +1,145 @@
+"""
+External job_id -> internal id resolution
+
+Routes take either the internal uuid or the scraper's external job_id
+(often the posting URL). Instead of `or_(id.eq.X,job_id.eq.X)`, which
+can't use one index and errors when X isn't a uuid, the reference is
+classified up front and looked up on the matching indexed column.
+
+Resolved pairs are kept in a bounded LRU map, filled from lookups and
+from listing responses, so detail views and saves of a job the process
+has seen cost one lookup by primary key (or none, for saves). The mapping
+is stable for a job's lifetime; a stale entry (job deleted) is dropped
+when a lookup or write reports it.
+"""
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from app.config import settings
+from app.database import get_jobs_collection
+from app.jobs_snapshot import jobs_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class JobIdCache:
+    """Bounded LRU map from a job reference (job_id or id) to the internal id"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._ids: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get(self, ref: str) -> Optional[str]:
+        with self._lock:
+            internal_id = self._ids.get(ref)
+            if internal_id is not None:
+                self._ids.move_to_end(ref)
+            return internal_id
+
+    def put(self, internal_id: str, job_id: Optional[str] = None):
+        """Remember a job under its internal id and, if given, its external job_id"""
+        internal_id = str(internal_id)
+        with self._lock:
+            for ref in (internal_id, job_id):
+                if ref:
+                    self._ids[ref] = internal_id
+                    self._ids.move_to_end(ref)
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+
+    def remember(self, rows: Iterable[Optional[dict]]):
+        """Learn the id pairs of listed jobs (rows with `id` and `job_id`; None is skipped)"""
+        for row in rows:
+            if row and row.get("id"):
+                self.put(row["id"], row.get("job_id"))
+
+    def discard(self, internal_id: str):
+        """Forget every reference to a job (e.g. it was deleted)"""
+        internal_id = str(internal_id)
+        with self._lock:
+            for ref in [ref for ref, value in self._ids.items() if value == internal_id]:
+                del self._ids[ref]
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+
+job_id_cache = JobIdCache(max_entries=settings.JOB_ID_CACHE_MAX_ENTRIES)
+
+
+def is_uuid(ref: str) -> bool:
+    """
+    Whether a reference can be an internal id: the canonical 8-4-4-4-12
+    form only, so urn:uuid:, braced and unhyphenated references are looked
+    up as job_ids.
+    """
+    try:
+        return str(uuid.UUID(ref)) == ref.lower()
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+
+def fetch_job(ref: str, columns: str) -> Optional[dict]:
+    """
+    A job by internal id or external job_id, via one indexed lookup.
+    Blocking; async routes call it through run_db.
+
+    Known references are read by primary key. A uuid-shaped reference is
+    tried as the id first and then as a job_id (scrapers may use uuids).
+
+    Returns:
+        The row with `columns` (plus id and job_id), or None if no job matches
+    """
+    names = [c.strip() for c in columns.split(",")]
+    names += [c for c in ("id", "job_id") if c not in names]
+    select = ",".join(names)
+
+    # Active jobs are served from the in-memory snapshot
+    snapshot = jobs_snapshot.get()
+    if snapshot is not None and snapshot.covers(names):
+        position = snapshot.find(ref)
+        if position is not None:
+            return snapshot.row(position, names)
+
+    jobs = get_jobs_collection()
+    internal_id = job_id_cache.get(ref)
+
+    if internal_id is not None:
+        res = jobs.select(select).eq("id", internal_id).limit(1).execute()
+        if res.data:
+            return res.data[0]
+        job_id_cache.discard(internal_id)  # deleted since it was cached
+
+    res = None
+    if is_uuid(ref):
+        res = jobs.select(select).eq("id", ref).limit(1).execute()
+    if not res or not res.data:
+        res = jobs.select(select).eq("job_id", ref).limit(1).execute()
+    if not res.data:
+        return None
+    row = res.data[0]
+    job_id_cache.put(row["id"], row.get("job_id"))
+    return row
+
+
+def resolve_job_id(ref: str) -> Optional[str]:
+    """
+    Internal id for a job reference, from the cache or one lookup.
+    Blocking; async routes call it through run_db.
+
+    Returns:
+        None if no job matches
+    """
+    internal_id = job_id_cache.get(ref)
+    if internal_id is not None:
+        return internal_id
+    row = fetch_job(ref, "id")
+    return str(row["id"]) if row else None
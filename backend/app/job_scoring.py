@@ -0,0 +1,248 @@
+"""
+Batch scoring engine for the personalized job feed
+
+Turns a list of candidate job rows into columnar arrays once, then scores
+every job against a user profile in a single NumPy pass. Scores are
+identical to the per-job scorer it replaced (kept as the reference in
+tests/test_job_scoring.py), so feed ranking does not change.
+"""
+import re
+import logging
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.skill_matcher import get_skill_matcher
+
+logger = logging.getLogger(__name__)
+
+# FAANG / Top Tech / Fortune 500 companies that earn the company-tier bonus
+FAANG_COMPANIES = frozenset({
+    "google", "amazon", "microsoft", "meta", "apple", "netflix", "uber", "airbnb",
+    "stripe", "linkedin", "atlassian", "salesforce", "oracle", "nvidia", "intel",
+    "ibm", "cisco", "adobe", "tesla", "spacex", "palantir", "databricks", "snowflake",
+    "bloomberg", "twilio", "spotify", "x", "twitter", "lyft", "doordash", "instacart",
+    "pinterest", "snap", "square", "block", "coinbase", "robinhood", "plaid"
+})
+
+HIGH_PAY_KEYWORDS = (
+    "100k", "120k", "150k", "200k", "250k", "300k",
+    "30l", "40l", "50l", "60l", "100,000", "150,000", "200,000", "crore", "cr"
+)
+
+UNDISCLOSED_SALARY = ("not disclosed", "hidden", "")
+
+# Salary buckets
+SALARY_NONE = 0
+SALARY_LISTED = 1
+SALARY_HIGH = 2
+
+# Points awarded per salary bucket (only high pay earns a bonus today)
+SALARY_POINTS = np.array([0, 0, 20], dtype=np.int64)
+
+# Skill points indexed by number of matched skills (capped at 7)
+SKILL_POINTS = np.array([0, 10, 20, 30, 30, 40, 40, 50], dtype=np.int64)
+
+COMPANY_TIER_POINTS = 40
+LOCATION_MISMATCH_PENALTY = 200
+
+_EXPERIENCE_LABELS = {
+    "entry": 0, "entry level": 0, "fresher": 0, "intern": 0, "internship": 0,
+    "junior": 1, "associate": 1,
+    "mid": 3, "mid-level": 3, "mid level": 3, "mid-senior": 3, "mid-senior level": 3,
+    "senior": 5, "lead": 7, "principal": 8,
+    "director": 10, "executive": 12, "vp": 12,
+    "not applicable": None,
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_experience_level(exp_text: Optional[str]) -> Optional[int]:
+    """
+    Parse experience_level text to a numeric min-years value.
+    Returns None if unparseable (meaning no requirement, always include).
+    Examples:
+        "Entry Level" -> 0
+        "1-3 years" -> 1
+        "3-5" -> 3
+        "Senior" -> 5
+        "Mid-Senior level" -> 3
+        None -> None
+    """
+    if not exp_text or exp_text.strip() == "" or exp_text.lower() == "nan":
+        return None
+
+    exp_text = exp_text.strip().lower()
+
+    # Direct range patterns like "1-3", "3-5 years", "0-2"
+    range_match = re.match(r'(\d+)\s*[-–]\s*(\d+)', exp_text)
+    if range_match:
+        return int(range_match.group(1))
+
+    # Single number like "2 years", "5+"
+    single_match = re.match(r'(\d+)', exp_text)
+    if single_match:
+        return int(single_match.group(1))
+
+    # Text labels
+    for label, val in _EXPERIENCE_LABELS.items():
+        if label in exp_text:
+            return val
+
+    return None
+
+
+def company_tier(company: Optional[str]) -> int:
+    """Return 1 for FAANG / top-tech companies, 0 otherwise"""
+    job_company = (company or "").lower()
+    for fc in FAANG_COMPANIES:
+        if fc == job_company or f"{fc} " in job_company or f" {fc}" in job_company:
+            return 1
+    return 0
+
+
+def salary_bucket(salary: Optional[str]) -> int:
+    """Classify a salary string into SALARY_NONE / SALARY_LISTED / SALARY_HIGH"""
+    salary_str = (salary or "").lower()
+    if not salary_str or salary_str in UNDISCLOSED_SALARY:
+        return SALARY_NONE
+    if any(k in salary_str for k in HIGH_PAY_KEYWORDS):
+        return SALARY_HIGH
+    return SALARY_LISTED
+
+
+def extract_skills_from_description(description: str, user_skills: set) -> list:
+    """
+    Find user skills mentioned in a job description text.
+    Returns list of matched skill strings.
+    """
+    if not description or not user_skills:
+        return []
+    return get_skill_matcher(user_skills).match(description)
+
+
+class JobFeatureColumns:
+    """Columnar view of a list of job rows, built once per candidate set"""
+
+    def __init__(self, jobs: Sequence[dict]):
+        self.jobs = jobs
+        self.size = len(jobs)
+
+        exp_min = np.full(self.size, np.nan, dtype=np.float64)
+        is_remote = np.zeros(self.size, dtype=bool)
+        tier = np.zeros(self.size, dtype=np.int64)
+        salary = np.zeros(self.size, dtype=np.int64)
+        roles = []
+        locations = []
+        skills_required = []
+        descriptions = []
+
+        for i, job in enumerate(jobs):
+            # Prefer columns precomputed at ingest (app/job_features.py); NULL until backfilled
+            exp = job.get("min_years_experience")
+            if exp is None:
+                exp = parse_experience_level(job.get("experience_level"))
+            if exp is not None:
+                exp_min[i] = exp
+            is_remote[i] = bool(job.get("is_remote"))
+            if job.get("company_tier") is not None:
+                tier[i] = job["company_tier"]
+            else:
+                tier[i] = company_tier(job.get("company"))
+            salary[i] = salary_bucket(job.get("salary"))
+            roles.append((job.get("role") or "").lower())
+            locations.append((job.get("location") or "").lower())
+            skills_required.append(
+                frozenset(s.lower() for s in (job.get("skills_required") or []))
+            )
+            descriptions.append(job.get("description", ""))
+
+        self.exp_min = exp_min
+        self.is_remote = is_remote
+        self.company_tier = tier
+        self.salary_bucket = salary
+        self.roles = np.array(roles, dtype=str)
+        self.locations = np.array(locations, dtype=str)
+        self.skills_required = skills_required
+        self.descriptions = descriptions
+
+
+class BatchJobScorer:
+    """Score many jobs against one user profile in a single vectorized pass"""
+
+    def match_skills(self, columns: JobFeatureColumns, user_skills: set) -> List[list]:
+        """Matched skills per job: skills_required overlap plus description hits"""
+        matches = []
+        matcher = get_skill_matcher(user_skills) if user_skills else None
+        for required, description in zip(columns.skills_required, columns.descriptions):
+            matched = set(matcher.match(description)) if matcher else set()
+            if user_skills and required:
+                matched.update(user_skills & required)
+            matches.append(list(matched))
+        return matches
+
+    def score(
+        self,
+        columns: JobFeatureColumns,
+        user_experience,
+        preferred_role: Optional[str],
+        preferred_location: Optional[str],
+        user_skills: set
+    ) -> Tuple[np.ndarray, List[list]]:
+        """
+        Score every job in `columns`.
+
+        Returns:
+            Tuple of (scores as int64 array, matching skills per job)
+        """
+        n = columns.size
+        matches = self.match_skills(columns, user_skills)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64), matches
+
+        # === SKILLS (50 pts max) ===
+        skill_counts = np.fromiter((len(m) for m in matches), dtype=np.int64, count=n)
+        scores = SKILL_POINTS[np.minimum(skill_counts, len(SKILL_POINTS) - 1)].copy()
+
+        # === ROLE (50 pts max) ===
+        if preferred_role:
+            role_keywords = [
+                w for w in preferred_role.lower().replace("-", " ").split() if len(w) > 2
+            ]
+            matched_keywords = np.zeros(n, dtype=np.int64)
+            for kw in role_keywords:
+                matched_keywords += np.char.find(columns.roles, kw) >= 0
+            role_points = np.minimum(
+                (matched_keywords / max(len(role_keywords), 1) * 50).astype(np.int64), 50
+            )
+            scores += np.where(matched_keywords > 0, role_points, 0)
+
+        # === LOCATION ===
+        if preferred_location:
+            pref_locs = [loc.strip().lower() for loc in preferred_location.split(",") if loc.strip()]
+            loc_match = np.zeros(n, dtype=bool)
+            for pref_loc in pref_locs:
+                loc_match |= np.char.find(columns.locations, pref_loc) >= 0
+            location_matched = columns.is_remote | loc_match
+            scores += np.where(location_matched, 30, -LOCATION_MISMATCH_PENALTY)
+        else:
+            scores += np.where(columns.is_remote, 30, 10)
+
+        # === EXPERIENCE (10 pts) ===
+        exp = columns.exp_min
+        no_requirement = np.isnan(exp)
+        with np.errstate(invalid="ignore"):
+            good_fit = exp <= user_experience + 1
+            stretch = exp <= user_experience + 3
+        scores += np.where(no_requirement, 5, np.where(good_fit, 10, np.where(stretch, 5, 0)))
+        exp_is_fit = no_requirement | stretch
+
+        # === COMPANY TIER AND HIGH SALARY BONUS ===
+        bonus = columns.company_tier * COMPANY_TIER_POINTS + SALARY_POINTS[columns.salary_bucket]
+        scores += np.where(exp_is_fit, bonus, 0)
+
+        return scores, matches
+
+
+batch_scorer = BatchJobScorer()
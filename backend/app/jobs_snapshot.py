@@ -0,0 +1,547 @@
+"""
+Immutable in-memory snapshot of the active jobs
+
+JobsSync pulls the jobs table on startup and then as updated_at deltas,
+so the API process already sees every change the scraper makes. The store
+builds an immutable, columnar JobsSnapshot from each change and swaps it
+in with a single reference assignment (a delta copies the unchanged jobs'
+column buffers rather than rebuilding them). A request reads one
+consistent version without locking, and most reads become memory lookups:
+- listings, by keyset cursor or offset
+- rows by id for feeds and search pages
+- single jobs by id or job_id
+
+The snapshot holds active jobs only; feeds and search pages skip the ids
+it knows are inactive. Lookups it can't answer (a single inactive job,
+columns it doesn't hold, rows newer than the last sync) fall back to the
+database, and every reader falls back while the first sync is pending.
+
+With JOBS_SNAPSHOT_PATH set (several uvicorn/gunicorn workers), the
+snapshot lives in a memory-mapped file instead (see app/columnar.py). One
+worker holds an flock on `<path>.lock` and writes each new version with an
+atomic rename. Every worker, the writer included, maps the current file
+read-only, so the corpus is in memory once and all workers serve the same
+version. Only the writer syncs from the database: the other workers serve
+the file as soon as it exists and load their JobsSync indexes from it,
+applying the delta each version records. If the writer exits, the next
+worker to refresh takes the lock over and syncs in its place.
+"""
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.columnar import DictionaryColumn, map_columns, splice, write_columns
+from app.config import settings
+from app.jobs_sync import jobs_sync
+from app.pagination import decode_keyset_cursor, encode_keyset_cursor
+from app.projections import DETAIL_COLUMNS, SCORING_COLUMNS
+from app.ranking import recency_key
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every worker writes the file
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Everything the API reads, plus what the other JobsSync subscribers index,
+# so workers following a shared file can build their indexes from it
+SNAPSHOT_COLUMNS = tuple(dict.fromkeys(DETAIL_COLUMNS + SCORING_COLUMNS + ("extracted_skills",)))
+
+# Low-cardinality text stored as codes into a table of distinct values
+_DICTIONARY_COLUMNS = frozenset(
+    ("company", "location", "job_type", "experience_level", "salary_range", "salary_currency")
+)
+
+# Filtered listings (positions in listing order) kept per snapshot
+_LISTING_CACHE_SIZE = 256
+
+# Index columns stored alongside the job columns in a snapshot file
+_IDS, _INACTIVE, _BY_ID, _BY_JOB_ID = "_ids", "_inactive", "_by_id", "_by_job_id"
+
+
+def _sort_key(posted_at, job_id: str) -> tuple:
+    """Listing order (posted_at DESC NULLS LAST, id DESC) as an ascending key"""
+    return posted_at is not None, recency_key(posted_at), job_id
+
+
+def columns_of(select: str) -> List[str]:
+    return [c.strip() for c in select.split(",") if c.strip()]
+
+
+def _search(order: Sequence[int], column: Sequence, ref: str) -> Optional[int]:
+    """Position whose `column` value is `ref`, via positions sorted by that column"""
+    i = bisect_left(order, ref, key=lambda position: column[position])
+    if i < len(order) and column[order[i]] == ref:
+        return order[i]
+    return None
+
+
+def _contains(sorted_values: Sequence[str], value: str) -> bool:
+    i = bisect_left(sorted_values, value)
+    return i < len(sorted_values) and sorted_values[i] == value
+
+
+def _segments(size: int, dropped: Iterable[int], inserts: Dict[int, list]) -> List[Union[range, list]]:
+    """
+    Splice plan (see columnar.splice) for a column of `size` cells with the
+    `dropped` positions left out and each `inserts` list placed before its
+    position (`size` appends).
+    """
+    dropped = set(dropped)
+    segments = []
+    start = 0
+    for position in sorted(dropped.union(inserts)):
+        if start < position:
+            segments.append(range(start, position))
+        start = position
+        if position in inserts:
+            segments.append(inserts[position])
+        if position in dropped:
+            start = position + 1
+    if start < size:
+        segments.append(range(start, size))
+    return segments
+
+
+def _reindex(order: Sequence[int], old_to_new: np.ndarray, column: Sequence, added: List[Tuple[int, str]]) -> array:
+    """Positions sorted by `column`: `order` remapped to new positions, with `added` (position, value) merged in"""
+    kept = old_to_new[np.frombuffer(order, dtype=np.uint32)] if len(order) else np.zeros(0, dtype=np.int64)
+    kept = kept[kept >= 0].tolist()
+    added = sorted(added, key=lambda item: item[1])
+    at = [bisect_left(kept, value, key=lambda position: column[position]) for _, value in added]
+    merged = array("I")
+    merged.frombytes(np.insert(kept, at, [position for position, _ in added]).astype(np.uint32).tobytes())
+    return merged
+
+
+class JobsSnapshot:
+    """
+    Columnar copy of the active jobs, in listing order; never mutated after
+    construction. Columns are plain sequences, built in memory by `build`
+    or mapped from a file by `open`.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        built_at: float,
+        ids: Sequence[str],
+        columns: Dict[str, Sequence],
+        inactive: Sequence[str],
+        by_id: Sequence[int],
+        by_job_id: Sequence[int],
+        mapped_bytes: int = 0,
+        changes: Optional[dict] = None,
+    ):
+        self.version = version
+        self.built_at = built_at
+        self.size = len(ids)
+        self.ids = ids
+        self.inactive = inactive  # sorted ids of known inactive jobs
+        self.mapped_bytes = mapped_bytes
+        # {"previous": version, "ids": [...]} when derived from the previous version by `apply`
+        self.changes = changes
+        self._columns = columns
+        self._by_id = by_id  # positions sorted by id
+        self._by_job_id = by_job_id  # positions with a job_id, sorted by it
+        self._listings: "OrderedDict[tuple, Sequence[int]]" = OrderedDict()
+        self._listings_lock = threading.Lock()
+
+    @classmethod
+    def build(cls, rows: Iterable[dict], version: int) -> "JobsSnapshot":
+        rows = list(rows)
+        active = sorted(
+            (r for r in rows if r.get("is_active") is not False),
+            key=lambda r: _sort_key(r.get("posted_at"), str(r["id"])),
+            reverse=True,
+        )
+        ids = tuple(str(r["id"]) for r in active)
+        columns = {}
+        for column in SNAPSHOT_COLUMNS:
+            if column == "id":
+                continue
+            raw = [r.get(column) for r in active]
+            columns[column] = DictionaryColumn.encode(raw) if column in _DICTIONARY_COLUMNS else tuple(raw)
+        job_ids = columns["job_id"]
+        return cls(
+            version,
+            time.time(),
+            ids,
+            columns,
+            inactive=tuple(sorted(str(r["id"]) for r in rows if r.get("is_active") is False)),
+            by_id=array("I", sorted(range(len(ids)), key=ids.__getitem__)),
+            by_job_id=array("I", sorted((p for p in range(len(ids)) if job_ids[p]), key=job_ids.__getitem__)),
+        )
+
+    def apply(self, rows: Iterable[dict], version: int, removed: Iterable[str] = ()) -> "JobsSnapshot":
+        """
+        This snapshot with inserted or updated `rows` and deleted `removed`
+        ids applied. Unchanged jobs are copied column by column (see
+        columnar.splice), not decoded, so the cost follows the delta.
+        """
+        changed = {str(r["id"]): r for r in rows}
+        removed = [str(job_id) for job_id in removed if str(job_id) not in changed]
+        touched = list(changed) + removed
+
+        # Active jobs: drop every touched job, re-insert the active ones in listing order
+        dropped = [p for p in (_search(self._by_id, self.ids, job_id) for job_id in touched) if p is not None]
+        kept = np.delete(np.arange(self.size), dropped).tolist()
+        posted = self._columns["posted_at"]
+        inserts: Dict[int, list] = {}
+        for row in sorted(
+            (r for r in changed.values() if r.get("is_active") is not False),
+            key=lambda r: _sort_key(r.get("posted_at"), str(r["id"])),
+            reverse=True,
+        ):
+            after = _sort_key(row.get("posted_at"), str(row["id"]))
+            i = bisect_left(kept, True, key=lambda p: _sort_key(posted[p], self.ids[p]) < after)
+            inserts.setdefault(kept[i] if i < len(kept) else self.size, []).append(row)
+        segments = _segments(self.size, dropped, inserts)
+
+        def cells(column: str) -> list:
+            return [s if isinstance(s, range) else [str(r["id"]) if column == "id" else r.get(column) for r in s]
+                    for s in segments]
+
+        ids = splice(self.ids, cells("id"))
+        columns = {name: splice(column, cells(name)) for name, column in self._columns.items()}
+
+        old_to_new = np.full(self.size, -1, dtype=np.int64)
+        added = []
+        position = 0
+        for segment in segments:
+            if isinstance(segment, range):
+                old_to_new[segment.start:segment.stop] = np.arange(position, position + len(segment))
+            else:
+                added.extend((position + k, row) for k, row in enumerate(segment))
+            position += len(segment)
+        by_id = _reindex(self._by_id, old_to_new, ids, [(p, str(r["id"])) for p, r in added])
+        job_ids = columns["job_id"]
+        by_job_id = _reindex(self._by_job_id, old_to_new, job_ids, [(p, r["job_id"]) for p, r in added if r.get("job_id")])
+
+        # Inactive ids: drop every touched job, insert the ones deactivated now
+        gone = [bisect_left(self.inactive, job_id) for job_id in touched if _contains(self.inactive, job_id)]
+        deactivated = {}
+        for job_id in sorted(j for j, r in changed.items() if r.get("is_active") is False):
+            deactivated.setdefault(bisect_left(self.inactive, job_id), []).append(job_id)
+        inactive = splice(self.inactive, _segments(len(self.inactive), gone, deactivated))
+
+        return JobsSnapshot(
+            version, time.time(), ids, columns, inactive, by_id, by_job_id,
+            changes={"previous": self.version, "ids": touched},
+        )
+
+    def write(self, path: str):
+        """Write this snapshot as a file every worker can map (atomic rename)"""
+        columns = {
+            _IDS: ("text", self.ids),
+            _INACTIVE: ("text", self.inactive),
+            _BY_ID: ("u32", self._by_id),
+            _BY_JOB_ID: ("u32", self._by_job_id),
+        }
+        for name, column in self._columns.items():
+            columns[name] = ("dict", column) if isinstance(column, DictionaryColumn) else ("json", column)
+        meta = {"version": self.version, "built_at": self.built_at, "changes": self.changes}
+        write_columns(path, meta, columns)
+
+    @classmethod
+    def open(cls, path: str) -> "JobsSnapshot":
+        """Map a snapshot file read-only; cells are decoded as they are read"""
+        meta, columns, mapped_bytes = map_columns(path)
+        return cls(
+            meta["version"],
+            meta["built_at"],
+            columns.pop(_IDS),
+            columns,
+            inactive=columns.pop(_INACTIVE),
+            by_id=columns.pop(_BY_ID),
+            by_job_id=columns.pop(_BY_JOB_ID),
+            mapped_bytes=mapped_bytes,
+            changes=meta.get("changes"),
+        )
+
+    def __len__(self) -> int:
+        return self.size
+
+    def covers(self, columns: Iterable[str]) -> bool:
+        return all(c == "id" or c in self._columns for c in columns)
+
+    def row(self, position: int, columns: Iterable[str]) -> dict:
+        return {
+            c: self.ids[position] if c == "id" else self._columns[c][position]
+            for c in columns
+        }
+
+    def find(self, ref: str) -> Optional[int]:
+        """Position of a job by internal id or external job_id"""
+        position = _search(self._by_id, self.ids, ref)
+        return position if position is not None else _search(self._by_job_id, self._columns["job_id"], ref)
+
+    def rows(self, job_ids: Iterable[str], columns: Sequence[str]) -> Tuple[List[dict], List[str]]:
+        """
+        Returns:
+            (active rows found, in input order; ids the snapshot doesn't know)
+        """
+        found, missing = [], []
+        for job_id in job_ids:
+            position = _search(self._by_id, self.ids, str(job_id))
+            if position is None:
+                if not _contains(self.inactive, str(job_id)):
+                    missing.append(job_id)
+            else:
+                found.append(self.row(position, columns))
+        return found, missing
+
+    def newest(self, limit: int, columns: Sequence[str]) -> List[dict]:
+        return [self.row(i, columns) for i in range(min(limit, self.size))]
+
+    def _filtered(
+        self,
+        location: Optional[str],
+        remote_only: bool,
+        experience: Optional[int],
+        experience_level: Optional[str],
+    ) -> Sequence[int]:
+        """Positions matching the listing filters, in listing order"""
+        key = (location.lower() if location else None, remote_only, experience, experience_level)
+        with self._listings_lock:
+            positions = self._listings.get(key)
+            if positions is not None:
+                self._listings.move_to_end(key)
+                return positions
+
+        positions = range(self.size)
+        if location:
+            column = self._columns["location"]
+            allowed = column.matching_codes(lambda value: bool(value) and key[0] in value.lower())
+            codes = column.codes
+            positions = [i for i in positions if codes[i] in allowed]
+        if remote_only:
+            is_remote = self._columns["is_remote"]
+            positions = [i for i in positions if is_remote[i]]
+        if experience is not None:
+            min_years = self._columns["min_years_experience"]
+            positions = [i for i in positions if min_years[i] is None or min_years[i] <= experience + 1]
+        if experience_level:
+            column = self._columns["experience_level"]
+            allowed = column.matching_codes(lambda value: value == experience_level)
+            codes = column.codes
+            positions = [i for i in positions if codes[i] in allowed]
+        if not isinstance(positions, range):
+            positions = array("I", positions)
+
+        with self._listings_lock:
+            self._listings[key] = positions
+            while len(self._listings) > _LISTING_CACHE_SIZE:
+                self._listings.popitem(last=False)
+        return positions
+
+    def listing(
+        self,
+        columns: Sequence[str],
+        limit: int,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        location: Optional[str] = None,
+        remote_only: bool = False,
+        experience: Optional[int] = None,
+        experience_level: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str], int]:
+        """
+        One listing page in (posted_at, id) DESC order; cursors are the same
+        keyset tokens the database path issues.
+
+        Returns:
+            (page rows, next cursor, total matching)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        positions = self._filtered(location, remote_only, experience, experience_level)
+        start = skip
+        if cursor:
+            value, last_id = decode_keyset_cursor(cursor)
+            after = _sort_key(value, last_id)
+            posted = self._columns["posted_at"]
+            # First position strictly after the cursor row in listing order
+            boundary = bisect_left(
+                range(self.size), True, key=lambda i: _sort_key(posted[i], self.ids[i]) < after
+            )
+            start = bisect_left(positions, boundary)
+        page = [self.row(i, columns) for i in positions[start:start + limit]]
+        next_cursor = None
+        if page and start + limit < len(positions):
+            next_cursor = encode_keyset_cursor(page[-1], "posted_at")
+        return page, next_cursor, len(positions)
+
+
+class SnapshotStore:
+    """
+    Builds a new JobsSnapshot on every JobsSync change and swaps it in.
+    With a `path`, only the worker holding the file lock builds; every
+    worker serves the mapped file, and the others follow it (see `pull`)
+    instead of syncing from the database themselves.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.current: Optional[JobsSnapshot] = None
+        self._lock = threading.Lock()
+        self._lock_fd: Optional[int] = None
+        self._file_id: Optional[tuple] = None
+        self._checked_at = 0.0
+
+    @property
+    def is_writer(self) -> bool:
+        return self.path is None or fcntl is None or self._lock_fd is not None
+
+    @property
+    def version(self) -> int:
+        return self.current.version if self.current else 0
+
+    def get(self) -> Optional[JobsSnapshot]:
+        """
+        The live snapshot, or None until one has loaded: in this worker's
+        jobs sync, or in the shared file when there is one.
+        """
+        if self.path:
+            if time.monotonic() - self._checked_at >= settings.JOBS_SNAPSHOT_POLL_SECONDS:
+                self._follow()
+            return self.current
+        return self.current if jobs_sync.ready else None
+
+    def _follow(self):
+        """Map the snapshot file if it has been replaced since it was last mapped"""
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_id == self._file_id:
+            return
+        try:
+            snapshot = JobsSnapshot.open(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not map jobs snapshot {self.path}: {e}")
+            return
+        self._file_id = file_id
+        self.current = snapshot
+        logger.debug(f"Mapped jobs snapshot v{snapshot.version} ({len(snapshot)} jobs, {snapshot.mapped_bytes} bytes)")
+
+    def _acquire_writer(self) -> bool:
+        """Become the worker that writes the snapshot file, if no other worker is"""
+        if self.is_writer:
+            return True
+        fd = os.open(f"{self.path}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        logger.info(f"Worker {os.getpid()} now writes the shared jobs snapshot {self.path}")
+        self._follow()  # continue the version numbering of the previous writer
+        return True
+
+    def acquire_writer(self) -> bool:
+        """Whether this worker writes the snapshot (taking the file lock over if it is free)"""
+        with self._lock:
+            return self._acquire_writer()
+
+    def pull(self, since: int) -> Optional[Tuple[int, List[dict], bool]]:
+        """
+        Changes in the shared file since version `since`, for a worker that
+        follows it instead of syncing.
+
+        Returns:
+            None if the file is still at `since`, else (version, rows, full):
+            every job when `full`, else only the jobs changed since `since`
+            (inactive and deleted ones as {"id", "is_active": False})
+        """
+        with self._lock:
+            self._follow()
+            snapshot = self.current
+        if snapshot is None or snapshot.version == since:
+            return None
+        changes = snapshot.changes
+        if since and changes and changes["previous"] == since:
+            rows, _ = snapshot.rows(changes["ids"], SNAPSHOT_COLUMNS)
+            found = {row["id"] for row in rows}
+            rows.extend({"id": job_id, "is_active": False} for job_id in changes["ids"] if job_id not in found)
+            return snapshot.version, rows, False
+        rows = [snapshot.row(i, SNAPSHOT_COLUMNS) for i in range(len(snapshot))]
+        return snapshot.version, rows, True
+
+    def _swap(self, build: Callable[[int], JobsSnapshot]):
+        started = time.perf_counter()
+        snapshot = build(self.version + 1)
+        if self.path:
+            snapshot.write(self.path)
+            self._follow()  # serve the mapped file like every other worker
+        else:
+            self.current = snapshot
+        logger.info(
+            f"Jobs snapshot v{snapshot.version}: {len(snapshot)} active jobs "
+            f"(built in {(time.perf_counter() - started) * 1000:.0f}ms)"
+        )
+
+    def _apply(self, rows: Iterable[dict], removed: Iterable[str] = ()):
+        """Copy the current snapshot with the delta applied; readers keep the old one until the swap"""
+        current = self.current
+        if current is None:
+            self._swap(lambda version: JobsSnapshot.build(rows, version))
+        else:
+            self._swap(lambda version: current.apply(rows, version, removed))
+
+    def reset(self, rows: List[dict]):
+        with self._lock:
+            if not self._acquire_writer():
+                self._follow()
+                return
+            self._swap(lambda version: JobsSnapshot.build(rows, version))
+
+    def upsert(self, rows: List[dict]):
+        with self._lock:
+            if not self._acquire_writer():
+                self._follow()
+                return
+            self._apply(rows)
+
+    def remove(self, job_ids: Iterable[str]):
+        with self._lock:
+            if not self._acquire_writer():
+                self._follow()
+                return
+            self._apply((), removed=job_ids)
+
+    def stats(self) -> dict:
+        snapshot = self.current
+        stats = {"version": 0, "jobs": 0, "age_seconds": None}
+        if snapshot is not None:
+            stats.update(
+                version=snapshot.version,
+                jobs=len(snapshot),
+                age_seconds=round(time.time() - snapshot.built_at, 1),
+            )
+        if self.path:
+            stats.update(
+                path=self.path,
+                role="writer" if self.is_writer else "reader",
+                mapped_bytes=snapshot.mapped_bytes if snapshot else 0,
+            )
+        return stats
+
+
+jobs_snapshot = SnapshotStore(settings.JOBS_SNAPSHOT_PATH)
+# Swapped in after the indexes, so a reader never sees a snapshot newer than the search index
+jobs_sync.subscribe(jobs_snapshot, SNAPSHOT_COLUMNS, last=True)
+if jobs_snapshot.path:
+    jobs_sync.share(jobs_snapshot)
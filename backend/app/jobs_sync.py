@@ -0,0 +1,172 @@
+"""
+Keeps process-local job indexes in step with the jobs table
+
+The scraper writes to Supabase from a separate process, so the API pulls
+changes instead of being told about them: a full load on startup and
+periodically (to pick up deletions), and `updated_at` deltas in between.
+Indexes subscribe and receive the rows they need.
+
+When several workers share a snapshot file (see app/jobs_snapshot.py),
+only the worker holding its lock syncs from the database. The others
+follow the file: they load their indexes from it and apply the delta each
+new version records, so the database sees one sync per deployment, not
+one per worker.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import List, Optional, Set
+
+from app.config import settings
+from app.database import get_jobs_collection
+
+logger = logging.getLogger(__name__)
+
+
+class JobsSync:
+    """Pull job rows from the database and fan them out to subscribers"""
+
+    def __init__(self, page_size: int = 1000):
+        self.page_size = page_size
+        self.version = 0
+        self.ready = False
+        self._columns: Set[str] = {"id", "updated_at"}
+        self._subscribers = []
+        self._last_subscribers = []
+        self._watermark: Optional[str] = None
+        self._ids_at_watermark: Set[str] = set()
+        self._last_full_refresh = 0.0
+        self._shared = None
+        self._lock = threading.RLock()
+
+    def subscribe(self, subscriber, columns, last: bool = False):
+        """
+        Register an index.
+
+        Subscribers implement `reset(rows)` (full reload) and `upsert(rows)`
+        (delta), and declare the job columns they read. `last` subscribers
+        receive each change after all the others, whatever the import order.
+        """
+        self._columns.update(columns)
+        (self._last_subscribers if last else self._subscribers).append(subscriber)
+
+    @property
+    def subscribers(self) -> list:
+        return self._subscribers + self._last_subscribers
+
+    def share(self, source):
+        """
+        Follow `source` (a SnapshotStore with a shared file) unless this
+        worker is the one writing it
+        """
+        self._shared = source
+
+    @property
+    def following(self) -> bool:
+        return self._shared is not None and not self._shared.is_writer
+
+    @property
+    def select_columns(self) -> str:
+        return ",".join(sorted(self._columns))
+
+    def _fetch(self, since: Optional[str] = None) -> List[dict]:
+        """Page through jobs, optionally only rows updated at/after `since`"""
+        jobs = get_jobs_collection()
+        rows = []
+        start = 0
+        while True:
+            query = jobs.select(self.select_columns)
+            if since:
+                query = query.gte("updated_at", since).order("updated_at")
+            else:
+                query = query.order("id")
+            page = query.range(start, start + self.page_size - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            start += self.page_size
+
+    def _advance_watermark(self, rows: List[dict]):
+        stamps = [r["updated_at"] for r in rows if r.get("updated_at")]
+        if not stamps:
+            return
+        latest = max(stamps)
+        if self._watermark is None or latest > self._watermark:
+            self._watermark = latest
+            self._ids_at_watermark = set()
+        self._ids_at_watermark.update(
+            str(r["id"]) for r in rows if r.get("updated_at") == self._watermark
+        )
+
+    def refresh(self, full: bool = False) -> bool:
+        """
+        Bring subscribers up to date.
+
+        Returns:
+            True if any rows changed
+        """
+        with self._lock:
+            if self._shared is not None and not self._shared.acquire_writer():
+                return self._follow()
+            due_full = time.monotonic() - self._last_full_refresh >= settings.JOBS_SYNC_FULL_REFRESH_SECONDS
+            if full or not self.ready or due_full or self._watermark is None:
+                rows = self._fetch()
+                self._watermark = None
+                for subscriber in self.subscribers:
+                    subscriber.reset(rows)
+                self._last_full_refresh = time.monotonic()
+                self.ready = True
+            else:
+                try:
+                    rows = self._fetch(since=self._watermark)
+                except Exception as e:
+                    # Fall back to a full reload rather than serving a stale index
+                    logger.warning(f"Delta job sync failed, doing full reload: {e}")
+                    self._watermark = None
+                    return self.refresh(full=True)
+                # The delta is inclusive of the watermark; skip rows already applied
+                rows = [
+                    r for r in rows
+                    if not (r.get("updated_at") == self._watermark and str(r["id"]) in self._ids_at_watermark)
+                ]
+                if not rows:
+                    return False
+                for subscriber in self.subscribers:
+                    subscriber.upsert(rows)
+            self._advance_watermark(rows)
+            self.version = self._shared.version if self._shared is not None else self.version + 1
+            logger.info(f"Job sync applied {len(rows)} rows (version {self.version})")
+            return True
+
+    def _follow(self) -> bool:
+        """Apply the shared file's changes to the other subscribers, without reading the database"""
+        pulled = self._shared.pull(self.version if self.ready else 0)
+        if pulled is None:
+            return False
+        version, rows, full = pulled
+        for subscriber in self.subscribers:
+            if subscriber is not self._shared:
+                if full:
+                    subscriber.reset(rows)
+                else:
+                    subscriber.upsert(rows)
+        # Syncing from the database again (on taking the writer lock over) starts with a full load
+        self._watermark = None
+        self.version = version
+        self.ready = True
+        logger.info(f"Job sync followed the shared snapshot: {len(rows)} rows (version {version})")
+        return True
+
+    async def run_forever(self):
+        """Background refresh loop started from the app lifespan"""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"Job sync failed: {e}")
+            interval = settings.JOBS_SNAPSHOT_POLL_SECONDS if self.following else settings.JOBS_SYNC_INTERVAL_SECONDS
+            await asyncio.sleep(interval)
+
+
+jobs_sync = JobsSync()
@@ -0,0 +1,92 @@
+"""
+Opaque cursor tokens and keyset pagination helpers
+
+Listings are ordered by (sort column DESC, id DESC). A keyset cursor holds
+the sort value and id of the last row served; the next page filters for
+rows strictly after it, so deep pages cost the same as the first and rows
+inserted by the scraper never shift later pages. NULL sort values are
+ordered last.
+"""
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+
+def encode_token(payload: dict) -> str:
+    """Encode a small dict as a URL-safe opaque token"""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str) -> dict:
+    """
+    Decode a token from encode_token.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def encode_keyset_cursor(row: dict, column: str) -> str:
+    return encode_token({"k": row.get(column), "id": str(row["id"])})
+
+
+def decode_keyset_cursor(token: str) -> Tuple[Optional[Any], str]:
+    """
+    Returns:
+        (sort value, row id) of the last row on the previous page
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    payload = decode_token(token)
+    if "k" not in payload or not payload.get("id"):
+        raise ValueError("Invalid cursor")
+    return payload["k"], str(payload["id"])
+
+
+def _quote(value) -> str:
+    """Quote a value for PostgREST logic-tree filters (timestamps contain ':' and '+')"""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def keyset_order(query, column: str):
+    """Apply the stable (column DESC NULLS LAST, id DESC) ordering"""
+    return query.order(column, desc=True, nullsfirst=False).order("id", desc=True)
+
+
+def apply_keyset(query, column: str, cursor: str):
+    """
+    Restrict `query` to rows after the cursor in keyset_order.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    value, last_id = decode_keyset_cursor(cursor)
+    if value is None:
+        return query.is_(column, "null").lt("id", last_id)
+    value, last_id = _quote(value), _quote(last_id)
+    return query.or_(
+        f"{column}.lt.{value},and({column}.eq.{value},id.lt.{last_id}),{column}.is.null"
+    )
+
+
+def keyset_page(rows: List[dict], limit: int, column: str) -> Tuple[List[dict], Optional[str]]:
+    """
+    Split a `limit + 1` fetch into the page and the next cursor.
+
+    Returns:
+        (page rows, next cursor or None when this is the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_keyset_cursor(page[-1], column)
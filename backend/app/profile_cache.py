@@ -0,0 +1,171 @@
+"""
+Per-user profile cache
+
+The feed, recommendations, job detail and profile status endpoints all
+need the caller's profile row, and a user browsing the feed and opening
+jobs used to re-fetch it (parsed_data blob included) on every request.
+Profiles are now loaded once and kept as a ProfileView: the raw row plus
+the normalized matching inputs (skill set, experience, preferred role and
+locations), so the skill-flattening fallbacks run once per profile version.
+
+Entries expire after a short TTL, which bounds staleness across worker
+processes, and are dropped by every profile write path in this process
+(profile update, resume parsing, quick signup). The cache is per process.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.database import get_profiles_collection
+
+logger = logging.getLogger(__name__)
+
+SKILL_CATEGORIES = ("technical", "programming_languages", "tools_frameworks")
+
+
+def _skills_from_dict(skills_data: dict) -> list:
+    skills = skills_data.get("all_skills_normalized") or []
+    if not skills:
+        # Flatten from categories
+        for category in SKILL_CATEGORIES:
+            skills = skills + (skills_data.get(category) or [])
+    return skills
+
+
+def flatten_skills(profile: dict) -> Tuple[str, ...]:
+    """
+    Lowercased, de-duplicated skills of a profile row, in their stored order.
+    Tries the top-level `skills` column (a list, or the categorized dict)
+    first, then falls back to parsed_data.skills. In a dict,
+    all_skills_normalized wins over the categories; raw all_skills is not read.
+    """
+    raw = profile.get("skills") or []
+    if isinstance(raw, dict):
+        raw = _skills_from_dict(raw)
+    if not raw:
+        parsed = profile.get("parsed_data") or {}
+        raw = _skills_from_dict(parsed.get("skills") or {})
+
+    seen = {}
+    for skill in raw:
+        if isinstance(skill, str) and skill.strip():
+            seen.setdefault(skill.lower().strip(), None)
+    return tuple(seen)
+
+
+def split_locations(preferred_location: Optional[str]) -> Tuple[str, ...]:
+    """'Pune, Remote' -> ('pune', 'remote')"""
+    return tuple(loc.strip().lower() for loc in (preferred_location or "").split(",") if loc.strip())
+
+
+class ProfileView:
+    """A profile row plus its pre-normalized matching inputs"""
+
+    __slots__ = (
+        "user_id", "profile", "skill_list", "skills", "experience_years",
+        "preferred_role", "preferred_location", "preferred_locations", "version", "loaded_at",
+    )
+
+    def __init__(self, profile: dict, version: int = 0):
+        self.user_id = str(profile.get("user_id"))
+        self.profile = profile
+        self.skill_list = flatten_skills(profile)
+        self.skills = frozenset(self.skill_list)
+        self.experience_years = profile.get("experience_years") or 0
+        self.preferred_role = profile.get("preferred_role") or ""
+        self.preferred_location = profile.get("preferred_location") or ""
+        self.preferred_locations = split_locations(self.preferred_location)
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+
+class ProfileCache:
+    """TTL + LRU cache of ProfileView entries keyed by user id"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ProfileView]" = OrderedDict()
+        # Last invalidation per recently seen user, LRU-bounded like the entries.
+        # Versions come from one counter, so a re-added user never repeats an old one.
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._clock = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: str) -> Optional[ProfileView]:
+        with self._lock:
+            view = self._entries.get(user_id)
+            if view is None:
+                return None
+            if time.monotonic() - view.loaded_at > self.ttl_seconds:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return view
+
+    def load(self, user_id: str) -> Optional[ProfileView]:
+        """
+        Cached view of a user's profile, fetching the row on a miss.
+        Blocking; async routes call it through run_db.
+
+        Returns:
+            None if the user has no profile (misses are not cached)
+        """
+        view = self.get(user_id)
+        if view is not None:
+            return view
+
+        with self._lock:
+            version = self._track(user_id)
+            generation = self._generation
+        res = get_profiles_collection().select("*").eq("user_id", user_id).execute()
+        if not res.data:
+            return None
+
+        view = ProfileView(res.data[0], version)
+        with self._lock:
+            if self._versions.get(user_id) != version or self._generation != generation:
+                # Profile written (or its version evicted) while loading; serve it but don't cache it
+                return view
+            self._entries[user_id] = view
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return view
+
+    def _track(self, user_id: str, bump: bool = False) -> int:
+        """A user's current version, marked most recently used; caller holds the lock"""
+        if bump:
+            self._clock += 1
+            self._versions[user_id] = self._clock
+        else:
+            self._versions.setdefault(user_id, self._clock)
+        self._versions.move_to_end(user_id)
+        while len(self._versions) > self.max_entries:
+            self._versions.popitem(last=False)
+        return self._versions[user_id]
+
+    def invalidate(self, user_id: str):
+        """Drop a user's cached profile; call after every profile write"""
+        user_id = str(user_id)
+        with self._lock:
+            self._track(user_id, bump=True)
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+profile_cache = ProfileCache(
+    ttl_seconds=settings.PROFILE_CACHE_TTL_SECONDS,
+    max_entries=settings.PROFILE_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,55 @@
+"""
+Named column projections for job queries
+
+List views never render the description, which is the bulk of a row
+(scraped descriptions are not length-capped), so each endpoint selects
+only the columns its profile needs instead of "*".
+
+- card: what a job list item renders
+- detail: a single job page, including the description and skills
+- scoring: card plus the inputs of the personalized feed scorer
+"""
+from typing import Dict, Tuple
+
+CARD_COLUMNS: Tuple[str, ...] = (
+    "id",
+    "job_id",
+    "company",
+    "role",
+    "location",
+    "is_remote",
+    "job_type",
+    "experience_level",
+    "salary_range",
+    "posted_at",
+    "source_url",
+)
+
+DETAIL_COLUMNS: Tuple[str, ...] = CARD_COLUMNS + (
+    "description",
+    "skills_required",
+    "min_years_experience",
+    "max_years_experience",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "is_active",
+)
+
+SCORING_COLUMNS: Tuple[str, ...] = CARD_COLUMNS + (
+    "description",
+    "skills_required",
+    "min_years_experience",
+    "company_tier",
+)
+
+PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    "card": CARD_COLUMNS,
+    "detail": DETAIL_COLUMNS,
+    "scoring": SCORING_COLUMNS,
+}
+
+
+def projection(name: str) -> str:
+    """PostgREST select string for a named projection"""
+    return ",".join(PROJECTIONS[name])
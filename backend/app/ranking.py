@@ -0,0 +1,41 @@
+"""
+Top-k selection for ranked job feeds
+
+Ranked endpoints only ever return the best `skip + limit` items, so they
+keep a bounded heap of that size instead of sorting every candidate.
+"""
+import heapq
+from datetime import datetime
+from typing import Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+
+def recency_key(posted_at) -> str:
+    """
+    Sortable recency value for a posted_at field.
+
+    Supabase returns ISO-8601 strings, which order chronologically as text;
+    datetimes are converted so both forms compare together.
+    """
+    if not posted_at:
+        return ""
+    if isinstance(posted_at, datetime):
+        return posted_at.isoformat()
+    return str(posted_at)
+
+
+def top_k(
+    items: Iterable[T],
+    k: int,
+    score: Callable[[T], float],
+    posted_at: Callable[[T], object]
+) -> List[T]:
+    """
+    Return the k best items by score DESC, then posted_at DESC (newest first).
+
+    Items with equal score and posted_at keep their input order.
+    """
+    if k <= 0:
+        return []
+    return heapq.nlargest(k, items, key=lambda item: (score(item), recency_key(posted_at(item))))
@@ -0,0 +1,189 @@
+"""
+Degraded-mode serving for read endpoints
+
+When the database is failing, the public listing serves the last good
+response it produced for the same filters and page (with staleness
+headers) instead of made-up data, and refreshes it in the background.
+A circuit breaker stops sending requests into a backend that keeps timing
+out: while it is open, requests go straight to the snapshot, and after a
+cool-down a single probe decides whether to close it again. Listings the
+in-memory jobs snapshot and search index serve never touch the breaker.
+
+    db_breaker        shared breaker for database reads
+    listing_snapshots last-known-good listing responses
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+
+import httpx
+from postgrest import APIError
+
+from app.config import settings
+from app.database import DatabaseTimeout
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# PostgREST connection errors and Postgres statement timeout / unavailability
+_BACKEND_ERROR_CODES = ("PGRST000", "PGRST001", "PGRST002", "PGRST003", "57014", "57P01", "57P03", "53300")
+
+
+class CircuitOpen(Exception):
+    """The database breaker is open; the call was not attempted"""
+
+
+def is_backend_failure(exc: Exception) -> bool:
+    """Whether an error means the database is unhealthy (vs. a bad request)"""
+    if isinstance(exc, (DatabaseTimeout, httpx.TransportError, CircuitOpen)):
+        return True
+    if isinstance(exc, APIError):
+        return exc.code in _BACKEND_ERROR_CODES
+    return False
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker: closed -> open after `failure_threshold`
+    failures, half-open after `reset_seconds` (one probe allowed), closed
+    again on a successful probe.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend now"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                return True  # this caller is the probe
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Database circuit closed")
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                if self.state == "closed":
+                    self.trips += 1
+                    logger.warning(f"Database circuit opened after {self.failures} consecutive failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def retry_after(self) -> int:
+        """Seconds until the next probe is allowed"""
+        with self._lock:
+            if self.state != "open":
+                return 0
+            return max(1, int(self.reset_seconds - (time.monotonic() - self.opened_at) + 0.999))
+
+    def reset(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.opened_at = 0.0
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips}
+
+
+class SnapshotCache:
+    """LRU map of last-known-good responses, with the wall time they were produced"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> Optional[Tuple[dict, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, payload: dict):
+        with self._lock:
+            self._entries[key] = (payload, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+db_breaker = CircuitBreaker(
+    failure_threshold=settings.DB_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=settings.DB_BREAKER_RESET_SECONDS,
+)
+listing_snapshots = SnapshotCache(max_entries=settings.LISTING_SNAPSHOT_MAX_ENTRIES)
+
+_refreshing = {}  # snapshot key -> background refresh task
+
+
+async def guarded(load: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run a database read through the breaker, recording its outcome.
+    Wrap only calls that reach the database; reads served from memory
+    would close the breaker without probing it.
+    """
+    if not db_breaker.allow():
+        raise CircuitOpen("Database circuit is open")
+    try:
+        result = await load()
+    except Exception as e:
+        if is_backend_failure(e):
+            db_breaker.record_failure()
+        else:
+            db_breaker.record_success()  # the backend answered; the request was bad
+        raise
+    db_breaker.record_success()
+    return result
+
+
+async def _refresh(key: tuple, load: Callable[[], Awaitable[dict]]):
+    """
+    Retry a failed read with backoff and store the result as the new snapshot.
+    `load` sends its own database calls through guarded().
+    """
+    try:
+        for attempt in range(settings.LISTING_REFRESH_ATTEMPTS):
+            await asyncio.sleep(settings.LISTING_REFRESH_BACKOFF_SECONDS * (2 ** attempt))
+            try:
+                listing_snapshots.put(key, await load())
+                logger.info(f"Background refresh of {key} succeeded after {attempt + 1} attempt(s)")
+                return
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed (attempt {attempt + 1}): {e}")
+    finally:
+        _refreshing.pop(key, None)
+
+
+def schedule_refresh(key: tuple, load: Callable[[], Awaitable[dict]]):
+    """Start one background refresh per snapshot key"""
+    if key not in _refreshing:
+        _refreshing[key] = asyncio.create_task(_refresh(key, load))
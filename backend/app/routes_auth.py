@@ -8,7 +8,9 @@ from fastapi.security import HTTPBearer
 from datetime import datetime
 from app.models import UserRegister, UserLogin, Token, UserResponse, UserInDB
 from app.auth import hash_password, verify_password, create_access_token, get_current_user_id
-from app.database import get_users_collection, get_profiles_collection
+from app.database import get_users_collection, get_profiles_collection, run_db
+from app.feed_cache import feed_cache
+from app.profile_cache import profile_cache
 from app.file_handler import file_handler
 from app.resume_parser import resume_parser
 
@@ -33,6 +35,8 @@ async def parse_resume_background(file_path: str, user_id: str):
         
         # Upsert profile
         profiles.upsert(profile_dict, on_conflict="user_id").execute()
+        profile_cache.invalidate(user_id)
+        feed_cache.invalidate_user(user_id)
         
         # Update user's resume_parsed_at (Supabase local_users doesn't have resume_parsed_at yet? 
         # Schema I gave didn't have it. Let's skip or store in profile)
@@ -49,6 +53,7 @@ async def parse_resume_background(file_path: str, user_id: str):
             "parsing_status": "failed",
             "parsed_data": {"error": str(e)}
         }, on_conflict="user_id").execute()
+        profile_cache.invalidate(user_id)
 
 
 @router.post("/register", response_model=dict)
@@ -287,6 +292,8 @@ async def update_profile(
             if "parsing_status" not in update_data:
                 update_data["parsing_status"] = "complete"
             profiles.insert(update_data).execute()
+        profile_cache.invalidate(current_user_id)
+        feed_cache.invalidate_user(current_user_id)
         
     return {"message": "Profile updated successfully", "status": "pending" if resume and resume.filename else "complete"}
 
@@ -295,7 +302,6 @@ async def update_profile(
 async def get_current_user(current_user_id: str = Depends(get_current_user_id)):
     """Get current user information"""
     users = get_users_collection()
-    profiles = get_profiles_collection()
     
     # User
     res = users.select("*").eq("id", current_user_id).execute()
@@ -304,12 +310,12 @@ async def get_current_user(current_user_id: str = Depends(get_current_user_id)):
     user = res.data[0]
     
     # Profile
-    res_p = profiles.select("parsing_status, experience_years").eq("user_id", current_user_id).execute()
+    view = await run_db(profile_cache.load, current_user_id)
     profile_status = "pending"
     experience_years = None
-    if res_p.data:
-        profile_status = res_p.data[0].get("parsing_status", "pending")
-        experience_years = res_p.data[0].get("experience_years")
+    if view is not None:
+        profile_status = view.profile.get("parsing_status", "pending")
+        experience_years = view.profile.get("experience_years")
     
     return {
         "id": str(user["id"]),
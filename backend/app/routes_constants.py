@@ -1,7 +1,10 @@
 """
 API endpoint to get dropdown options and constants
 """
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from app.autocomplete import KINDS, MAX_SUGGESTIONS, autocomplete
 from app.constants import (
     EXPERIENCE_LEVELS,
     ENGINEERING_ROLES,
@@ -71,6 +74,18 @@ async def get_common_skills():
     return sorted(COMMON_SKILLS)
 
 
+@router.get("/autocomplete", response_model=list)
+async def get_autocomplete(
+    q: str = Query(..., min_length=1, description="Prefix typed so far"),
+    kind: Optional[str] = Query(None, description="role, company, location or skill; all kinds if omitted"),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS),
+):
+    """Suggestions for a prefix from the constants and live jobs, most common first"""
+    if kind is not None and kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(KINDS)}")
+    return autocomplete.suggest(q, kind, limit)
+
+
 @router.get("/all", response_model=dict)
 async def get_all_constants():
     """Get all constants in one call (for initial app load)"""
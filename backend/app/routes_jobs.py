@@ -3,15 +3,32 @@ Job recommendation and search API endpoints (Supabase Version)
 """
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from postgrest import APIError
 from typing import List, Optional
 from datetime import datetime
 from app.models import JobRecommendation, Job, SavedJob
 from app.auth import get_current_user_id
-from app.database import get_profiles_collection, get_jobs_collection, get_saved_jobs_collection
+from app.config import settings
+from app.count_cache import JOBS_NAMESPACE, count_cache, count_rows, filter_signature
+from app.database import execute, get_jobs_collection, get_saved_jobs_collection, run_db
+from app.feed_cache import decode_cursor, encode_cursor
+from app.job_ids import fetch_job, job_id_cache, resolve_job_id
+from app.jobs_snapshot import jobs_snapshot
+from app.jobs_sync import jobs_sync
 from app.matching import job_matcher
+from app.pagination import apply_keyset, keyset_order, keyset_page
+from app.profile_cache import profile_cache
+from app.saved_jobs import fetch_saved_page, record_saved
+from app.search_index import FIELDS, fetch_ranked_page, listing_filter
+from app.projections import CARD_COLUMNS, DETAIL_COLUMNS, projection
+from app.ranking import top_k
+from app.skill_index import fetch_jobs_by_ids, skill_index
 # from bson import ObjectId # Removed
 
 logger = logging.getLogger(__name__)
+
+FOREIGN_KEY_VIOLATION = "23503"
+
 router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
 
 
@@ -24,39 +41,44 @@ async def get_job_recommendations(
     """
     Get personalized job recommendations
     """
-    profiles = get_profiles_collection()
     jobs = get_jobs_collection()
     
     # Get user profile
-    res_profile = profiles.select("*").eq("user_id", current_user_id).execute()
+    view = await run_db(profile_cache.load, current_user_id)
     
-    if not res_profile.data:
+    if view is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found. Please upload your resume first."
         )
     
-    profile_data = res_profile.data[0]
-    
     # Convert to UserProfile model
     from app.models import UserProfile
     # Handle list vs array conversion if needed
-    user_profile = UserProfile(**profile_data)
+    user_profile = UserProfile(**view.profile)
     
     # Get adjacent experience levels for filtering
     adjacent_levels = job_matcher.get_adjacent_levels(user_profile.experience_level)
     
-    # Build query to fetch candidate jobs
-    # Logical OR is tricky in Supabase across different fields easily in one query string?
-    # actually `.or_` works.
-    # We want (expire_at > NOW) AND (skills IN ... OR experience IN ...)
-    # Supabase `or` applies to top level usually? 
-    # Complex OR with AND is hard.
-    # Let's fetch broader candidate set (last 200 jobs) and filter in Python for now.
-    # PROTOTYPE HACK: Just fetch latest 200 jobs.
-    
-    res_jobs = jobs.select("*").order("posted_at", desc=True).limit(200).execute()
-    candidate_jobs = res_jobs.data
+    # Candidate jobs: union of the user's skill postings from the in-memory index,
+    # falling back to the latest 200 jobs (from the jobs snapshot once loaded)
+    user_skills = view.skills
+    candidate_ids = []
+    if user_skills and jobs_sync.ready:
+        skill_index.observe(user_skills)
+        candidate_ids = skill_index.candidates(user_skills, settings.SKILL_INDEX_MAX_CANDIDATES)
+    
+    snapshot = jobs_snapshot.get()
+    if candidate_ids:
+        candidate_jobs = await run_db(
+            fetch_jobs_by_ids, candidate_ids, columns=projection("detail"),
+            timeout=settings.DB_BATCH_TIMEOUT_SECONDS
+        )
+    elif snapshot is not None:
+        candidate_jobs = snapshot.newest(200, DETAIL_COLUMNS)
+    else:
+        res_jobs = await execute(jobs.select(projection("detail")).order("posted_at", desc=True).limit(200))
+        candidate_jobs = res_jobs.data
     
     if not candidate_jobs:
         return {
@@ -65,25 +87,23 @@ async def get_job_recommendations(
             "message": "No matching jobs found."
         }
     
-    # Score each job
-    recommendations = []
+    # Score each job, keeping only what is needed to rank
+    scored = []
     for job_doc in candidate_jobs:
         try:
             # Map fields if necessary
             job = Job(**job_doc)
-            recommendation = job_matcher.create_recommendation(user_profile, job)
+            score = job_matcher.calculate_match_score(user_profile, job)
             
-            if recommendation.match_score >= min_score:
-                recommendations.append(recommendation)
+            if score >= min_score:
+                scored.append((score, job_doc.get("posted_at"), job))
         except Exception as e:
             # logger.warning(f"Failed to process job {job_doc.get('job_id')}: {str(e)}")
             continue
     
-    # Sort by match score
-    recommendations.sort(key=lambda x: x.match_score, reverse=True)
-    
-    # Limit results
-    recommendations = recommendations[:limit]
+    # Top matches by score, newest first on ties
+    best = top_k(scored, limit, score=lambda item: item[0], posted_at=lambda item: item[1])
+    recommendations = [job_matcher.create_recommendation(user_profile, job) for _, _, job in best]
     
     return {
         "recommendations": [rec.dict() for rec in recommendations],
@@ -102,33 +122,82 @@ async def search_jobs(
     experience_level: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
     current_user_id: str = Depends(get_current_user_id)
 ):
     """
     Search and filter jobs
+    Searches are ranked by relevance (BM25) once the search index is loaded
+    Pass next_cursor back as `cursor` for the next page (skip is ignored)
+    total is cached per filter set (estimated when unfiltered)
     """
     jobs = get_jobs_collection()
     
-    # Build query
-    q = jobs.select("*", count="exact")
-    
-    if query:
-        q = q.or_(f"role.ilike.%{query}%,company.ilike.%{query}%,description.ilike.%{query}%")
-    
-    if location:
-        q = q.ilike("location", f"%{location}%")
-    
-    if remote_only:
-        q = q.eq("is_remote", True)
-    
-    if experience_level:
-        q = q.eq("experience_level", experience_level)
-    
-    # Execute
-    res = q.order("posted_at", desc=True).range(skip, skip + limit - 1).execute()
-    
-    job_docs = res.data
-    total = res.count if res.count is not None else len(job_docs)
+    def apply_filters(q):
+        if query:
+            q = q.or_(f"role.ilike.%{query}%,company.ilike.%{query}%,description.ilike.%{query}%")
+        
+        if location:
+            q = q.ilike("location", f"%{location}%")
+        
+        if remote_only:
+            q = q.eq("is_remote", True)
+        
+        if experience_level:
+            q = q.eq("experience_level", experience_level)
+        return q
+    
+    snapshot = jobs_snapshot.get()
+    if query and jobs_sync.ready:
+        # Relevance-ranked from the in-memory search index; only this page's rows are fetched
+        try:
+            offset = decode_cursor(cursor)[0] if cursor else skip
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        job_docs, total = await run_db(
+            fetch_ranked_page, query, FIELDS, offset, limit,
+            listing_filter(location, remote_only, experience_level=experience_level), projection("card")
+        )
+        next_cursor = encode_cursor(offset + limit, jobs_sync.version) if offset + limit < total else None
+        job_id_cache.remember(job_docs)
+    elif snapshot is not None and not query:
+        # Served from the in-memory jobs snapshot, with the same keyset cursors; searches
+        # the index can't answer yet fall through to the database ilike filter
+        try:
+            job_docs, next_cursor, total = snapshot.listing(
+                CARD_COLUMNS, limit, skip, cursor,
+                location=location, remote_only=remote_only, experience_level=experience_level
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    else:
+        # Build query
+        q = apply_filters(jobs.select(projection("card")))
+        
+        # Execute
+        if cursor:
+            try:
+                q = apply_keyset(q, "posted_at", cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            res = await execute(keyset_order(q, "posted_at").limit(limit + 1))
+        else:
+            res = await execute(keyset_order(q, "posted_at").range(skip, skip + limit))
+        job_docs, next_cursor = keyset_page(res.data or [], limit, "posted_at")
+        job_id_cache.remember(job_docs)
+        
+        signature = filter_signature(
+            query=query.lower() if query else None,
+            location=location.lower() if location else None,
+            remote_only=remote_only,
+            experience_level=experience_level,
+        )
+        total = await run_db(
+            count_cache.get_or_count,
+            JOBS_NAMESPACE,
+            signature,
+            lambda: count_rows(get_jobs_collection(), apply_filters, planned=not signature),
+        )
     
     # Convert to dict (Supabase returns dicts already, but we ensure structure)
     formatted_jobs = []
@@ -140,7 +209,8 @@ async def search_jobs(
         "jobs": formatted_jobs,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 
@@ -153,37 +223,40 @@ async def save_job(
     """
     Save a job for later
     """
-    jobs = get_jobs_collection()
     saved_jobs = get_saved_jobs_collection()
     
-    # Verify job exists
-    res_job = jobs.select("id").or_(f"id.eq.{job_id},job_id.eq.{job_id}").execute()
-    
-    if not res_job.data:
+    # Resolve the job (cached after the first lookup)
+    job_internal_id = await run_db(resolve_job_id, job_id)
+    if job_internal_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
     
-    job_internal_id = res_job.data[0]["id"]
-    
-    # Check if already saved
-    # user_id is implicit or explicit? Schema says user_id column.
-    res_existing = saved_jobs.select("*").eq("user_id", current_user_id).eq("job_id", job_internal_id).execute()
-    
-    if res_existing.data:
-        return {"message": "Job already saved"}
-    
-    # Save job
+    # Idempotent save in one round trip: an existing (user_id, job_id) row is left as is
+    # and nothing is returned for it
     new_saved = {
         "user_id": current_user_id,
         "job_id": job_internal_id,
         "notes": notes,
         "saved_at": datetime.utcnow().isoformat()
     }
+    try:
+        res = await execute(saved_jobs.upsert(new_saved, on_conflict="user_id,job_id", ignore_duplicates=True))
+    except APIError as e:
+        if e.code != FOREIGN_KEY_VIOLATION:
+            raise
+        # The cached id points at a deleted job
+        job_id_cache.discard(job_internal_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
     
-    saved_jobs.insert(new_saved).execute()
+    if not res.data:
+        return {"message": "Job already saved"}
     
+    record_saved(current_user_id, 1)
     return {"message": "Job saved successfully"}
 
 
@@ -192,28 +265,16 @@ async def unsave_job(
     job_id: str,
     current_user_id: str = Depends(get_current_user_id)
 ):
-    """Remove a job from saved list"""
+    """Remove a job from saved list (idempotent)"""
     saved_jobs = get_saved_jobs_collection()
-    jobs = get_jobs_collection()
-    
-    # Resolve job_id to internal id if needed, or try direct delete
-    # The job_id passed might be external ID or internal ID.
     
-    # First find internal ID if external
-    res_job = jobs.select("id").or_(f"id.eq.{job_id},job_id.eq.{job_id}").execute()
-    if res_job.data:
-         real_job_id = res_job.data[0]["id"]
-    else:
-         # Try using job_id as is (maybe it IS the UUID used in saved_jobs?)
-         # But saved_jobs links to jobs.id (UUID).
-         real_job_id = job_id
-
-    # Delete
-    res = saved_jobs.delete().eq("user_id", current_user_id).eq("job_id", real_job_id).execute()
+    # The job_id passed might be external ID or internal ID; saved_jobs links to jobs.id.
+    # Unknown references are tried as-is (the job may have been deleted since it was saved)
+    real_job_id = await run_db(resolve_job_id, job_id) or job_id
     
-    if not res.data:
-         # Maybe fail silent or warn
-         pass
+    res = await execute(saved_jobs.delete().eq("user_id", current_user_id).eq("job_id", real_job_id))
+    if res.data:
+        record_saved(current_user_id, -len(res.data))
 
     return {"message": "Job removed from saved list"}
 
@@ -222,40 +283,37 @@ async def unsave_job(
 async def get_saved_jobs(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
     current_user_id: str = Depends(get_current_user_id)
 ):
     """
     Get all saved jobs
+    Pass next_cursor back as `cursor` for keyset pagination on (saved_at, id)
     """
-    saved_jobs = get_saved_jobs_collection()
-    
-    # Join with jobs table? Supabase-py join support is 'select(..., jobs(...))'
-    # We need foreign key relationship setup in Supabase for this to work elegantly.
-    # Assuming 'job_id' is FK to 'jobs.id'.
-    
-    query = saved_jobs.select("*, jobs(*)").eq("user_id", current_user_id).order("saved_at", desc=True).range(skip, skip + limit - 1)
-    
-    res = query.execute()
-    saved_records = res.data
+    # Page and total in one request (the per-user count is cached and kept
+    # in step by save/unsave)
+    try:
+        saved_records, next_cursor, total = await run_db(
+            fetch_saved_page, current_user_id, limit, skip=skip, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    job_id_cache.remember(record.get("jobs") for record in saved_records)
     
     # Format
-    saved_jobs_list = []
-    for record in saved_records:
-        if record.get("jobs"): # joined data
-            job_data = record["jobs"]
-            saved_jobs_list.append({
-                "job": job_data,
-                "saved_at": record["saved_at"],
-                "notes": record.get("notes")
-            })
-    
-    # Total count
-    res_count = saved_jobs.select("*", count="exact").eq("user_id", current_user_id).execute()
-    total = res_count.count
+    saved_jobs_list = [
+        {
+            "job": record["jobs"],
+            "saved_at": record["saved_at"],
+            "notes": record.get("notes")
+        }
+        for record in saved_records
+    ]
     
     return {
         "saved_jobs": saved_jobs_list,
-        "total": total
+        "total": total,
+        "next_cursor": next_cursor
     }
 
 
@@ -267,31 +325,26 @@ async def get_job_details(
     """
     Get detailed job information with match analysis
     """
-    profiles = get_profiles_collection()
-    jobs = get_jobs_collection()
-    
     # Get user profile
-    res_profile = profiles.select("*").eq("user_id", current_user_id).execute()
-    if not res_profile.data:
+    view = await run_db(profile_cache.load, current_user_id)
+    if view is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found"
         )
     
     # Get job
-    res_job = jobs.select("*").or_(f"id.eq.{job_id},job_id.eq.{job_id}").execute()
+    job_doc = await run_db(fetch_job, job_id, projection("detail"))
     
-    if not res_job.data:
+    if job_doc is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
     
-    job_doc = res_job.data[0]
-    
     # Create models
     from app.models import UserProfile
-    user_profile = UserProfile(**res_profile.data[0])
+    user_profile = UserProfile(**view.profile)
     job = Job(**job_doc)
     
     # Calculate match
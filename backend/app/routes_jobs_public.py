@@ -2,13 +2,29 @@
 Public and personalized job endpoints
 """
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import time
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 # from bson import ObjectId # Removed
 from typing import List, Optional
 from datetime import datetime
 from app.models import Job
 from app.auth import get_current_user_id
-from app.database import get_jobs_collection, get_profiles_collection
+from app.config import settings
+from app.database import execute, get_jobs_collection, run_db
+from app.job_scoring import JobFeatureColumns, batch_scorer
+from app.count_cache import JOBS_NAMESPACE, count_cache, count_rows, filter_signature
+from app.facets import facet_index
+from app.feed_cache import RankedFeed, decode_cursor, encode_cursor, feed_cache
+from app.job_ids import fetch_job, job_id_cache
+from app.profile_cache import profile_cache
+from app.jobs_snapshot import jobs_snapshot
+from app.jobs_sync import jobs_sync
+from app.pagination import apply_keyset, keyset_order, keyset_page
+from app.projections import CARD_COLUMNS, SCORING_COLUMNS, projection
+from app.resilience import db_breaker, guarded, listing_snapshots, schedule_refresh
+from app.ranking import top_k
+from app.search_index import fetch_ranked_page, ilike_filter, listing_filter, search_fields, search_index
+from app.skill_index import fetch_jobs_by_ids, skill_index
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
@@ -23,116 +39,115 @@ EXPERIENCE_HIERARCHY = {
     "12+": 5
 }
 
-
-def _parse_experience_level(exp_text: Optional[str]) -> Optional[int]:
-    """
-    Parse experience_level text to a numeric min-years value.
-    Returns None if unparseable (meaning no requirement, always include).
-    Examples:
-        "Entry Level" -> 0
-        "1-3 years" -> 1
-        "3-5" -> 3
-        "Senior" -> 5
-        "Mid-Senior level" -> 3
-        None -> None
-    """
-    if not exp_text or exp_text.strip() == "" or exp_text.lower() == "nan":
-        return None
-
-    exp_text = exp_text.strip().lower()
-
-    # Direct range patterns like "1-3", "3-5 years", "0-2"
-    import re
-    range_match = re.match(r'(\d+)\s*[-–]\s*(\d+)', exp_text)
-    if range_match:
-        return int(range_match.group(1))
-
-    # Single number like "2 years", "5+"
-    single_match = re.match(r'(\d+)', exp_text)
-    if single_match:
-        return int(single_match.group(1))
-
-    # Text labels
-    label_map = {
-        "entry": 0, "entry level": 0, "fresher": 0, "intern": 0, "internship": 0,
-        "junior": 1, "associate": 1,
-        "mid": 3, "mid-level": 3, "mid level": 3, "mid-senior": 3, "mid-senior level": 3,
-        "senior": 5, "lead": 7, "principal": 8,
-        "director": 10, "executive": 12, "vp": 12,
-        "not applicable": None,
-    }
-    for label, val in label_map.items():
-        if label in exp_text:
-            return val
-
-    return None
-
 @router.get("/public", response_model=dict)
 async def get_public_jobs(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     skip: int = Query(0, ge=0),
     location: Optional[str] = Query(None),
     remote_only: bool = Query(False),
     search: Optional[str] = Query(None),
     search_type: Optional[str] = Query(None, description="Filter search by 'company' or 'role'"),
-    experience: Optional[int] = Query(None, description="User experience in years; filters jobs where required exp <= experience+1")
+    experience: Optional[int] = Query(None, description="User experience in years; filters jobs where required exp <= experience+1"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces skip")
 ):
     """
     Get all jobs without authentication (PUBLIC)
-    Sorted by posted_at DESC (latest first)
-    Optionally filtered by experience level
+    Sorted by posted_at DESC (latest first); searches are ranked by relevance (BM25)
+    Optionally filtered by experience level (server-side)
+    With a cursor, pages are keyset-paginated on (posted_at, id)
+    Once the jobs sync has loaded, listings are served from the in-memory jobs snapshot
+    total is cached per filter set (estimated when unfiltered); has_more follows next_cursor
+    If the database fails, the last good response for the same filters and page is
+    served with staleness headers (Age, Warning) while a background refresh retries
     """
-    try:
+    signature = filter_signature(
+        location=location.lower() if location else None,
+        remote_only=remote_only,
+        experience=experience,
+        search=search.lower() if search else None,
+        search_type=search_type if search else None,
+    )
+    snapshot_key = (signature, limit, skip, cursor)
+    
+    async def load():
         jobs = get_jobs_collection()
         
-        # Build query using Supabase filters
-        query = jobs.select("*", count="exact")
+        def apply_filters(query):
+            if location:
+                # ilike is case-insensitive like
+                query = query.ilike("location", f"%{location}%")
         
-        if location:
-            # ilike is case-insensitive like
-            query = query.ilike("location", f"%{location}%")
+            if remote_only:
+                query = query.eq("is_remote", True)
         
-        if remote_only:
-            query = query.eq("is_remote", True)
+            if experience is not None:
+                # Jobs requiring at most experience+1 years, or with no stated requirement.
+                # min_years_experience is filled at ingest (app/job_features.py)
+                query = query.or_(f"min_years_experience.is.null,min_years_experience.lte.{experience + 1}")
         
-        if search:
-            # Multi-keyword fuzzy-ish match
-            keywords = [kw.strip() for kw in search.split() if len(kw.strip()) > 1]
-            if not keywords:
-                keywords = [search.strip()]
-                
-            or_conditions = []
-            for kw in keywords:
-                if search_type == "company":
-                    or_conditions.append(f"company.ilike.%{kw}%")
-                elif search_type == "role":
-                    or_conditions.append(f"role.ilike.%{kw}%")
-                elif search_type == "skill":
-                    or_conditions.append(f"description.ilike.%{kw}%")
-                else:
-                    or_conditions.append(f"role.ilike.%{kw}%")
-                    or_conditions.append(f"company.ilike.%{kw}%")
-                    or_conditions.append(f"description.ilike.%{kw}%")
-                    
-            if or_conditions:
-                query = query.or_(",".join(or_conditions))
+            if search:
+                # Substring match on any keyword; only used while the search index loads
+                query = query.or_(ilike_filter(search, search_type))
+            return query
         
-        # Sort and paginate
-        res = query.order("posted_at", desc=True).range(skip, skip + limit - 1).execute()
+        async def query_database():
+            # Build query using Supabase filters
+            query = apply_filters(jobs.select(projection("card")))
+            
+            # Sort and paginate
+            if cursor:
+                try:
+                    query = apply_keyset(query, "posted_at", cursor)
+                except ValueError:
+                    raise HTTPException(status_code=400, detail="Invalid cursor")
+                res = await execute(keyset_order(query, "posted_at").limit(limit + 1))
+            else:
+                res = await execute(keyset_order(query, "posted_at").range(skip, skip + limit))
+            job_docs, next_cursor = keyset_page(res.data or [], limit, "posted_at")
+            
+            # Totals are cached per filter set; unfiltered listings use the planner estimate
+            total = await run_db(
+                count_cache.get_or_count,
+                JOBS_NAMESPACE,
+                signature,
+                lambda: count_rows(get_jobs_collection(), apply_filters, planned=not signature),
+            )
+            return job_docs, next_cursor, total
         
-        job_docs = res.data
-        total = res.count if res.count is not None else len(job_docs)
+        next_cursor = None
+        snapshot = jobs_snapshot.get()
+        if search and jobs_sync.ready:
+            # Relevance-ranked from the in-memory search index; only this page's rows are fetched
+            try:
+                offset = decode_cursor(cursor)[0] if cursor else skip
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            job_docs, total = await run_db(
+                fetch_ranked_page, search, search_fields(search_type), offset, limit,
+                listing_filter(location, remote_only, experience), projection("card")
+            )
+            if offset + limit < total:
+                next_cursor = encode_cursor(offset + limit, jobs_sync.version)
+        elif snapshot is not None and not search:
+            # Served from the in-memory jobs snapshot, with the same keyset cursors; searches
+            # the index can't answer yet fall through to the database ilike filter
+            try:
+                job_docs, next_cursor, total = snapshot.listing(
+                    CARD_COLUMNS, limit, skip, cursor,
+                    location=location, remote_only=remote_only, experience=experience
+                )
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        else:
+            # Only database reads go through the breaker: memory hits say nothing about its health
+            job_docs, next_cursor, total = await guarded(query_database)
+        job_id_cache.remember(job_docs)  # detail views and saves of listed jobs skip resolution
         
-        # Convert to response format and apply experience filter
+        # Convert to response format
         jobs_list = []
         for job in job_docs:
             try:
-                # Experience filtering: if user provided experience, filter jobs
-                if experience is not None:
-                    job_exp = _parse_experience_level(job.get("experience_level"))
-                    if job_exp is not None and job_exp > experience + 1:
-                        continue  # Skip jobs requiring more experience than user has + 1
-
                 posted_at = job.get("posted_at")
                 if posted_at and isinstance(posted_at, str):
                     pass # Keep as string
@@ -158,48 +173,58 @@ async def get_public_jobs(
         
         return {
             "jobs": jobs_list,
-            "total": total if experience is None else len(jobs_list),
-            "has_more": (skip + limit) < total if experience is None else False,
-            "showing": len(jobs_list)
+            "total": total,
+            "has_more": next_cursor is not None,
+            "showing": len(jobs_list),
+            "next_cursor": next_cursor
         }
+    
+    try:
+        payload = await load()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_public_jobs: {e}")
-        # Fallback to mock data for prototype if DB is down
-        logger.warning("Using MOCK DATA due to DB error")
-        mock_jobs = [
-            {
-                "id": "mock-1",
-                "job_id": "mock-1",
-                "company": "TechCorp (Mock)",
-                "role": "Frontend Developer",
-                "location": "Bengaluru",
-                "is_remote": True,
-                "type": "Full-time",
-                "experience": "1-3 years",
-                "salary": "₹12L - ₹18L",
-                "posted_at": datetime.now().isoformat(),
-                "url": "#"
-            },
-            {
-                "id": "mock-2",
-                "job_id": "mock-2",
-                "company": "InnovateAI (Mock)",
-                "role": "Machine Learning Engineer",
-                "location": "Remote",
-                "is_remote": True,
-                "type": "Contract",
-                "experience": "3-5 years",
-                "salary": "$4000 - $6000",
-                "posted_at": datetime.now().isoformat(),
-                "url": "#"
-            }
-        ]
-        return {
-            "jobs": mock_jobs,
-            "total": len(mock_jobs),
-            "has_more": False,
-            "showing": len(mock_jobs)
-        }
+        snapshot = listing_snapshots.get(snapshot_key)
+        if snapshot is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Job listings are temporarily unavailable",
+                headers={"Retry-After": str(db_breaker.retry_after() or 1)},
+            )
+        payload, produced_at = snapshot
+        age = int(time.time() - produced_at)
+        logger.warning(f"Serving last-known-good public listing ({age}s old)")
+        response.headers["Age"] = str(age)
+        response.headers["Warning"] = '110 - "Response is Stale"'
+        schedule_refresh(snapshot_key, load)
+        return payload
+    
+    listing_snapshots.put(snapshot_key, payload)
+    return payload
+
+
+@router.get("/public/facets", response_model=dict)
+async def get_public_job_facets(
+    location: Optional[str] = Query(None),
+    remote_only: bool = Query(False),
+    search: Optional[str] = Query(None),
+    search_type: Optional[str] = Query(None, description="Filter search by 'company' or 'role'"),
+    experience: Optional[int] = Query(None, description="User experience in years; same filter as /public"),
+):
+    """
+    Counts per location, remote, job type, experience and salary bucket for a /public search (PUBLIC)
+    Served from in-memory bitmaps; location and remote counts ignore their own filter
+    """
+    if not jobs_sync.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job filters are loading",
+            headers={"Retry-After": "1"},
+        )
+    result = facet_index.counts(location, remote_only, experience, search, search_type)
+    result["version"] = jobs_sync.version
+    return result
 
 
 @router.get("/public/{job_id}", response_model=dict)
@@ -207,27 +232,14 @@ async def get_public_job_details(job_id: str):
     """
     Get detailed job information without authentication (PUBLIC)
     """
-    jobs = get_jobs_collection()
-    
-    # Try to find by id (internal uuid) or job_id (external)
-    # Since we can't easily check 'is_uuid', we'll try job_id first, then id?
-    # Actually, Supabase ID is UUID.
-    # We'll search OR
-    res = jobs.select("*").or_(f"id.eq.{job_id},job_id.eq.{job_id}").execute()
-
-    if not res.data:
-         # Maybe invalid UUID format caused 500? If so, we catch or just return 404
-         # supabase-py might raise error on invalid UUID syntax.
-         # Ideally we fallback.
-         pass
+    # Find by id (internal uuid) or job_id (external) on the matching indexed column
+    job = await run_db(fetch_job, job_id, projection("detail"))
     
-    if not res.data:
+    if job is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
-        
-    job = res.data[0]
     
     return {
         "job": {
@@ -253,111 +265,60 @@ async def get_personalized_jobs(
     skip: int = Query(0, ge=0),
     search: Optional[str] = None,
     search_type: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page; overrides skip"),
     current_user_id: str = Depends(get_current_user_id)
 ):
     """
     Get jobs personalized to user profile (REQUIRES AUTH)
     Scores jobs by: skills (50pts), role (25pts), location (15pts), experience (10pts) = 100pts
+    The full ranking is cached per user and search, so follow-up pages only fetch their own rows.
+    A cursor from before a jobs sync re-ranked the feed restarts at the first page (cursor_reset)
     """
-    profiles = get_profiles_collection()
-    jobs = get_jobs_collection()
-    
-    # Get user profile
-    res = profiles.select("*").eq("user_id", current_user_id).execute()
-    if not res.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Profile not found. Please complete your profile."
-        )
-    profile = res.data[0]
-    
-    # Get user data
-    user_experience = profile.get("experience_years") or 0
-    preferred_role = profile.get("preferred_role", "")
-    preferred_location = profile.get("preferred_location", "")
-    
-    # Get user skills — try top-level 'skills' column first, fallback to parsed_data
-    user_skills_raw = profile.get("skills") or []
-    
-    # If skills is a dictionary (from Supabase schema)
-    if isinstance(user_skills_raw, dict):
-        skills_data = user_skills_raw
-        user_skills_raw = skills_data.get("all_skills_normalized", [])
-        if not user_skills_raw:
-            user_skills_raw = (
-                skills_data.get("technical", []) +
-                skills_data.get("programming_languages", []) +
-                skills_data.get("tools_frameworks", [])
-            )
-    
-    # Fallback to parsed_data
-    if not user_skills_raw:
-        parsed = profile.get("parsed_data") or {}
-        skills_data = parsed.get("skills", {})
-        user_skills_raw = skills_data.get("all_skills_normalized", [])
-        if not user_skills_raw:
-            # Flatten from categories
-            user_skills_raw = (
-                skills_data.get("technical", []) +
-                skills_data.get("programming_languages", []) +
-                skills_data.get("tools_frameworks", [])
+    cursor_version = None
+    if cursor:
+        try:
+            skip, cursor_version = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
             )
     
-    user_skills = set(s.lower().strip() for s in user_skills_raw if s)
-    
-    logger.info(f"Personalized jobs for user {current_user_id}: {len(user_skills)} skills, role={preferred_role}, exp={user_experience}")
-    
-    # Build query
-    query = jobs.select("*")
-    if search:
-        # Multi-keyword fuzzy-ish match
-        keywords = [kw.strip() for kw in search.split() if len(kw.strip()) > 1]
-        if not keywords:
-            keywords = [search.strip()]
-            
-        or_conditions = []
-        for kw in keywords:
-            if search_type == "company":
-                or_conditions.append(f"company.ilike.%{kw}%")
-            elif search_type == "role":
-                or_conditions.append(f"role.ilike.%{kw}%")
-            elif search_type == "skill":
-                or_conditions.append(f"description.ilike.%{kw}%")
-            else:
-                or_conditions.append(f"role.ilike.%{kw}%")
-                or_conditions.append(f"company.ilike.%{kw}%")
-                or_conditions.append(f"description.ilike.%{kw}%")
-                
-        if or_conditions:
-            query = query.or_(",".join(or_conditions))
-        
-    res_jobs = query.order("posted_at", desc=True).limit(2000).execute()
-    all_jobs = res_jobs.data
-    
-    # Score each job
-    scored_jobs = []
-    for job in all_jobs:
-        score, matching_skills = _score_job(
-            job, user_experience, preferred_role, preferred_location, user_skills
+    feed_key = (current_user_id, search or "", search_type or "")
+    feed = feed_cache.get(feed_key, jobs_sync.version)
+    rows_by_id = {}
+    if feed is None:
+        feed, rows_by_id = await run_db(
+            _rank_personalized_feed, current_user_id, search, search_type,
+            timeout=settings.DB_BATCH_TIMEOUT_SECONDS
         )
-        
-        scored_jobs.append({
-            "job": job,
-            "score": score,
-            "matching_skills": matching_skills,
-            "match_reason": _build_match_reason(score, matching_skills, preferred_role, job)
-        })
-    
-    # Sort by score DESC then posted_at DESC
-    scored_jobs.sort(key=lambda x: (-x["score"], -(x["job"].get("posted_at") or "").__hash__()))
-    
-    # Paginate
-    paginated = scored_jobs[skip:skip+limit]
+        feed_cache.put(feed_key, feed)
+    
+    # Offsets into an older ranking would repeat or skip jobs in this one
+    cursor_reset = cursor_version is not None and cursor_version != feed.jobs_version
+    if cursor_reset:
+        skip = 0
+    
+    context = feed.context
+    user_skills = context["user_skills"]
+    preferred_role = context["preferred_role"]
+    
+    # Paginate the cached ranking and load only this page's rows
+    page = feed.page(skip, limit)
+    missing = [job_id for job_id, _ in page if job_id not in rows_by_id]
+    if missing:
+        fetched = await run_db(
+            fetch_jobs_by_ids, missing, columns=projection("scoring"),
+            timeout=settings.DB_BATCH_TIMEOUT_SECONDS
+        )
+        rows_by_id.update((str(job["id"]), job) for job in fetched)
+    page = [(rows_by_id[job_id], score) for job_id, score in page if job_id in rows_by_id]
+    job_id_cache.remember(job for job, _ in page)
+    page_matches = batch_scorer.match_skills(JobFeatureColumns([job for job, _ in page]), user_skills)
     
     # Format response
     jobs_list = []
-    for item in paginated:
-        job = item["job"]
+    for (job, score), matching_skills in zip(page, page_matches):
         jobs_list.append({
             "id": job["id"],
             "job_id": job.get("job_id"),
@@ -369,173 +330,111 @@ async def get_personalized_jobs(
             "experience": job.get("experience_level"),
             "salary": job.get("salary_range"),
             "posted_at": job.get("posted_at"),
-            "match_score": item["score"],
-            "match_percentage": f"{max(0, min(int(item['score']), 100))}%",
-            "matching_skills": item["matching_skills"][:5],
-            "match_reason": item["match_reason"],
+            "match_score": score,
+            "match_percentage": f"{max(0, min(score, 100))}%",
+            "matching_skills": matching_skills[:5],
+            "match_reason": _build_match_reason(score, matching_skills, preferred_role, job),
             "url": job.get("source_url")
         })
     
+    has_more = (skip + limit) < len(feed)
     return {
         "jobs": jobs_list,
-        "total": len(scored_jobs),
+        "total": len(feed),
         "showing": len(jobs_list),
-        "has_more": (skip + limit) < len(scored_jobs),
+        "has_more": has_more,
+        "next_cursor": encode_cursor(skip + limit, feed.jobs_version) if has_more else None,
+        "cursor_reset": cursor_reset,
         "filters_applied": {
-            "experience": user_experience,
+            "experience": context["user_experience"],
             "preferred_role": preferred_role,
-            "preferred_location": preferred_location,
+            "preferred_location": context["preferred_location"],
             "skills_count": len(user_skills)
         }
     }
 
 
-def _extract_skills_from_description(description: str, user_skills: set) -> list:
-    """
-    Find user skills mentioned in a job description text.
-    Returns list of matched skill strings.
-    """
-    if not description or not user_skills:
-        return []
-    
-    desc_lower = description.lower()
-    matched = []
-    for skill in user_skills:
-        # Match whole word boundaries to avoid false positives
-        # e.g. "r" shouldn't match "requirements"
-        if len(skill) <= 2:
-            # For very short skills (C, R, Go), require exact boundaries
-            import re
-            if re.search(r'\b' + re.escape(skill) + r'\b', desc_lower):
-                matched.append(skill)
-        else:
-            if skill in desc_lower:
-                matched.append(skill)
-    return matched
-
-
-def _score_job(job, user_experience, preferred_role, preferred_location, user_skills):
+def _rank_personalized_feed(user_id: str, search: Optional[str], search_type: Optional[str]):
     """
-    Score a job against user profile.
-    Returns (score: int, matching_skills: list)
-    
-    Scoring: Skills 50pts, Role 25pts, Location 15pts, Experience 10pts = 100pts max
+    Fetch the profile and candidates, score them and rank the whole feed.
+    Blocking; the route runs it through run_db.
+    Returns (RankedFeed, candidate rows by id)
     """
-    score = 0
-    matching_skills = []
-    
-    # === SKILLS MATCHING (50 pts max) ===
-    # Get skills from the job's skills_required column
-    job_skills_col = set(s.lower() for s in (job.get("skills_required") or []))
-    
-    # Also extract from description
-    desc_skills = _extract_skills_from_description(job.get("description", ""), user_skills)
-    
-    # Combine all matched skills
-    all_matched = set()
-    if user_skills and job_skills_col:
-        all_matched.update(user_skills & job_skills_col)
-    all_matched.update(desc_skills)
-    
-    matching_skills = list(all_matched)
+    jobs = get_jobs_collection()
+    jobs_version = jobs_sync.version
     
-    if matching_skills:
-        # Count-based scoring: more matched skills = higher score
-        n = len(matching_skills)
-        if n >= 7:
-            score += 50
-        elif n >= 5:
-            score += 40
-        elif n >= 3:
-            score += 30
-        elif n >= 2:
-            score += 20
+    # Get user profile (normalized once per profile version)
+    view = profile_cache.load(user_id)
+    if view is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found. Please complete your profile."
+        )
+    user_experience = view.experience_years
+    preferred_role = view.preferred_role
+    preferred_location = view.preferred_location
+    user_skills = view.skills
+    
+    logger.info(f"Personalized jobs for user {user_id}: {len(user_skills)} skills, role={preferred_role}, exp={user_experience}")
+    
+    # Search: match ids from the in-memory search index once it is loaded,
+    # otherwise a substring filter applied with the candidate fetch
+    indexed_search = bool(search) and jobs_sync.ready
+    search_filter = ilike_filter(search, search_type) if search and not indexed_search else None
+    
+    # Candidate generation: union of the user's skill postings when the index is loaded,
+    # otherwise the newest jobs
+    candidate_ids = []
+    if user_skills and jobs_sync.ready:
+        skill_index.observe(user_skills)
+        candidate_ids = skill_index.candidates(user_skills, settings.SKILL_INDEX_MAX_CANDIDATES)
+    
+    if indexed_search:
+        fields = search_fields(search_type)
+        if candidate_ids:
+            matched = search_index.matches(search, fields)
+            candidate_ids = [job_id for job_id in candidate_ids if job_id in matched]
         else:
-            score += 10
-    
-    # === ROLE MATCHING (50 pts max) ===
-    job_role = (job.get("role") or "").lower()
-    if preferred_role:
-        role_lower = preferred_role.lower()
-        # Split role into keywords for flexible matching
-        role_keywords = [w for w in role_lower.replace("-", " ").split() if len(w) > 2]
-        matched_keywords = sum(1 for kw in role_keywords if kw in job_role)
-        if matched_keywords > 0:
-            score += min(int((matched_keywords / max(len(role_keywords), 1)) * 50), 50)
-    
-    # === LOCATION MATCHING (Filter) ===
-    # Realistically people don't want to relocate just because skills matched an un-preferred location
-    location_matched = False
-    if job.get("is_remote"):
-        location_matched = True
-        score += 30  # Remote jobs fit anywhere
-    elif preferred_location:
-        job_loc = (job.get("location") or "").lower()
-        pref_locs = [loc.strip().lower() for loc in preferred_location.split(",") if loc.strip()]
-        if any(pref_loc in job_loc for pref_loc in pref_locs):
-            location_matched = True
-            score += 30
-    else:
-        location_matched = True # No preference set
-        score += 10
-        
-    if not location_matched and preferred_location:
-        # Heavily penalize mismatch so it never shows 100% or at top of results
-        score -= 200
-    
-    # === EXPERIENCE MATCHING (10 pts) ===
-    job_exp = _parse_experience_level(job.get("experience_level"))
-    exp_is_fit = False
-    if job_exp is not None:
-        if job_exp <= user_experience + 1:
-            score += 10  # Good fit
-            exp_is_fit = True
-        elif job_exp <= user_experience + 3:
-            score += 5   # Stretch but possible
-            exp_is_fit = True
-        # If job requires way more experience, no points
+            ranked, _ = search_index.search(search, fields, limit=settings.SKILL_INDEX_MAX_CANDIDATES)
+            candidate_ids = [job_id for job_id, _ in ranked]
+    
+    snapshot = jobs_snapshot.get()
+    if candidate_ids or indexed_search:
+        all_jobs = fetch_jobs_by_ids(candidate_ids, columns=projection("scoring"), or_filter=search_filter)
+    elif snapshot is not None and not search_filter:
+        all_jobs = snapshot.newest(2000, SCORING_COLUMNS)
     else:
-        score += 5  # No requirement = neutral
-        exp_is_fit = True
-        
-    # === MNC AND HIGH SALARY BONUS (Up to 60 bonus pts) ===
-    # Add significant bonus to sort these higher, but only if they fit the user's experience
-    if exp_is_fit:
-        # FAANG / Top Tech / Fortune 500 bonus (40 pts)
-        faang_companies = {
-            "google", "amazon", "microsoft", "meta", "apple", "netflix", "uber", "airbnb", 
-            "stripe", "linkedin", "atlassian", "salesforce", "oracle", "nvidia", "intel",
-            "ibm", "cisco", "adobe", "tesla", "spacex", "palantir", "databricks", "snowflake",
-            "bloomberg", "twilio", "spotify", "x", "twitter", "lyft", "doordash", "instacart",
-            "pinterest", "snap", "square", "block", "coinbase", "robinhood", "plaid"
-        }
-        job_company = (job.get("company") or "").lower()
-        
-        # Check if the company exact matches or is strongly inside
-        matched_mnc = False
-        for fc in faang_companies:
-            if fc == job_company or f"{fc} " in job_company or f" {fc}" in job_company:
-                matched_mnc = True
-                break
-                
-        if matched_mnc:
-            score += 40
-            
-        # High Salary bonus (20 pts)
-        salary_str = (job.get("salary") or "").lower()
-        if salary_str and salary_str not in ["not disclosed", "hidden", ""]:
-            high_pay_keywords = ["100k", "120k", "150k", "200k", "250k", "300k", 
-                                "30l", "40l", "50l", "60l", "100,000", "150,000", "200,000", "crore", "cr"]
-            if any(k in salary_str for k in high_pay_keywords):
-                score += 20
-        # If it just has a salary listed that isn't "not disclosed", add a small bonus (10 pts)
-        elif salary_str and salary_str not in ["not disclosed", "hidden", ""]:
-            score += 10
-        elif "$" in salary_str and any(c.isdigit() for c in salary_str):
-            # Generous fallback: any dollar amount often signifies a higher paying/global job
-            score += 10
-    
-    return score, matching_skills
+        query = jobs.select(projection("scoring"))
+        if search_filter:
+            query = query.or_(search_filter)
+        res_jobs = query.order("posted_at", desc=True).limit(2000).execute()
+        all_jobs = res_jobs.data
+    
+    # Score all candidates in one vectorized pass
+    columns = JobFeatureColumns(all_jobs)
+    scores, matches = batch_scorer.score(
+        columns, user_experience, preferred_role, preferred_location, user_skills
+    )
+    
+    # Rank the whole feed by score DESC then posted_at DESC
+    ranked = top_k(
+        range(len(all_jobs)), len(all_jobs),
+        score=lambda i: scores[i],
+        posted_at=lambda i: all_jobs[i].get("posted_at")
+    )
+    context = {
+        "user_experience": user_experience,
+        "preferred_role": preferred_role,
+        "preferred_location": preferred_location,
+        "user_skills": user_skills,
+    }
+    feed = RankedFeed(
+        [all_jobs[i]["id"] for i in ranked],
+        [scores[i] for i in ranked],
+        context,
+        jobs_version
+    )
+    return feed, {str(job["id"]): job for job in all_jobs}
 
 
 def _build_match_reason(score, matching_skills, preferred_role, job):
@@ -587,20 +486,15 @@ async def apply_to_job(
     """
     Apply to a job (REQUIRES AUTH)
     """
-    jobs = get_jobs_collection()
-    
     # Verify job exists
-    # Use OR search
-    res = jobs.select("*").or_(f"id.eq.{job_id},job_id.eq.{job_id}").execute()
+    job = await run_db(fetch_job, job_id, projection("card"))
 
-    if not res.data:
+    if job is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
     
-    job = res.data[0]
-    
     # TODO: Store application in database
     
     return {
@@ -8,7 +8,9 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 from datetime import datetime
 from app.models import UserInDB, Token
 from app.auth import hash_password, create_access_token, get_current_user_id
-from app.database import get_users_collection, get_profiles_collection
+from app.database import get_users_collection, get_profiles_collection, run_db
+from app.feed_cache import feed_cache
+from app.profile_cache import profile_cache
 from app.file_handler import file_handler
 from app.resume_parser import resume_parser
 
@@ -61,6 +63,8 @@ async def parse_and_enhance_profile(file_path: str, user_id: str):
                 update_data["experience_years"] = int(profile_data.total_years_experience)
             
             profiles.update(update_data).eq("user_id", user_id).execute()
+            profile_cache.invalidate(user_id)
+            feed_cache.invalidate_user(user_id)
             
             logger.info(f"Profile enhanced for user {user_id}")
         
@@ -72,6 +76,7 @@ async def parse_and_enhance_profile(file_path: str, user_id: str):
              "parsing_status": "failed",
              "parsed_data": {"error": str(e)}
         }).eq("user_id", user_id).execute()
+        profile_cache.invalidate(user_id)
 
 
 @router.post("/quick-signup", response_model=dict)
@@ -191,17 +196,17 @@ async def get_profile_status(current_user_id: str = Depends(get_current_user_id)
     """
     Get current profile parsing status
     """
-    profiles = get_profiles_collection()
-    res = profiles.select("*").eq("user_id", current_user_id).execute()
+    view = await run_db(profile_cache.load, current_user_id)
     
-    if not res.data:
+    if view is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found"
         )
     
-    profile = res.data[0]
-    # Handle parsed_data being None or dict
+    profile = view.profile
+    # The display list, as parsed (original casing, soft skills included);
+    # view.skill_list is the normalized matching input
     user_skills_raw = profile.get("skills") or {}
     all_skills = []
     
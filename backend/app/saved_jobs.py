@@ -0,0 +1,61 @@
+"""
+Saved-jobs read model
+
+A saved-list page is one request: the saved rows joined (!inner) to the
+card columns of their jobs, keyset-paginated on (saved_at, id), with the
+total counted in the same request only when the per-user count isn't
+cached. Save and unsave adjust the cached count in place, so in steady
+state a page never counts and latency stays flat however many jobs a
+user has saved.
+
+The inner join drops saved rows whose job no longer exists server-side,
+so pages are always full and the total matches what can be listed.
+"""
+from typing import List, Optional, Tuple
+
+from app.count_cache import count_cache, saved_jobs_namespace
+from app.database import get_saved_jobs_collection
+from app.pagination import apply_keyset, keyset_order, keyset_page
+from app.projections import projection
+
+# "*": the saved_jobs columns vary between deployments (notes is optional)
+SAVED_JOBS_SELECT = f"*, jobs!inner({projection('card')})"
+
+
+def fetch_saved_page(
+    user_id: str,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str], Optional[int]]:
+    """
+    One page of a user's saved jobs and their total, in one round trip.
+    Blocking; async routes call it through run_db.
+
+    Returns:
+        (saved rows with an embedded `jobs` card, next_cursor, total)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    namespace = saved_jobs_namespace(user_id)
+    total, generation = count_cache.peek(namespace, ())
+
+    count = None if total is not None else "exact"
+    query = get_saved_jobs_collection().select(SAVED_JOBS_SELECT, count=count).eq("user_id", user_id)
+    if cursor:
+        query = apply_keyset(query, "saved_at", cursor)
+        res = keyset_order(query, "saved_at").limit(limit + 1).execute()
+    else:
+        res = keyset_order(query, "saved_at").range(skip, skip + limit).execute()
+    records, next_cursor = keyset_page(res.data or [], limit, "saved_at")
+
+    if total is None:
+        total = res.count
+        count_cache.store(namespace, (), total, generation)
+    return records, next_cursor, total
+
+
+def record_saved(user_id: str, delta: int):
+    """Keep the cached saved count in step with a save (+1) or unsave (-n)"""
+    count_cache.adjust(saved_jobs_namespace(user_id), (), delta)
@@ -0,0 +1,329 @@
+"""
+In-memory full-text search over the jobs corpus
+
+An inverted index from tokens to the jobs whose role, company or
+description contain them, kept in step with the jobs table by JobsSync
+(inactive jobs are dropped as their rows arrive). Queries are ranked with
+BM25F: per-field term frequencies are length-normalized, weighted
+role > company > description and saturated once per term, so a keyword in
+the title outranks the same keyword buried in a long description.
+
+The last query term also matches as a prefix ("goog" finds Google, "eng"
+finds Backend Engineer), and dotted terms are indexed whole and by part
+("node" finds Node.js), so type-ahead searches keep the partial-word
+matches of the ilike search they replaced.
+
+Listing filters (location, remote, experience) are evaluated against the
+indexed attributes, so a search page costs one request for its own rows.
+"""
+import bisect
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.jobs_sync import jobs_sync
+from app.ranking import recency_key
+from app.skill_index import fetch_jobs_by_ids
+
+logger = logging.getLogger(__name__)
+
+INDEX_COLUMNS = (
+    "id", "role", "company", "description", "location", "is_remote",
+    "min_years_experience", "experience_level", "is_active", "posted_at",
+)
+
+FIELDS = ("role", "company", "description")
+FIELD_WEIGHTS = (3.0, 2.0, 1.0)
+
+# search_type -> fields searched (the historical ilike columns)
+SEARCH_FIELDS = {
+    "company": ("company",),
+    "role": ("role",),
+    "skill": ("description",),
+}
+
+# BM25 saturation and length normalization
+K1 = 1.2
+B = 0.75
+
+# Term frequencies of the three fields packed in one int, 8 bits each
+_SHIFTS = (16, 8, 0)
+_TF_MAX = 0xFF
+
+# Keeps c++, c#, node.js and asp.net whole; a trailing '.' is punctuation
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+# Indexed terms the last query term expands to as a prefix, most common first
+MAX_PREFIX_TERMS = 32
+MIN_PREFIX_LENGTH = 2
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the "
+    "this to we will with you your".split()
+)
+
+
+def _fold(token: str) -> str:
+    """Fold simple plurals so 'engineers' matches 'engineer'"""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss") and token.isalpha():
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase search tokens of `text`, stopwords removed"""
+    if not text:
+        return []
+    return [_fold(t) for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def index_tokens(text: Optional[str]) -> List[str]:
+    """Tokens indexed for `text`: dotted tokens also contribute their parts (node.js -> node, js)"""
+    tokens = []
+    for token in tokenize(text):
+        tokens.append(token)
+        if "." in token:
+            tokens.extend(part for part in token.split(".") if part not in STOPWORDS)
+    return tokens
+
+
+def search_fields(search_type: Optional[str]) -> Sequence[str]:
+    return SEARCH_FIELDS.get(search_type, FIELDS)
+
+
+def ilike_filter(search: str, search_type: Optional[str]) -> str:
+    """
+    PostgREST or_ filter matching any keyword as a substring of the searched
+    fields; used while the index is still loading.
+    """
+    keywords = [kw.strip() for kw in search.split() if len(kw.strip()) > 1]
+    if not keywords:
+        keywords = [search.strip()]
+    return ",".join(
+        f"{field}.ilike.%{kw}%" for kw in keywords for field in search_fields(search_type)
+    )
+
+
+class _Doc:
+    __slots__ = ("job_id", "lengths", "location", "is_remote", "min_years", "experience_level", "recency")
+
+    def __init__(self, row: dict, lengths: Tuple[int, int, int]):
+        self.job_id = str(row["id"])
+        self.lengths = lengths
+        self.location = (row.get("location") or "").lower()
+        self.is_remote = bool(row.get("is_remote"))
+        self.min_years = row.get("min_years_experience")
+        self.experience_level = row.get("experience_level")
+        self.recency = recency_key(row.get("posted_at"))
+
+
+def listing_filter(
+    location: Optional[str] = None,
+    remote_only: bool = False,
+    experience: Optional[int] = None,
+    experience_level: Optional[str] = None,
+) -> Optional[Callable[[_Doc], bool]]:
+    """
+    Predicate over indexed jobs equivalent to the listing query filters,
+    or None when nothing is filtered.
+    """
+    location = location.lower() if location else None
+    if not (location or remote_only or experience is not None or experience_level):
+        return None
+
+    def where(doc: _Doc) -> bool:
+        if location and location not in doc.location:
+            return False
+        if remote_only and not doc.is_remote:
+            return False
+        if experience is not None and doc.min_years is not None and doc.min_years > experience + 1:
+            return False
+        if experience_level and doc.experience_level != experience_level:
+            return False
+        return True
+
+    return where
+
+
+class SearchIndex:
+    """Token -> {job id: packed field frequencies} postings, refreshed from JobsSync"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._docs: Dict[str, _Doc] = {}
+        self._terms: Dict[str, Tuple[str, ...]] = {}
+        self._sorted_terms: List[str] = []  # postings keys, for prefix lookups
+        self._total_lengths = [0, 0, 0]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _add(self, row: dict, track_terms: bool = True):
+        counts = [Counter(index_tokens(row.get(field))) for field in FIELDS]
+        doc = _Doc(row, tuple(sum(c.values()) for c in counts))
+        packed = Counter()
+        for shift, field_counts in zip(_SHIFTS, counts):
+            for term, tf in field_counts.items():
+                packed[term] |= min(tf, _TF_MAX) << shift
+        for term, value in packed.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                if track_terms:
+                    bisect.insort(self._sorted_terms, term)
+            posting[doc.job_id] = value
+        self._docs[doc.job_id] = doc
+        self._terms[doc.job_id] = tuple(packed)
+        for i, length in enumerate(doc.lengths):
+            self._total_lengths[i] += length
+
+    def _discard(self, job_id: str):
+        doc = self._docs.pop(job_id, None)
+        if doc is None:
+            return
+        for i, length in enumerate(doc.lengths):
+            self._total_lengths[i] -= length
+        for term in self._terms.pop(job_id, ()):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(job_id, None)
+                if not posting:
+                    del self._postings[term]
+                    position = bisect.bisect_left(self._sorted_terms, term)
+                    if position < len(self._sorted_terms) and self._sorted_terms[position] == term:
+                        del self._sorted_terms[position]
+
+    def reset(self, rows: List[dict]):
+        """Rebuild the whole index from a full load"""
+        with self._lock:
+            self._postings = {}
+            self._docs = {}
+            self._terms = {}
+            self._total_lengths = [0, 0, 0]
+            for row in rows:
+                if row.get("is_active") is not False:
+                    self._add(row, track_terms=False)
+            self._sorted_terms = sorted(self._postings)
+        logger.info(f"Search index rebuilt: {len(self._docs)} jobs, {len(self._postings)} terms")
+
+    def upsert(self, rows: List[dict]):
+        """Apply inserted or updated rows; deactivated jobs leave the index"""
+        with self._lock:
+            for row in rows:
+                self._discard(str(row["id"]))
+                if row.get("is_active") is not False:
+                    self._add(row)
+
+    def remove(self, job_ids: Iterable[str]):
+        with self._lock:
+            for job_id in job_ids:
+                self._discard(str(job_id))
+
+    def _prefixed(self, prefix: str) -> List[str]:
+        """The most common indexed terms starting with `prefix`; caller holds the lock"""
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return []
+        start = bisect.bisect_left(self._sorted_terms, prefix)
+        end = bisect.bisect_left(self._sorted_terms, prefix + "\uffff", lo=start)
+        candidates = self._sorted_terms[start:end]
+        if len(candidates) > MAX_PREFIX_TERMS:
+            candidates = heapq.nlargest(MAX_PREFIX_TERMS, candidates, key=lambda t: len(self._postings[t]))
+        return candidates
+
+    def _score(
+        self,
+        query: str,
+        fields: Sequence[str],
+        where: Optional[Callable[[_Doc], bool]] = None,
+    ) -> Tuple[Dict[str, float], Dict[str, _Doc]]:
+        """
+        BM25F score of every job matching any query term in `fields`, the last
+        term also as a prefix, plus the docs the scores were computed from
+        """
+        tokens = tokenize(query)
+        terms = set(tokens)
+        selected = [(FIELDS.index(f), _SHIFTS[FIELDS.index(f)]) for f in fields]
+        scores: Dict[str, float] = {}
+        with self._lock:
+            docs = self._docs
+            n = len(docs)
+            if not n:
+                return scores, docs
+            if tokens:
+                terms.update(self._prefixed(tokens[-1]))
+            averages = [max(total / n, 1.0) for total in self._total_lengths]
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for job_id, packed in posting.items():
+                    lengths = docs[job_id].lengths
+                    tf = 0.0
+                    for i, shift in selected:
+                        count = (packed >> shift) & _TF_MAX
+                        if count:
+                            tf += FIELD_WEIGHTS[i] * count / (1 - B + B * lengths[i] / averages[i])
+                    if tf:
+                        scores[job_id] = scores.get(job_id, 0.0) + idf * tf / (K1 + tf)
+            if where is not None:
+                scores = {job_id: s for job_id, s in scores.items() if where(docs[job_id])}
+        return scores, docs
+
+    def search(
+        self,
+        query: str,
+        fields: Sequence[str] = FIELDS,
+        limit: Optional[int] = None,
+        where: Optional[Callable[[_Doc], bool]] = None,
+    ) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        Rank jobs matching any term of `query`.
+
+        Returns:
+            (up to `limit` (job id, score) pairs by score DESC then posted_at DESC,
+             total number of matching jobs)
+        """
+        scores, docs = self._score(query, fields, where)
+
+        def key(job_id):
+            doc = docs.get(job_id)
+            return scores[job_id], doc.recency if doc else "", job_id
+
+        if limit is None:
+            ranked = sorted(scores, key=key, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores, key=key)
+        return [(job_id, scores[job_id]) for job_id in ranked], len(scores)
+
+    def matches(self, query: str, fields: Sequence[str] = FIELDS) -> Set[str]:
+        """Ids of jobs matching any term of `query` (the last also as a prefix), unranked"""
+        return set(self._score(query, fields)[0])
+
+
+def fetch_ranked_page(
+    query: str,
+    fields: Sequence[str],
+    offset: int,
+    limit: int,
+    where: Optional[Callable[[_Doc], bool]] = None,
+    columns: str = "*",
+) -> Tuple[List[dict], int]:
+    """
+    One page of search results in relevance order and the total match count.
+    Blocking; async routes call it through run_db.
+    """
+    ranked, total = search_index.search(query, fields, limit=offset + limit, where=where)
+    page_ids = [job_id for job_id, _ in ranked[offset:]]
+    rows = {str(r["id"]): r for r in fetch_jobs_by_ids(page_ids, columns)}
+    return [rows[job_id] for job_id in page_ids if job_id in rows], total
+
+
+search_index = SearchIndex()
+jobs_sync.subscribe(search_index, INDEX_COLUMNS)
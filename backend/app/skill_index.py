@@ -0,0 +1,170 @@
+"""
+In-memory inverted skill index over the jobs corpus
+
+Maps each normalized skill to the ids of jobs that mention it, built from
+`skills_required` plus skills found in descriptions. Candidate generation
+for personalized feeds pulls the union of a user's skill postings instead
+of a fixed window of the newest jobs.
+
+Descriptions are matched against the skill vocabulary plus the skills
+profiles ask for (the most recently seen SKILL_INDEX_MAX_OBSERVED_SKILLS
+of those outside the vocabulary), not against every skills_required value
+in the corpus: a full reload then costs rows x matched terms, bounded by
+the vocabulary and profiles rather than by what scrapers emit.
+"""
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Set
+
+from app.config import settings
+from app.constants import COMMON_SKILLS
+from app.database import get_jobs_collection
+from app.job_features import SKILL_VOCABULARY
+from app.jobs_snapshot import columns_of, jobs_snapshot
+from app.jobs_sync import jobs_sync
+from app.ranking import top_k
+from app.skill_matcher import SkillMatcher
+
+logger = logging.getLogger(__name__)
+
+INDEX_COLUMNS = ("id", "skills_required", "extracted_skills", "description", "posted_at")
+
+# Ids per `in` filter; keeps PostgREST request URLs well under length limits
+ID_FETCH_CHUNK = 200
+
+
+def _normalize(skill: str) -> str:
+    return skill.lower().strip()
+
+
+class SkillIndex:
+    """Skill -> job id posting lists, refreshed from JobsSync"""
+
+    def __init__(self, vocabulary: Iterable[str] = ()):
+        self._vocabulary: Set[str] = {_normalize(s) for s in vocabulary if s and s.strip()}
+        self._observed: OrderedDict = OrderedDict()  # profile skills outside the vocabulary, oldest first
+        self._matchers = (None, None, None)  # (terms, matcher, matcher for terms outside SKILL_VOCABULARY)
+        self._postings: Dict[str, Set[str]] = {}
+        self._job_skills: Dict[str, frozenset] = {}
+        self._posted_at: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._job_skills)
+
+    def _entries(self, rows: List[dict]) -> List[tuple]:
+        """(job id, skills) for each row, matching descriptions against the vocabulary and observed skills"""
+        with self._lock:
+            matcher, extra_matcher = self._current_matchers()
+        entries = []
+        for r in rows:
+            req = {_normalize(s) for s in (r.get("skills_required") or []) if s and s.strip()}
+            description = r.get("description") or ""
+            extracted = r.get("extracted_skills")
+            if extracted is not None:
+                found = set(extracted).union(extra_matcher.match(description))
+            else:
+                found = matcher.match(description)
+            entries.append((str(r["id"]), frozenset(req.union(found)), r.get("posted_at")))
+        return entries
+
+    def _current_matchers(self) -> tuple:
+        """Matchers for the vocabulary plus observed skills, rebuilt only when those change"""
+        terms = frozenset(self._vocabulary.union(self._observed))
+        if self._matchers[0] != terms:
+            # Rows with ingest-time extracted_skills only need matching for terms outside that vocabulary
+            self._matchers = (terms, SkillMatcher(terms), SkillMatcher(terms - SKILL_VOCABULARY))
+        return self._matchers[1:]
+
+    def _add(self, job_id: str, skills: frozenset, posted_at):
+        self._job_skills[job_id] = skills
+        self._posted_at[job_id] = posted_at
+        for skill in skills:
+            self._postings.setdefault(skill, set()).add(job_id)
+
+    def _discard(self, job_id: str):
+        self._posted_at.pop(job_id, None)
+        for skill in self._job_skills.pop(job_id, ()):
+            posting = self._postings.get(skill)
+            if posting is not None:
+                posting.discard(job_id)
+                if not posting:
+                    del self._postings[skill]
+
+    def reset(self, rows: List[dict]):
+        """Rebuild the whole index from a full load"""
+        entries = self._entries(rows)
+        with self._lock:
+            self._postings = {}
+            self._job_skills = {}
+            self._posted_at = {}
+            for entry in entries:
+                self._add(*entry)
+        logger.info(f"Skill index rebuilt: {len(self._job_skills)} jobs, {len(self._postings)} skills")
+
+    def upsert(self, rows: List[dict]):
+        """Apply inserted or updated rows"""
+        entries = self._entries(rows)
+        with self._lock:
+            for entry in entries:
+                self._discard(entry[0])
+                self._add(*entry)
+
+    def remove(self, job_ids: Iterable[str]):
+        with self._lock:
+            for job_id in job_ids:
+                self._discard(str(job_id))
+
+    def observe(self, skills: Iterable[str]):
+        """
+        Match profile skills the vocabulary lacks in descriptions too.
+
+        Description matches for new terms are picked up on the next full
+        reload. Only the SKILL_INDEX_MAX_OBSERVED_SKILLS most recently seen
+        terms are kept.
+        """
+        with self._lock:
+            for skill in {_normalize(s) for s in skills if s and s.strip()}:
+                if skill in self._vocabulary:
+                    continue
+                self._observed[skill] = True
+                self._observed.move_to_end(skill)
+            while len(self._observed) > settings.SKILL_INDEX_MAX_OBSERVED_SKILLS:
+                self._observed.popitem(last=False)
+
+    def candidates(self, skills: Iterable[str], limit: int) -> List[str]:
+        """
+        Job ids whose postings intersect `skills`, most skill hits first,
+        newest first among equal hits.
+        """
+        hits = Counter()
+        with self._lock:
+            for skill in skills:
+                posting = self._postings.get(skill)
+                if posting:
+                    hits.update(posting)
+            posted_at = self._posted_at
+            return top_k(hits, limit, score=hits.__getitem__, posted_at=lambda job_id: posted_at.get(job_id))
+
+
+def fetch_jobs_by_ids(job_ids: List[str], columns: str = "*", or_filter: str = None) -> List[dict]:
+    """
+    Fetch job rows for candidate ids, from the jobs snapshot where it has
+    them and otherwise in URL-safe chunks
+    """
+    rows = []
+    snapshot = jobs_snapshot.get()
+    if snapshot is not None and not or_filter and snapshot.covers(columns_of(columns)):
+        rows, job_ids = snapshot.rows(job_ids, columns_of(columns))
+    jobs = get_jobs_collection()
+    for start in range(0, len(job_ids), ID_FETCH_CHUNK):
+        query = jobs.select(columns).in_("id", job_ids[start:start + ID_FETCH_CHUNK])
+        if or_filter:
+            query = query.or_(or_filter)
+        rows.extend(query.execute().data or [])
+    return rows
+
+
+skill_index = SkillIndex(COMMON_SKILLS)
+jobs_sync.subscribe(skill_index, INDEX_COLUMNS)
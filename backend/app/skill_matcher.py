@@ -0,0 +1,107 @@
+"""
+Compiled multi-skill matcher for job descriptions
+
+A SkillMatcher is built once per user skill set and cached, so matching a
+description no longer builds and compiles a fresh pattern per skill per job.
+
+Short skills (whole-word matches) are combined into one alternation regex,
+so a description is scanned once for all of them. Longer skills stay plain
+substring checks rather than a single-pass automaton: a pure-Python
+Aho-Corasick walk runs one interpreter step per character and benchmarked
+slower than CPython's C substring search on ~2k-char descriptions
+(2000 descriptions x 50 skills: 0.75s per-job patterns, 0.19s with `in`),
+and one regex alternation can't report overlapping skills (java /
+javascript, sql / mysql) from a single scan.
+"""
+import re
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _is_word_char(ch: str) -> bool:
+    return bool(_WORD_CHAR.match(ch))
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """Whether matches of `a` and `b` can share characters of a text"""
+    if a in b or b in a:
+        return True
+    return any(a.endswith(b[:i]) or b.endswith(a[:i]) for i in range(1, min(len(a), len(b))))
+
+
+def _short_skill_pattern(skill: str) -> str:
+    """
+    Regex equivalent to r'\\b' + re.escape(skill) + r'\\b' that starts with
+    the literal skill text, so the regex engine can scan for it quickly.
+    """
+    escaped = re.escape(skill)
+    # \b before the skill, checked after the literal as a fixed-width lookbehind
+    if _is_word_char(skill[0]):
+        before = rf"(?<!\w{escaped})"
+    else:
+        before = rf"(?<=\w{escaped})"
+    # \b after the skill
+    after = r"(?!\w)" if _is_word_char(skill[-1]) else r"(?=\w)"
+    return escaped + before + after
+
+
+class SkillMatcher:
+    """
+    Find which skills of a fixed skill set occur in a text.
+
+    Skills of 2 characters or fewer (C, R, Go) must match as whole words;
+    longer skills match anywhere in the lowercased text.
+    """
+
+    def __init__(self, skills: Iterable[str]):
+        skills = sorted(s for s in set(skills) if s)
+        self.skills = tuple(skills)
+        self._substring_skills = tuple(s for s in skills if len(s) > 2)
+        # Short skills go in one alternation, except any that could overlap one
+        # already there: a scan consumes each match, so those get their own search
+        combined, separate = [], []
+        for s in (s for s in skills if len(s) <= 2):
+            (separate if any(_overlaps(s, other) for other in combined) else combined).append(s)
+        self._word_scan_size = len(combined)
+        self._word_scan = (
+            re.compile("|".join(_short_skill_pattern(s) for s in combined)).finditer if combined else None
+        )
+        self._word_skills = tuple((s, re.compile(_short_skill_pattern(s)).search) for s in separate)
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def find(self, text_lower: str) -> List[str]:
+        """Return skills found in already-lowercased text"""
+        if not text_lower:
+            return []
+        matched = [s for s in self._substring_skills if s in text_lower]
+        if self._word_scan is not None:
+            found = {}
+            for match in self._word_scan(text_lower):
+                found[match.group()] = None
+                if len(found) == self._word_scan_size:
+                    break
+            matched.extend(found)
+        matched.extend(s for s, search in self._word_skills if search(text_lower))
+        return matched
+
+    def match(self, text: str) -> List[str]:
+        """Return skills found in text (case-insensitive)"""
+        if not text:
+            return []
+        return self.find(text.lower())
+
+
+@lru_cache(maxsize=1024)
+def _cached_matcher(skills: FrozenSet[str]) -> SkillMatcher:
+    return SkillMatcher(skills)
+
+
+def get_skill_matcher(skills: Iterable[str]) -> SkillMatcher:
+    """Return the cached matcher for a skill set, building it on first use"""
+    if not isinstance(skills, frozenset):
+        skills = frozenset(skills)
+    return _cached_matcher(skills)
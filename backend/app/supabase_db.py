@@ -1,23 +1,157 @@
+"""
+Supabase client with a pooled, keep-alive HTTP transport
+
+Every PostgREST call goes through one shared httpx client per process, so
+bursts reuse warm connections instead of paying a TLS handshake each, and
+connect/read/pool timeouts turn a hung backend into a bounded-time error.
+HTTP/2 is used when the optional `h2` package is installed.
+"""
+import importlib.util
 import logging
-from supabase import create_client, Client
+import threading
+
+import httpx
+from supabase import ClientOptions, create_client, Client
 from app.config import settings
+from app.instrumentation import add_payload_bytes
 
 logger = logging.getLogger(__name__)
 
 supabase: Client = None
 
+
+class _CountingStream(httpx.SyncByteStream):
+    """Reports response body bytes to the query being executed"""
+
+    def __init__(self, stream: httpx.SyncByteStream):
+        self._stream = stream
+
+    def __iter__(self):
+        for chunk in self._stream:
+            add_payload_bytes(len(chunk))
+            yield chunk
+
+    def close(self):
+        self._stream.close()
+
+
+class MeteredTransport(httpx.HTTPTransport):
+    """HTTPTransport that tracks in-flight requests and pool errors"""
+
+    def __init__(self, max_connections: int, **kwargs):
+        super().__init__(**kwargs)
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.pool_timeouts = 0
+        self.connect_errors = 0
+        self.read_timeouts = 0
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = super().handle_request(request)
+            response.stream = _CountingStream(response.stream)
+            return response
+        except httpx.PoolTimeout:
+            with self._lock:
+                self.pool_timeouts += 1
+            logger.warning(f"Supabase connection pool exhausted ({self.max_connections} connections)")
+            raise
+        except httpx.ConnectError:
+            with self._lock:
+                self.connect_errors += 1
+            raise
+        except httpx.ReadTimeout:
+            with self._lock:
+                self.read_timeouts += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        connections = getattr(self._pool, "connections", [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "max_connections": self.max_connections,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "saturation": round(self.in_flight / self.max_connections, 3),
+            "requests": self.requests,
+            "pool_timeouts": self.pool_timeouts,
+            "connect_errors": self.connect_errors,
+            "read_timeouts": self.read_timeouts,
+        }
+
+
+_transports = []
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_http_client() -> httpx.Client:
+    """httpx client with the pool limits and timeouts from settings"""
+    http2 = settings.SUPABASE_HTTP2 and http2_available()
+    limits = httpx.Limits(
+        max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+    )
+    transport = MeteredTransport(
+        max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+        limits=limits,
+        http2=http2,
+        retries=1,  # one retry on connect failure only
+    )
+    _transports.append(transport)
+    timeout = httpx.Timeout(
+        connect=settings.SUPABASE_HTTP_CONNECT_TIMEOUT,
+        read=settings.SUPABASE_HTTP_READ_TIMEOUT,
+        write=settings.SUPABASE_HTTP_READ_TIMEOUT,
+        pool=settings.SUPABASE_HTTP_POOL_TIMEOUT,
+    )
+    return httpx.Client(transport=transport, timeout=timeout, follow_redirects=True)
+
+
+def create_pooled_client(url: str, key: str) -> Client:
+    """create_client() on the shared pooled transport settings; used by the API and the scrapers"""
+    return create_client(url, key, options=ClientOptions(httpx_client=build_http_client()))
+
+
+def pool_stats() -> list:
+    """Pool metrics for every pooled client created in this process"""
+    return [transport.stats() for transport in _transports]
+
+
 def get_supabase_client() -> Client:
     global supabase
     if not supabase:
+        if settings.DATABASE_BACKEND == "sqlite":
+            from app.database.sqlite_backend import SQLiteClient
+            supabase = SQLiteClient(settings.SQLITE_PATH)
+            return supabase
         try:
             url = settings.SUPABASE_URL
             key = settings.SUPABASE_SERVICE_KEY or settings.SUPABASE_KEY
             if not url or not key:
                 logger.error("Supabase URL or Key missing in settings")
                 return None
-            
-            supabase = create_client(url, key)
-            logger.info("Supabase client initialized")
+
+            supabase = create_pooled_client(url, key)
+            logger.info(
+                f"Supabase client initialized (max {settings.SUPABASE_HTTP_MAX_CONNECTIONS} connections, "
+                f"http2={settings.SUPABASE_HTTP2 and http2_available()})"
+            )
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {e}")
             return None
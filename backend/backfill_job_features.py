@@ -0,0 +1,53 @@
+"""
+Fill the derived job columns (sql/job_features.sql) for existing rows.
+Run: python backfill_job_features.py
+"""
+import os
+import sys
+import logging
+from dotenv import load_dotenv
+from app.supabase_db import create_pooled_client
+from app.bulk_writer import BulkWriter
+from app.job_features import compute_job_features
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
+
+if not SUPABASE_URL or not SUPABASE_KEY:
+    print("ERROR: SUPABASE_URL or SUPABASE_KEY not set in .env")
+    sys.exit(1)
+
+client = create_pooled_client(SUPABASE_URL, SUPABASE_KEY)
+
+PAGE_SIZE = 500
+SOURCE_COLUMNS = "id, company, role, description, experience_level, salary_range, skills_required"
+
+
+def main():
+    # Upserts on id only update existing rows; company and role ride along for their NOT NULL checks
+    writer = BulkWriter(client, "jobs", on_conflict="id")
+    start = 0
+    updated = 0
+    failed = 0
+    while True:
+        res = client.table("jobs").select(SOURCE_COLUMNS).order("id").range(start, start + PAGE_SIZE - 1).execute()
+        rows = res.data or []
+        result = writer.upsert([
+            {"id": row["id"], "company": row["company"], "role": row["role"], **compute_job_features(row)}
+            for row in rows
+        ])
+        updated += result.written
+        failed += result.failed
+        logging.info(f"Backfilled {updated} jobs ({failed} failed)")
+        if len(rows) < PAGE_SIZE:
+            break
+        start += PAGE_SIZE
+    logging.info("Backfill complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -61,7 +61,17 @@ create table if not exists public.jobs (
   skills_required text[],
   posted_at timestamptz default now(),
   source_url text,
-  is_active boolean default true
+  is_active boolean default true,
+  updated_at timestamptz default now(), -- bumped by trigger, see sql/jobs_updated_at.sql
+  -- Derived at ingest time, see sql/job_features.sql
+  min_years_experience int,
+  max_years_experience int,
+  salary_min numeric,
+  salary_max numeric,
+  salary_currency text,
+  company_tier smallint,
+  extracted_skills text[],
+  role_tokens text[]
 );
 
 -- 4. Saved Jobs (Optional but good to have)
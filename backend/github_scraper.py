@@ -14,7 +14,8 @@ logging.basicConfig(
     format='%(asctime)s %(levelname)s %(message)s'
 )
 
-from supabase import create_client
+from app.supabase_db import create_pooled_client
+from app.job_features import compute_job_features
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
@@ -23,7 +24,7 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     logging.error("Supabase credentials not found in environment!")
     exit(1)
 
-client = create_client(SUPABASE_URL, SUPABASE_KEY)
+client = create_pooled_client(SUPABASE_URL, SUPABASE_KEY)
 logging.info("Supabase connected.")
 
 try:
@@ -97,7 +98,7 @@ def scrape_and_store(term: str, location: str, results_wanted: int = 15):
             desc = str(job.get("description") or "")[:2000]
             is_remote = "remote" in loc.lower() or "remote" in desc.lower()
 
-            formatted.append({
+            row = {
                 "job_id": url, 
                 "company": company,
                 "role": role,
@@ -108,7 +109,9 @@ def scrape_and_store(term: str, location: str, results_wanted: int = 15):
                 "posted_at": posted_at,
                 "job_type": str(job.get("job_type") or "Full-time"),
                 "salary_range": str(job.get("min_amount") or "") or None,
-            })
+            }
+            row.update(compute_job_features(row))
+            formatted.append(row)
         except Exception as e:
             continue
 
@@ -20,12 +20,13 @@ logging.basicConfig(
     ]
 )
 
-from supabase import create_client
+from app.supabase_db import create_pooled_client
+from app.job_features import compute_job_features
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
 
-client = create_client(SUPABASE_URL, SUPABASE_KEY)
+client = create_pooled_client(SUPABASE_URL, SUPABASE_KEY)
 logging.info("Supabase connected.")
 
 try:
@@ -101,7 +102,7 @@ def scrape_and_store(term: str, location: str, results_wanted: int = 15):
             desc = str(job.get("description") or "")[:2000]  # cap description
             is_remote = "remote" in loc.lower() or "remote" in desc.lower()
 
-            formatted.append({
+            row = {
                 "job_id": url,  # URL as unique ID
                 "company": company,
                 "role": role,
@@ -113,7 +114,9 @@ def scrape_and_store(term: str, location: str, results_wanted: int = 15):
                 "job_type": str(job.get("job_type") or "Full-time"),
                 "experience_level": str(job.get("experience_level") or "Entry level"),
                 "salary_range": f"{job.get('min_amount')}-{job.get('max_amount')} {job.get('currency', '')}".strip("- ") if job.get('min_amount') else None,
-            })
+            }
+            row.update(compute_job_features(row))
+            formatted.append(row)
         except Exception as e:
             logging.warning(f"Error formatting job: {e}")
             continue
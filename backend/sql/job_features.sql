@@ -0,0 +1,18 @@
+-- Derived job columns filled at ingest time by app/job_features.py
+alter table public.jobs add column if not exists min_years_experience int;
+alter table public.jobs add column if not exists max_years_experience int;
+alter table public.jobs add column if not exists salary_min numeric;
+alter table public.jobs add column if not exists salary_max numeric;
+alter table public.jobs add column if not exists salary_currency text;
+alter table public.jobs add column if not exists company_tier smallint;
+alter table public.jobs add column if not exists extracted_skills text[];
+alter table public.jobs add column if not exists role_tokens text[];
+-- NULL until backfilled, so readers fall back to the company name instead of reading tier 0
+alter table public.jobs alter column company_tier drop default;
+
+create index if not exists jobs_min_years_experience_idx on public.jobs (min_years_experience);
+create index if not exists jobs_company_tier_idx on public.jobs (company_tier) where company_tier > 0;
+create index if not exists jobs_extracted_skills_idx on public.jobs using gin (extracted_skills);
+create index if not exists jobs_role_tokens_idx on public.jobs using gin (role_tokens);
+
+-- Existing rows: run `python backfill_job_features.py` after applying this migration
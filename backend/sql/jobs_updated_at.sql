@@ -0,0 +1,17 @@
+-- Track when each job row was last written so API workers can pull deltas
+alter table public.jobs add column if not exists updated_at timestamptz default now();
+
+create or replace function public.touch_updated_at()
+returns trigger as $$
+begin
+  new.updated_at = now();
+  return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists jobs_touch_updated_at on public.jobs;
+create trigger jobs_touch_updated_at
+  before insert or update on public.jobs
+  for each row execute function public.touch_updated_at();
+
+create index if not exists jobs_updated_at_idx on public.jobs (updated_at);
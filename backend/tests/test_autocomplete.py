@@ -0,0 +1,62 @@
+import time
+
+from app.autocomplete import Autocomplete
+
+
+def _job(job_id, role="", company="", location="", skills=(), **extra):
+    return {"id": job_id, "role": role, "company": company, "location": location,
+            "skills_required": list(skills), "extracted_skills": None, **extra}
+
+
+def _values(suggestions):
+    return [s["value"] for s in suggestions]
+
+
+def test_seeds_are_offered_before_any_jobs_load():
+    index = Autocomplete({"skill": ["Python", "PyTorch", "Java"]})
+    assert _values(index.suggest("py", "skill")) == ["PyTorch", "Python"]
+    assert index.suggest("py", "company") == []
+    assert index.suggest("  ") == []
+
+
+def test_corpus_frequency_ranks_and_word_starts_match():
+    index = Autocomplete({"role": ["Backend Engineer", "Frontend Engineer"]})
+    index.reset([
+        _job("1", role="Frontend Engineer", company="Google"),
+        _job("2", role="Frontend Engineer", company="Goldman Sachs"),
+        _job("3", role="Data Engineer", company="Goldman Sachs"),
+    ])
+    assert _values(index.suggest("eng", "role")) == ["Frontend Engineer", "Backend Engineer", "Data Engineer"]
+    assert index.suggest("gol", "company") == [{"value": "Goldman Sachs", "kind": "company", "jobs": 2}]
+    assert _values(index.suggest("sachs")) == ["Goldman Sachs"]
+    assert _values(index.suggest("frontend engineer")) == ["Frontend Engineer"]
+
+
+def test_upserts_update_weights_incrementally():
+    index = Autocomplete({"role": ["Backend Engineer"]})
+    index.reset([_job("1", company="Acme")])
+    assert _values(index.suggest("a", "company")) == ["Acme"]  # cached on the node
+    index.upsert([_job("2", company="Anthropic"), _job("3", company="Anthropic")])
+    assert _values(index.suggest("a", "company")) == ["Anthropic", "Acme"]
+    index.upsert([_job("1", company="Initech")])
+    assert _values(index.suggest("a", "company")) == ["Anthropic"]
+    index.upsert([_job("2", company="Anthropic", is_active=False)])
+    index.remove(["3"])
+    assert index.suggest("a", "company") == []
+    assert _values(index.suggest("back", "role")) == ["Backend Engineer"]  # seeds stay
+
+
+def test_long_prefixes_beyond_the_trie_depth():
+    index = Autocomplete({})
+    index.reset([_job("1", role="Senior Machine Learning Engineer"), _job("2", role="Senior Machine Learning Researcher")])
+    assert _values(index.suggest("machine learning eng")) == ["Senior Machine Learning Engineer"]
+
+
+def test_cached_prefix_lookups_are_fast():
+    index = Autocomplete({})
+    index.reset([_job(str(i), company=f"Company {i}", role=f"Engineer {i % 100}") for i in range(20000)])
+    index.suggest("c")
+    start = time.perf_counter()
+    for _ in range(1000):
+        index.suggest("c", "company")
+    assert (time.perf_counter() - start) / 1000 < 0.001
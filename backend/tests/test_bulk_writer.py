@@ -0,0 +1,94 @@
+import httpx
+import pytest
+from postgrest import APIError
+
+from app.bulk_writer import BulkWriter, is_transient
+from app.database.sqlite_backend import SQLiteClient
+
+
+@pytest.fixture
+def client():
+    return SQLiteClient(":memory:")
+
+
+def _rows(n, start=0):
+    return [{"job_id": f"ext-{i}", "company": "Acme", "role": "Engineer"} for i in range(start, start + n)]
+
+
+class _Flaky:
+    """Client whose first `failures` requests fail with a connection error"""
+
+    def __init__(self, client, failures):
+        self.client = client
+        self.failures = failures
+        self.requests = 0
+
+    def table(self, name):
+        outer = self
+
+        class _Builder:
+            def upsert(self, rows, **kwargs):
+                query = outer.client.table(name).upsert(rows, **kwargs)
+
+                class _Query:
+                    def execute(self):
+                        outer.requests += 1
+                        if outer.failures:
+                            outer.failures -= 1
+                            raise httpx.ConnectError("connection reset")
+                        return query.execute()
+
+                return _Query()
+
+        return _Builder()
+
+
+def test_writes_in_chunks_without_returning_rows(client):
+    result = BulkWriter(client, "jobs", on_conflict="job_id", chunk_size=4).upsert(_rows(10))
+    assert (result.written, result.chunks, result.chunks_ok, result.failed) == (10, 3, 3, 0)
+    assert client.table("jobs").select("id", count="exact").execute().count == 10
+
+
+def test_duplicate_keys_in_a_batch_keep_the_last_row(client):
+    rows = _rows(3) + [{"job_id": "ext-1", "company": "Initech", "role": "Engineer"}]
+    assert BulkWriter(client, "jobs", on_conflict="job_id").upsert(rows).written == 3
+    assert client.table("jobs").select("company").eq("job_id", "ext-1").execute().data == [{"company": "Initech"}]
+
+
+def test_rows_with_a_null_key_are_not_deduplicated(client):
+    rows = _rows(2) + [{"job_id": None, "company": c, "role": "Engineer"} for c in ("Acme", "Initech")]
+    assert BulkWriter(client, "jobs", on_conflict="job_id").upsert(rows).written == 4
+    assert client.table("jobs").select("id", count="exact").execute().count == 4
+
+
+def test_rejected_rows_are_isolated_by_bisection(client):
+    rows = _rows(16)
+    rows[5]["not_a_column"] = 1
+    rows[12]["not_a_column"] = 1
+    result = BulkWriter(client, "jobs", on_conflict="job_id", chunk_size=8).upsert(rows)
+    assert result.written == 14
+    assert [r["job_id"] for r in result.failed_rows] == ["ext-5", "ext-12"]
+    assert (result.chunks, result.chunks_ok) == (2, 0)
+    assert client.table("jobs").select("id", count="exact").execute().count == 14
+
+
+def test_transient_failures_are_retried_with_backoff(client):
+    delays = []
+    flaky = _Flaky(client, failures=2)
+    writer = BulkWriter(flaky, "jobs", on_conflict="job_id", max_retries=3, backoff_seconds=0.1, sleep=delays.append)
+    result = writer.upsert(_rows(5))
+    assert result.written == 5 and result.retries == 2
+    assert 0.05 <= delays[0] <= 0.15 and 0.1 <= delays[1] <= 0.3  # jittered, doubling
+
+
+def test_persistent_outage_fails_the_chunk_without_bisecting(client):
+    flaky = _Flaky(client, failures=100)
+    result = BulkWriter(flaky, "jobs", on_conflict="job_id", max_retries=2, sleep=lambda _: None).upsert(_rows(8))
+    assert result.written == 0 and result.failed == 8
+    assert flaky.requests == 3
+
+
+def test_is_transient():
+    assert is_transient(httpx.ReadTimeout("slow"))
+    assert is_transient(APIError({"message": "Bad gateway"}))
+    assert not is_transient(APIError({"code": "23505", "message": "duplicate key"}))
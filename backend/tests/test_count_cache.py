@@ -0,0 +1,73 @@
+from app.count_cache import JOBS_NAMESPACE, CountCache, filter_signature, saved_jobs_namespace
+
+
+def test_filter_signature_drops_unset_values_and_ignores_order():
+    assert filter_signature(location="pune", remote_only=False, search=None) == (("location", "pune"),)
+    assert filter_signature(a=1, b="x") == filter_signature(b="x", a=1)
+    assert filter_signature(remote_only=False, search="") == ()
+
+
+def test_totals_are_cached_until_ttl_or_invalidation():
+    calls = []
+
+    def count():
+        calls.append(1)
+        return 42
+
+    cache = CountCache(ttl_seconds=60, max_entries=10)
+    assert cache.get_or_count(JOBS_NAMESPACE, (), count) == 42
+    assert cache.get_or_count(JOBS_NAMESPACE, (), count) == 42
+    assert len(calls) == 1
+
+    cache.upsert([{"id": "new"}])
+    assert cache.get_or_count(JOBS_NAMESPACE, (), count) == 42
+    assert len(calls) == 2
+
+    expired = CountCache(ttl_seconds=-1, max_entries=10)
+    expired.get_or_count(JOBS_NAMESPACE, (), count)
+    expired.get_or_count(JOBS_NAMESPACE, (), count)
+    assert len(calls) == 4
+
+
+def test_invalidate_is_scoped_to_namespace():
+    cache = CountCache(ttl_seconds=60, max_entries=10)
+    cache.get_or_count(saved_jobs_namespace("u1"), (), lambda: 1)
+    cache.get_or_count(saved_jobs_namespace("u2"), (), lambda: 2)
+    cache.invalidate(saved_jobs_namespace("u1"))
+    assert cache.get_or_count(saved_jobs_namespace("u1"), (), lambda: 5) == 5
+    assert cache.get_or_count(saved_jobs_namespace("u2"), (), lambda: 9) == 2
+
+
+def test_failed_or_racing_counts_are_not_cached():
+    cache = CountCache(ttl_seconds=60, max_entries=10)
+
+    def boom():
+        raise RuntimeError("db down")
+
+    assert cache.get_or_count(JOBS_NAMESPACE, (), boom) is None
+
+    def racing():
+        cache.invalidate(JOBS_NAMESPACE)
+        return 7
+
+    assert cache.get_or_count(JOBS_NAMESPACE, (), racing) == 7
+    assert len(cache) == 0
+
+
+def test_peek_store_and_adjust_in_place():
+    cache = CountCache(ttl_seconds=60, max_entries=10)
+    namespace = saved_jobs_namespace("u1")
+    total, generation = cache.peek(namespace, ())
+    assert total is None
+    cache.store(namespace, (), 3, generation)
+    assert cache.peek(namespace, ())[0] == 3
+
+    cache.adjust(namespace, (), 1)
+    cache.adjust(namespace, (), -5)
+    assert cache.peek(namespace, ())[0] == 0
+
+    # A count taken before a save is not stored over the adjusted total
+    _, generation = cache.peek(namespace, ())
+    cache.adjust(namespace, (), 1)
+    cache.store(namespace, (), 0, generation)
+    assert cache.peek(namespace, ())[0] == 1
@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+import pytest
+
+from app.database import DatabaseTimeout, execute, run_db
+
+
+class _Query:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def execute(self):
+        time.sleep(self.delay)
+        return "rows"
+
+
+def test_execute_runs_query_off_the_loop():
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        result = await execute(_Query(delay=0.1))
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result == "rows"
+    # The loop kept running while the query blocked its worker thread
+    assert ticks > 5
+
+
+def test_slow_calls_raise_database_timeout():
+    with pytest.raises(DatabaseTimeout):
+        asyncio.run(execute(_Query(delay=0.5), timeout=0.05))
+
+
+def test_run_db_passes_arguments_and_errors_through():
+    assert asyncio.run(run_db(lambda a, b=0: a + b, 1, b=2)) == 3
+    with pytest.raises(KeyError):
+        asyncio.run(run_db({}.__getitem__, "missing"))
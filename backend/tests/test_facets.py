@@ -0,0 +1,70 @@
+import time
+
+from app.facets import FacetIndex, experience_bucket, salary_bucket
+
+
+def _job(job_id, location="Pune", is_remote=False, job_type="Full-time", years=None, salary=None, **extra):
+    return {
+        "id": job_id, "location": location, "is_remote": is_remote, "job_type": job_type,
+        "min_years_experience": years, "salary_min": salary, "salary_currency": "INR" if salary else None, **extra,
+    }
+
+
+def _facet(result, name):
+    return {item["value"]: item["count"] for item in result["facets"][name]}
+
+
+def test_buckets():
+    assert [experience_bucket(y) for y in (None, 0, 2, 5, 12)] == ["Not specified", "0-1", "1-3", "5-8", "12+"]
+    assert salary_bucket(1_200_000, "INR") == "10-20L"
+    assert salary_bucket(120_000, "USD") == "Other currency"
+    assert salary_bucket(None, None) == "Not specified"
+
+
+def test_counts_apply_filters_disjunctively():
+    index = FacetIndex()
+    index.reset([
+        _job("a", "Pune", years=2, salary=1_200_000),
+        _job("b", "Pune", is_remote=True, years=6),
+        _job("c", "Bengaluru", is_remote=True, job_type="Contract"),
+        _job("d", "Delhi", is_active=False),
+    ])
+    everything = index.counts()
+    assert everything["total"] == 3
+    assert _facet(everything, "location") == {"Pune": 2, "Bengaluru": 1}
+    assert everything["facets"]["location"][0] == {"value": "Pune", "count": 2}
+    assert _facet(everything, "experience") == {"1-3": 1, "5-8": 1, "Not specified": 1}
+
+    pune = index.counts(location="pun", remote_only=True)
+    assert pune["total"] == 1
+    assert _facet(pune, "location") == {"Pune": 1, "Bengaluru": 1}  # remote jobs, any location
+    assert _facet(pune, "is_remote") == {False: 1, True: 1}  # Pune jobs, remote or not
+    assert _facet(pune, "job_type") == {"Full-time": 1}
+
+    # experience=3 keeps jobs needing at most 4 years, or no stated requirement
+    assert index.counts(experience=3)["total"] == 2
+
+
+def test_upsert_and_remove_reuse_slots():
+    index = FacetIndex()
+    index.reset([_job("a"), _job("b", "Delhi")])
+    index.upsert([_job("a", is_active=False), _job("c", "Delhi")])
+    assert len(index) == 2 and _facet(index.counts(), "location") == {"Delhi": 2}
+    index.remove(["b"])
+    index.upsert([_job("d", "Mumbai")])
+    assert _facet(index.counts(), "location") == {"Delhi": 1, "Mumbai": 1}
+
+
+def test_all_facets_in_one_fast_call():
+    index = FacetIndex()
+    cities = [f"City {i}" for i in range(200)]
+    index.reset([
+        _job(str(i), cities[i % 200], is_remote=i % 3 == 0, years=i % 15, salary=(i % 50) * 100_000 or None)
+        for i in range(50000)
+    ])
+    start = time.perf_counter()
+    result = index.counts(location="city 1", remote_only=True, experience=4)
+    assert time.perf_counter() - start < 0.2
+    assert result["total"] == sum(
+        1 for i in range(50000) if "city 1" in cities[i % 200].lower() and i % 3 == 0 and i % 15 <= 5
+    )
@@ -0,0 +1,55 @@
+import pytest
+
+from app.feed_cache import FeedCache, RankedFeed, decode_cursor, encode_cursor
+
+
+def _feed(n, version=1):
+    return RankedFeed([f"job-{i}" for i in range(n)], list(range(n, 0, -1)), {"user_skills": frozenset()}, version)
+
+
+def test_page_returns_id_score_pairs():
+    feed = _feed(5)
+    assert feed.page(3, 10) == [("job-3", 2), ("job-4", 1)]
+    assert len(feed) == 5
+
+
+def test_version_change_and_ttl_expire_entries():
+    cache = FeedCache(ttl_seconds=60, max_entries=10, max_bytes=1 << 20)
+    cache.put(("u1", "", ""), _feed(3, version=1))
+    assert cache.get(("u1", "", ""), jobs_version=1) is not None
+    assert cache.get(("u1", "", ""), jobs_version=2) is None
+
+    cache = FeedCache(ttl_seconds=-1, max_entries=10, max_bytes=1 << 20)
+    cache.put(("u1", "", ""), _feed(3))
+    assert cache.get(("u1", "", ""), jobs_version=1) is None
+
+
+def test_lru_eviction_respects_entry_and_byte_caps():
+    cache = FeedCache(ttl_seconds=60, max_entries=2, max_bytes=1 << 20)
+    cache.put(("a", "", ""), _feed(2))
+    cache.put(("b", "", ""), _feed(2))
+    cache.get(("a", "", ""), 1)
+    cache.put(("c", "", ""), _feed(2))
+    assert cache.get(("b", "", ""), 1) is None
+    assert cache.get(("a", "", ""), 1) is not None
+
+    one = _feed(100)
+    cache = FeedCache(ttl_seconds=60, max_entries=10, max_bytes=one.nbytes * 2)
+    for user in ("a", "b", "c"):
+        cache.put((user, "", ""), _feed(100))
+    assert len(cache) == 2
+
+
+def test_invalidate_user_drops_all_searches():
+    cache = FeedCache(ttl_seconds=60, max_entries=10, max_bytes=1 << 20)
+    cache.put(("u1", "", ""), _feed(1))
+    cache.put(("u1", "python", "skill"), _feed(1))
+    cache.put(("u2", "", ""), _feed(1))
+    cache.invalidate_user("u1")
+    assert len(cache) == 1
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(40, 7)) == (40, 7)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
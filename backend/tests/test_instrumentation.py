@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.supabase_db as supabase_db
+from app.api.main import app
+from app.config import settings
+from app.count_cache import count_cache
+from app.database import get_jobs_collection, run_db
+from app.instrumentation import (
+    RoundTripBudgetExceeded,
+    current_request,
+    route_metrics,
+    start_request,
+)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "SQLITE_PATH", ":memory:")
+    monkeypatch.setattr(supabase_db, "supabase", None)
+    route_metrics.clear()
+    count_cache.clear()
+    client = supabase_db.get_supabase_client()
+    client.table("jobs").insert([
+        {"job_id": f"j{i}", "company": "Acme", "role": "Engineer", "description": "x" * 100}
+        for i in range(3)
+    ]).execute()
+    yield client
+    route_metrics.clear()
+    count_cache.clear()
+
+
+def test_traced_queries_record_table_operation_rows_and_bytes(db):
+    async def main():
+        stats = start_request()
+        await run_db(get_jobs_collection().select("id,description").eq("company", "Acme").execute)
+        await run_db(get_jobs_collection().update({"role": "Staff"}).eq("job_id", "j0").execute)
+        return stats
+
+    stats = asyncio.run(main())
+    select, update = stats.queries
+    assert (select.table, select.operation, select.rows) == ("jobs", "select", 3)
+    assert (update.table, update.operation, update.rows) == ("jobs", "update", 1)
+    assert select.payload_bytes > 300
+    assert stats.round_trips == 2 and stats.db_ms > 0
+    assert current_request() is None  # asyncio.run used its own context
+
+
+def test_server_timing_header_and_route_histograms(db):
+    client = TestClient(app)
+    response = client.get("/api/jobs/public", params={"limit": 2})
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and '2 queries, 3 rows' in timing and "app;dur=" in timing
+
+    metrics = client.get("/metrics/queries").json()["/api/jobs/public"]
+    assert metrics["requests"] == 1 and metrics["queries"] == 2
+    assert metrics["round_trips"]["buckets"]["2"] == 1
+    assert metrics["tables"] == {"select jobs": 2}
+
+
+def test_round_trip_budget_enforced_in_dev_mode(db, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ENFORCE", True)
+    monkeypatch.setattr(settings, "QUERY_ROUND_TRIP_BUDGETS", {"/api/jobs/public": 1})
+    client = TestClient(app)
+    with pytest.raises(RoundTripBudgetExceeded, match="budget 1"):
+        client.get("/api/jobs/public")
+
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ENFORCE", False)
+    assert client.get("/api/jobs/public").status_code == 200
@@ -0,0 +1,51 @@
+from app.job_features import FEATURE_COLUMNS, compute_job_features, parse_salary_range
+from app.job_scoring import JobFeatureColumns, batch_scorer
+
+
+def test_compute_job_features():
+    features = compute_job_features({
+        "company": "Google India",
+        "role": "Senior Backend Engineer (Python/Go)",
+        "description": "We build APIs with Python, Docker and Kubernetes.",
+        "experience_level": "3-5 years",
+        "salary_range": "₹30L - ₹60L",
+        "skills_required": ["Go"],
+    })
+    assert features["min_years_experience"] == 3
+    assert features["max_years_experience"] == 5
+    assert (features["salary_min"], features["salary_max"], features["salary_currency"]) == (3_000_000, 6_000_000, "INR")
+    assert features["company_tier"] == 1
+    assert {"python", "docker", "kubernetes", "go"} <= set(features["extracted_skills"])
+    assert "backend" in features["role_tokens"]
+
+
+def test_parse_salary_range_formats():
+    assert parse_salary_range("500000.0-800000.0 INR") == (500000.0, 800000.0, "INR")
+    assert parse_salary_range("$120k") == (120000.0, 120000.0, "USD")
+    # A unit after the upper bound applies to the whole range
+    assert parse_salary_range("10-15 LPA") == (1_000_000, 1_500_000, "INR")
+    assert parse_salary_range("₹12-18L") == (1_200_000, 1_800_000, "INR")
+    assert parse_salary_range("12 - 18 lakhs") == (1_200_000, 1_800_000, "INR")
+    assert parse_salary_range("₹12 to ₹18L") == (1_200_000, 1_800_000, "INR")
+    assert parse_salary_range("Not disclosed") == (None, None, None)
+    assert parse_salary_range(None) == (None, None, None)
+
+
+def test_precomputed_columns_score_like_raw_rows():
+    raw = {"company": "Meta", "role": "Backend Engineer", "location": "Remote", "is_remote": True,
+           "experience_level": "5+ years", "description": "python", "skills_required": []}
+    precomputed = dict(raw, **compute_job_features(raw))
+    args = (4, "Backend Engineer", "Bengaluru", {"python"})
+    raw_scores, _ = batch_scorer.score(JobFeatureColumns([raw]), *args)
+    pre_scores, _ = batch_scorer.score(JobFeatureColumns([precomputed]), *args)
+    assert list(raw_scores) == list(pre_scores)
+
+
+def test_rows_not_yet_backfilled_fall_back_to_raw_text():
+    raw = {"company": "Google", "role": "Backend Engineer", "location": "Remote", "is_remote": True,
+           "experience_level": "5+ years", "description": "python", "skills_required": []}
+    unfilled = dict(raw, **{column: None for column in FEATURE_COLUMNS})
+    columns = JobFeatureColumns([unfilled])
+    assert columns.exp_min[0] == 5 and columns.company_tier[0] == 1
+    args = (1, "Backend Engineer", "Bengaluru", {"python"})
+    assert list(batch_scorer.score(columns, *args)[0]) == list(batch_scorer.score(JobFeatureColumns([raw]), *args)[0])
@@ -0,0 +1,90 @@
+import contextvars
+import uuid
+
+import pytest
+
+import app.supabase_db as supabase_db
+from app.config import settings
+from app.instrumentation import start_request
+from app.job_ids import JobIdCache, fetch_job, is_uuid, job_id_cache, resolve_job_id
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "SQLITE_PATH", ":memory:")
+    monkeypatch.setattr(supabase_db, "supabase", None)
+    job_id_cache.clear()
+    client = supabase_db.get_supabase_client()
+    client.table("jobs").insert([
+        {"job_id": "https://jobs.example/a?id=1", "company": "Acme", "role": "Engineer"},
+        {"job_id": str(uuid.uuid4()), "company": "Initech", "role": "Analyst"},
+    ]).execute()
+    yield client
+    job_id_cache.clear()
+
+
+def test_maps_external_and_internal_refs_to_the_internal_id():
+    cache = JobIdCache(max_entries=10)
+    cache.put("uuid-1", "https://jobs.example/1")
+    assert cache.get("https://jobs.example/1") == "uuid-1"
+    assert cache.get("uuid-1") == "uuid-1"
+    assert cache.get("unknown") is None
+
+
+def test_is_bounded_lru():
+    cache = JobIdCache(max_entries=4)
+    cache.put("a", "ext-a")
+    cache.put("b", "ext-b")
+    cache.get("ext-a")  # refresh ext-a
+    cache.put("c", "ext-c")  # evicts the two least recently used refs
+    assert len(cache) == 4
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("ext-a") == "a" and cache.get("ext-c") == "c"
+
+
+def test_discard_forgets_every_ref():
+    cache = JobIdCache(max_entries=10)
+    cache.put("a", "ext-a")
+    cache.put("b", "ext-b")
+    cache.discard("a")
+    assert cache.get("ext-a") is None and cache.get("a") is None
+    assert cache.get("ext-b") == "b"
+
+
+def test_is_uuid():
+    assert is_uuid(str(uuid.uuid4()))
+    assert not is_uuid("https://jobs.example/a?id=1")
+    assert not is_uuid("")
+    ref = uuid.uuid4()
+    assert is_uuid(str(ref).upper())
+    for other_form in (ref.urn, "{%s}" % ref, ref.hex):
+        assert not is_uuid(other_form)
+
+
+def test_fetch_job_queries_one_indexed_column(db):
+    contextvars.copy_context().run(_fetch_and_resolve)
+
+
+def _fetch_and_resolve():
+    stats = start_request()
+    row = fetch_job("https://jobs.example/a?id=1", "company")
+    assert row["company"] == "Acme" and row["id"]
+    assert [q.operation for q in stats.queries] == ["select"]
+
+    # Learned: the external ref and the internal id now resolve without a query
+    assert resolve_job_id("https://jobs.example/a?id=1") == row["id"]
+    assert fetch_job(row["id"], "company")["company"] == "Acme"
+    assert len(stats.queries) == 2
+
+
+def test_uuid_shaped_external_job_ids_fall_back_to_job_id(db):
+    external = db.table("jobs").select("id,job_id").eq("company", "Initech").execute().data[0]
+    assert resolve_job_id(external["job_id"]) == external["id"]
+    assert fetch_job(str(uuid.uuid4()), "company") is None
+
+
+def test_stale_cached_ids_are_dropped(db):
+    job_id_cache.put(str(uuid.uuid4()), "gone")
+    assert fetch_job("gone", "company") is None
+    assert job_id_cache.get("gone") is None
@@ -0,0 +1,184 @@
+import random
+
+from app.job_scoring import (
+    FAANG_COMPANIES,
+    HIGH_PAY_KEYWORDS,
+    JobFeatureColumns,
+    batch_scorer,
+    extract_skills_from_description,
+    parse_experience_level,
+)
+
+COMPANIES = ["Google", "Google India", "Acme Corp", "Snap Inc", "Boxed", "x", "Meta Platforms", None]
+ROLES = ["Senior Backend Engineer", "Frontend Developer", "Data Scientist", "Full-Stack Engineer", "", None]
+LOCATIONS = ["Bengaluru, India", "Remote", "Pune", "Hyderabad", "", None]
+EXPERIENCE = ["1-3 years", "5+", "Entry level", "Mid-Senior level", "Director", "nan", "Not Applicable", "", None]
+SALARIES = ["150k USD", "not disclosed", "₹12L - ₹18L", "1 crore", "", None]
+DESCRIPTIONS = [
+    "We use Python, Go and AWS. Experience with C is a plus.",
+    "React, TypeScript and node.js; some R for analytics",
+    "requirements: docker kubernetes",
+    "",
+    None,
+]
+SKILLS = ["python", "go", "aws", "react", "docker", "SQL", "Java"]
+
+
+def _reference_score(job, user_experience, preferred_role, preferred_location, user_skills):
+    """
+    The per-job scorer the batch scorer replaced; batch scores must match it.
+    Returns (score: int, matching_skills: list)
+    
+    Scoring: Skills 50pts, Role 25pts, Location 15pts, Experience 10pts = 100pts max
+    """
+    score = 0
+    matching_skills = []
+    
+    # === SKILLS MATCHING (50 pts max) ===
+    # Get skills from the job's skills_required column
+    job_skills_col = set(s.lower() for s in (job.get("skills_required") or []))
+    
+    # Also extract from description
+    desc_skills = extract_skills_from_description(job.get("description", ""), user_skills)
+    
+    # Combine all matched skills
+    all_matched = set()
+    if user_skills and job_skills_col:
+        all_matched.update(user_skills & job_skills_col)
+    all_matched.update(desc_skills)
+    
+    matching_skills = list(all_matched)
+    
+    if matching_skills:
+        # Count-based scoring: more matched skills = higher score
+        n = len(matching_skills)
+        if n >= 7:
+            score += 50
+        elif n >= 5:
+            score += 40
+        elif n >= 3:
+            score += 30
+        elif n >= 2:
+            score += 20
+        else:
+            score += 10
+    
+    # === ROLE MATCHING (50 pts max) ===
+    job_role = (job.get("role") or "").lower()
+    if preferred_role:
+        role_lower = preferred_role.lower()
+        # Split role into keywords for flexible matching
+        role_keywords = [w for w in role_lower.replace("-", " ").split() if len(w) > 2]
+        matched_keywords = sum(1 for kw in role_keywords if kw in job_role)
+        if matched_keywords > 0:
+            score += min(int((matched_keywords / max(len(role_keywords), 1)) * 50), 50)
+    
+    # === LOCATION MATCHING (Filter) ===
+    # Realistically people don't want to relocate just because skills matched an un-preferred location
+    location_matched = False
+    if job.get("is_remote"):
+        location_matched = True
+        score += 30  # Remote jobs fit anywhere
+    elif preferred_location:
+        job_loc = (job.get("location") or "").lower()
+        pref_locs = [loc.strip().lower() for loc in preferred_location.split(",") if loc.strip()]
+        if any(pref_loc in job_loc for pref_loc in pref_locs):
+            location_matched = True
+            score += 30
+    else:
+        location_matched = True # No preference set
+        score += 10
+        
+    if not location_matched and preferred_location:
+        # Heavily penalize mismatch so it never shows 100% or at top of results
+        score -= 200
+    
+    # === EXPERIENCE MATCHING (10 pts) ===
+    job_exp = parse_experience_level(job.get("experience_level"))
+    exp_is_fit = False
+    if job_exp is not None:
+        if job_exp <= user_experience + 1:
+            score += 10  # Good fit
+            exp_is_fit = True
+        elif job_exp <= user_experience + 3:
+            score += 5   # Stretch but possible
+            exp_is_fit = True
+        # If job requires way more experience, no points
+    else:
+        score += 5  # No requirement = neutral
+        exp_is_fit = True
+        
+    # === MNC AND HIGH SALARY BONUS (Up to 60 bonus pts) ===
+    # Add significant bonus to sort these higher, but only if they fit the user's experience
+    if exp_is_fit:
+        # FAANG / Top Tech / Fortune 500 bonus (40 pts)
+        job_company = (job.get("company") or "").lower()
+        
+        # Check if the company exact matches or is strongly inside
+        matched_mnc = False
+        for fc in FAANG_COMPANIES:
+            if fc == job_company or f"{fc} " in job_company or f" {fc}" in job_company:
+                matched_mnc = True
+                break
+                
+        if matched_mnc:
+            score += 40
+            
+        # High Salary bonus (20 pts)
+        salary_str = (job.get("salary") or "").lower()
+        if salary_str and salary_str not in ["not disclosed", "hidden", ""]:
+            if any(k in salary_str for k in HIGH_PAY_KEYWORDS):
+                score += 20
+        # If it just has a salary listed that isn't "not disclosed", add a small bonus (10 pts)
+        elif salary_str and salary_str not in ["not disclosed", "hidden", ""]:
+            score += 10
+        elif "$" in salary_str and any(c.isdigit() for c in salary_str):
+            # Generous fallback: any dollar amount often signifies a higher paying/global job
+            score += 10
+    
+    return score, matching_skills
+
+
+def _random_job(rng, i):
+    return {
+        "id": str(i),
+        "company": rng.choice(COMPANIES),
+        "role": rng.choice(ROLES),
+        "location": rng.choice(LOCATIONS),
+        "is_remote": rng.random() < 0.3,
+        "experience_level": rng.choice(EXPERIENCE),
+        "salary": rng.choice(SALARIES),
+        "description": rng.choice(DESCRIPTIONS),
+        "skills_required": rng.sample(SKILLS, rng.randint(0, 4)),
+    }
+
+
+def test_batch_scores_match_reference_scorer():
+    rng = random.Random(7)
+    jobs = [_random_job(rng, i) for i in range(400)]
+    profiles = [
+        (0, "", "", set()),
+        (2, "Backend Engineer", "Bengaluru, Remote", {"python", "go", "aws", "c"}),
+        (6, "full-stack developer", "Pune", {"react", "typescript", "node.js", "r", "docker"}),
+        (10, "Data", " , ", {"sql"}),
+    ]
+    columns = JobFeatureColumns(jobs)
+    for experience, role, location, skills in profiles:
+        scores, matches = batch_scorer.score(columns, experience, role, location, skills)
+        for job, score, matched in zip(jobs, scores, matches):
+            expected_score, expected_skills = _reference_score(job, experience, role, location, skills)
+            assert int(score) == expected_score
+            assert sorted(matched) == sorted(expected_skills)
+
+
+def test_batch_scorer_handles_empty_candidates():
+    scores, matches = batch_scorer.score(JobFeatureColumns([]), 3, "Engineer", "Remote", {"python"})
+    assert len(scores) == 0
+    assert matches == []
+
+
+def test_parse_experience_level():
+    assert parse_experience_level("3-5 years") == 3
+    assert parse_experience_level("Mid-Senior level") == 3
+    assert parse_experience_level("Not Applicable") is None
+    assert parse_experience_level(None) is None
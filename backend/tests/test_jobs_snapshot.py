@@ -0,0 +1,202 @@
+import pytest
+
+from app.config import settings
+from app.jobs_snapshot import JobsSnapshot, SnapshotStore
+from app.jobs_sync import JobsSync, jobs_sync
+from app.projections import CARD_COLUMNS
+
+
+def _rows(n):
+    return [
+        {
+            "id": f"id-{i:03d}",
+            "job_id": f"ext-{i}",
+            "company": ["Acme", "Google"][i % 2],
+            "role": "Engineer",
+            "location": ["Pune", "Bengaluru", "Remote"][i % 3],
+            "is_remote": i % 3 == 2,
+            "min_years_experience": i % 6 or None,
+            "experience_level": "3-5" if i % 4 == 0 else None,
+            # Two jobs share each timestamp, so the id breaks ties
+            "posted_at": f"2024-06-{(i // 2) % 28 + 1:02d}T00:00:00" if i < 50 else None,
+            "is_active": i % 10 != 9,
+        }
+        for i in range(n)
+    ]
+
+
+def _ids(rows):
+    return [r["id"] for r in rows]
+
+
+def test_listing_order_cursor_and_offset_pages_agree():
+    snapshot = JobsSnapshot.build(_rows(60), version=1)
+    assert len(snapshot) == 54 and "id-009" in snapshot.inactive
+
+    everything, _, total = snapshot.listing(CARD_COLUMNS, limit=100)
+    assert total == 54
+    keys = [(r["posted_at"] is not None, r["posted_at"] or "", r["id"]) for r in everything]
+    assert keys == sorted(keys, reverse=True)  # posted_at DESC NULLS LAST, id DESC
+
+    for filters in ({}, {"location": "pun", "remote_only": False}, {"remote_only": True, "experience": 2}):
+        offset_ids = []
+        for skip in range(0, 60, 7):
+            offset_ids += _ids(snapshot.listing(CARD_COLUMNS, 7, skip, **filters)[0])
+        cursor_ids, cursor = [], None
+        while True:
+            page, cursor, _ = snapshot.listing(CARD_COLUMNS, 7, cursor=cursor, **filters)
+            cursor_ids += _ids(page)
+            if not cursor:
+                break
+        assert cursor_ids == offset_ids and len(set(cursor_ids)) == snapshot.listing(CARD_COLUMNS, 1, **filters)[2]
+
+    with pytest.raises(ValueError):
+        snapshot.listing(CARD_COLUMNS, 10, cursor="garbage")
+
+
+def test_filters_match_the_database_semantics():
+    snapshot = JobsSnapshot.build(_rows(60), version=1)
+    rows = [r for r in _rows(60) if r["is_active"]]
+    expected = [r for r in rows if (r["min_years_experience"] is None or r["min_years_experience"] <= 3) and r["is_remote"]]
+    assert snapshot.listing(CARD_COLUMNS, 100, experience=2, remote_only=True)[2] == len(expected)
+    assert snapshot.listing(CARD_COLUMNS, 100, experience_level="3-5")[2] == sum(r["experience_level"] == "3-5" for r in rows)
+
+
+def test_lookups_by_id_and_job_id():
+    snapshot = JobsSnapshot.build(_rows(20), version=1)
+    assert snapshot.row(snapshot.find("ext-4"), ["id", "company"]) == {"id": "id-004", "company": "Acme"}
+    assert snapshot.find("id-004") == snapshot.find("ext-4")
+    assert snapshot.find("ext-9") is None  # inactive
+    found, missing = snapshot.rows(["id-001", "id-009", "id-999"], ["id"])
+    assert found == [{"id": "id-001"}] and missing == ["id-999"]
+
+
+def test_deltas_build_a_new_snapshot_and_swap_it_in():
+    store = SnapshotStore()
+    store.reset(_rows(20))
+    before = store.current
+    store.upsert([{**_rows(20)[1], "company": "Initech"}, {**_rows(20)[2], "is_active": False}])
+    after = store.current
+    assert after is not before and after.version == before.version + 1
+    assert before.row(before.find("id-001"), ["company"]) == {"company": "Google"}  # readers keep their version
+    assert after.row(after.find("id-001"), ["company"]) == {"company": "Initech"}
+    assert after.find("id-002") is None and "id-002" in after.inactive
+    store.remove(["id-003"])
+    assert store.current.find("id-003") is None and len(store.current) == 16
+
+
+def _delta(rows):
+    """Rows after a delta touching every case, plus the delta itself"""
+    by_id = {r["id"]: dict(r) for r in rows}
+    changed = [
+        {**by_id["id-001"], "company": "Initech", "location": "Chennai"},  # values new to the dictionaries
+        {**by_id["id-010"], "posted_at": "2024-07-01T00:00:00"},  # moves to the top
+        {**by_id["id-002"], "is_active": False},
+        {**by_id["id-009"], "is_active": True},
+        {**by_id["id-004"], "job_id": None},
+        {**_rows(1)[0], "id": "id-100", "job_id": "ext-100", "posted_at": None},
+    ]
+    by_id.update((r["id"], r) for r in changed)
+    del by_id["id-003"]
+    return list(by_id.values()), changed, ["id-003"]
+
+
+def _assert_same_reads(snapshot, expected):
+    assert len(snapshot) == len(expected) and list(snapshot.inactive) == list(expected.inactive)
+    for filters in ({}, {"location": "chen"}, {"remote_only": True, "experience": 2}, {"experience_level": "3-5"}):
+        assert snapshot.listing(CARD_COLUMNS, 100, **filters) == expected.listing(CARD_COLUMNS, 100, **filters)
+    for ref in ("id-001", "id-003", "id-004", "ext-4", "ext-9", "id-100", "ext-100", "ext-2"):
+        assert snapshot.find(ref) == expected.find(ref)
+    refs = ["id-001", "id-002", "id-003", "id-009", "id-100", "id-999"]
+    assert snapshot.rows(refs, CARD_COLUMNS) == expected.rows(refs, CARD_COLUMNS)
+
+
+def test_applying_a_delta_matches_a_rebuild(tmp_path):
+    rows = _rows(60)
+    after, changed, removed = _delta(rows)
+    expected = JobsSnapshot.build(after, version=2)
+
+    applied = JobsSnapshot.build(rows, version=1).apply(changed, 2, removed)
+    _assert_same_reads(applied, expected)
+    assert applied.changes == {"previous": 1, "ids": _ids(changed) + removed}
+
+    # Mapped columns are spliced from their encoded bytes, and stay mappable
+    path = str(tmp_path / "jobs.snap")
+    JobsSnapshot.build(rows, version=1).write(path)
+    JobsSnapshot.open(path).apply(changed, 2, removed).write(path)
+    mapped = JobsSnapshot.open(path)
+    _assert_same_reads(mapped, expected)
+    assert mapped.changes == applied.changes
+
+
+def test_mapped_file_serves_the_same_reads(tmp_path):
+    built = JobsSnapshot.build(_rows(60), version=3)
+    path = str(tmp_path / "jobs.snap")
+    built.write(path)
+    mapped = JobsSnapshot.open(path)
+    assert mapped.version == 3 and len(mapped) == len(built) and mapped.mapped_bytes > 0
+    assert list(mapped.inactive) == list(built.inactive)
+    for filters in ({}, {"location": "pun"}, {"remote_only": True, "experience": 2}):
+        assert mapped.listing(CARD_COLUMNS, 100, **filters) == built.listing(CARD_COLUMNS, 100, **filters)
+    assert mapped.find("ext-4") == built.find("ext-4") and mapped.find("ext-9") is None
+    assert mapped.rows(["id-001", "id-009", "id-999"], CARD_COLUMNS) == built.rows(["id-001", "id-009", "id-999"], CARD_COLUMNS)
+
+
+def test_one_worker_writes_and_the_others_map_its_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs_sync, "ready", False)  # readers serve the file without syncing themselves
+    monkeypatch.setattr(settings, "JOBS_SNAPSHOT_POLL_SECONDS", 0)
+    path = str(tmp_path / "jobs.snap")
+    writer, reader = SnapshotStore(path), SnapshotStore(path)
+    writer.reset(_rows(20))
+    reader.reset(_rows(20))
+    assert writer.is_writer and not reader.is_writer
+    first = reader.get()
+    assert first.version == 1 and len(first) == 18
+
+    writer.upsert([{**_rows(20)[1], "company": "Initech"}])
+    second = reader.get()
+    assert second.version == 2 and second.row(second.find("id-001"), ["company"]) == {"company": "Initech"}
+    assert first.row(first.find("id-001"), ["company"]) == {"company": "Google"}  # old mapping stays valid
+    assert reader.stats()["role"] == "reader" and writer.stats()["version"] == 2
+
+
+class _Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def reset(self, rows):
+        self.calls.append(("reset", sorted(_ids(rows))))
+
+    def upsert(self, rows):
+        self.calls.append(("upsert", sorted((r["id"], r["is_active"]) for r in rows)))
+
+
+def test_followers_load_their_indexes_from_the_file_not_the_database(tmp_path):
+    path = str(tmp_path / "jobs.snap")
+    writer = SnapshotStore(path)
+    writer.reset(_rows(20))
+
+    def no_database(since=None):
+        raise AssertionError("a follower read the jobs table")
+
+    store, recorder = SnapshotStore(path), _Recorder()
+    follower = JobsSync()
+    follower._fetch = no_database
+    follower.subscribe(store, ["id"])
+    follower.subscribe(recorder, ["id"])
+    follower.share(store)
+
+    assert follower.refresh() and follower.ready and follower.following
+    active = sorted(_ids(r for r in _rows(20) if r["is_active"]))
+    assert recorder.calls == [("reset", active)] and follower.version == 1
+    assert not follower.refresh()  # nothing new in the file
+
+    writer.upsert([{**_rows(20)[1], "company": "Initech"}, {**_rows(20)[2], "is_active": False}])
+    writer.remove(["id-003"])
+    assert follower.refresh() and follower.version == 3
+    # Two versions behind: the file only records the last delta, so the follower reloads
+    assert recorder.calls[-1] == ("reset", sorted(set(active) - {"id-002", "id-003"}))
+
+    writer.upsert([{**_rows(20)[5], "is_active": False}, {**_rows(20)[6], "role": "Designer"}])
+    assert follower.refresh() and follower.version == 4
+    assert recorder.calls[-1] == ("upsert", [("id-005", False), ("id-006", True)])
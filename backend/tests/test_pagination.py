@@ -0,0 +1,61 @@
+import pytest
+
+from app.pagination import apply_keyset, decode_keyset_cursor, keyset_order, keyset_page
+
+
+class _Recorder:
+    """Records builder calls instead of talking to PostgREST"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return call
+
+
+def _rows(n):
+    return [{"id": f"id-{i}", "posted_at": f"2024-01-{28 - i:02d}T00:00:00+00:00"} for i in range(n)]
+
+
+def test_keyset_page_emits_cursor_only_when_more_rows_exist():
+    page, cursor = keyset_page(_rows(3), 3, "posted_at")
+    assert len(page) == 3 and cursor is None
+
+    page, cursor = keyset_page(_rows(4), 3, "posted_at")
+    assert [r["id"] for r in page] == ["id-0", "id-1", "id-2"]
+    assert decode_keyset_cursor(cursor) == ("2024-01-26T00:00:00+00:00", "id-2")
+
+
+def test_apply_keyset_filters_after_last_row():
+    _, cursor = keyset_page(_rows(2), 1, "posted_at")
+    query = apply_keyset(_Recorder(), "posted_at", cursor)
+    name, (expr,), _ = query.calls[0]
+    assert name == "or_"
+    assert expr == (
+        'posted_at.lt."2024-01-28T00:00:00+00:00",'
+        'and(posted_at.eq."2024-01-28T00:00:00+00:00",id.lt."id-0"),'
+        'posted_at.is.null'
+    )
+
+
+def test_apply_keyset_past_non_null_values():
+    _, cursor = keyset_page([{"id": "a", "posted_at": None}, {"id": "b", "posted_at": None}], 1, "posted_at")
+    query = apply_keyset(_Recorder(), "posted_at", cursor)
+    assert query.calls == [("is_", ("posted_at", "null"), {}), ("lt", ("id", "a"), {})]
+
+
+def test_keyset_order_is_stable():
+    query = keyset_order(_Recorder(), "saved_at")
+    assert query.calls == [
+        ("order", ("saved_at",), {"desc": True, "nullsfirst": False}),
+        ("order", ("id",), {"desc": True}),
+    ]
+
+
+@pytest.mark.parametrize("token", ["", "not-base64!", "WzFd", "eyJrIjogMX0"])
+def test_malformed_cursor_raises_value_error(token):
+    with pytest.raises(ValueError):
+        apply_keyset(_Recorder(), "posted_at", token)
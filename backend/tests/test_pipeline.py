@@ -1,57 +1,357 @@
-from unittest.mock import patch
+"""
+End-to-end pipeline tests on the SQLite database backend:
+scraper ingest (SupabaseHandler.insert_jobs) -> API listing, search, saved jobs and personalized feed.
+"""
+import time
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi.testclient import TestClient
-import mongomock
-from datetime import datetime, timedelta
-import time
-import os
 
-# Patch the db_handler BEFORE importing app/main which uses it
-# We need to patch the MongoClient used in app.database.mongo_client
-with patch("app.database.mongo_client.MongoClient", mongomock.MongoClient):
-    from app.api.main import app
-    from app.database.mongo_client import db_handler
+import app.supabase_db as supabase_db
+from app.api.main import app
+from app.auth import create_access_token
+from app.config import settings
+from app.count_cache import count_cache
+from app.database.mongo_client import SupabaseHandler
+from app.feed_cache import feed_cache
+from app.job_ids import job_id_cache
+from app.jobs_snapshot import JobsSnapshot, jobs_snapshot
+from app.jobs_sync import jobs_sync
+from app.profile_cache import profile_cache
+
+USER_ID = "00000000-0000-0000-0000-0000000000aa"
+COMPANIES = ["Google", "Acme", "Meta", "Initech"]
+ROLES = ["Backend Engineer", "Frontend Developer", "Data Scientist", "DevOps Engineer"]
+DESCRIPTIONS = ["python django aws", "react typescript css", "python sql spark", "docker kubernetes aws"]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "SQLITE_PATH", ":memory:")
+    monkeypatch.setattr(supabase_db, "supabase", None)
+    count_cache.clear()
+    feed_cache.clear()
+    profile_cache.clear()
+    job_id_cache.clear()
+    yield supabase_db.get_supabase_client()
+    count_cache.clear()
+    feed_cache.clear()
+    profile_cache.clear()
+    job_id_cache.clear()
+
+
+@pytest.fixture
+def client(db):
+    token = create_access_token({"sub": USER_ID})
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
 
-client = TestClient(app)
 
-def test_read_main():
+def _scrape(db, n, start=0):
+    """Push scraped jobs through the scraper's write path"""
+    handler = SupabaseHandler()
+    assert handler.client is db
+    now = datetime(2024, 6, 1)
+    jobs = [
+        {
+            "job_id": f"ext-{i}",
+            "company": COMPANIES[i % 4],
+            "role": ROLES[i % 4],
+            "location": ["Bengaluru", "Pune", "Remote"][i % 3],
+            "description": DESCRIPTIONS[i % 4],
+            "is_remote": i % 3 == 2,
+            "url": f"https://jobs.example/{i}",
+            "posted_at": now - timedelta(hours=i),
+            "type": "Full-time",
+            "salary": "₹12L - ₹18L" if i % 5 == 0 else None,
+        }
+        for i in range(start, start + n)
+    ]
+    return handler.insert_jobs(jobs)
+
+
+def test_read_main(client):
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"message": "Job Aggregator API is running."}
-
-def test_mongo_indexes():
-    """Verify that TTL and other indexes exist.
-    Note: mongomock might not perfectly simulate index creation metadata, 
-    but we can check if create_index was called or simpler checks.
-    """
-    # mongomock stores indexes in ._indexes usually? or we just trust the logic if no error raised.
-    # For now, we assume the init didn't crash.
-    pass
-
-def test_api_jobs_latest():
-    """Test the /jobs/latest endpoint."""
-    # Insert dummy job
-    dummy_job = {
-        "title": "Test Job", 
-        "posted_at": datetime.utcnow(), 
-        "url": "http://test.com/1",
-        "expire_at": datetime.utcnow() + timedelta(days=1)
-    }
-    # Clean up first
-    db_handler.collection.delete_many({"url": "http://test.com/1"})
-    db_handler.collection.insert_one(dummy_job)
-    
-    response = client.get("/jobs/latest?limit=10")
-    assert response.status_code == 200
-    data = response.json()
-    assert "jobs" in data
-    # mongomock should return the inserted job
-    assert len(data["jobs"]) >= 1
-    assert data["jobs"][0]["title"] == "Test Job"
-
-def test_api_performance():
-    """Simple latency check."""
+    assert response.json()["status"] == "running"
+
+
+def test_ingest_derives_features_and_upserts(db):
+    assert _scrape(db, 10) == 10
+    assert _scrape(db, 10, start=5) == 10  # 5 updated, 5 new
+
+    rows = db.table("jobs").select("job_id,company_tier,extracted_skills,salary_min", count="exact").execute()
+    assert rows.count == 15
+    by_id = {r["job_id"]: r for r in rows.data}
+    assert by_id["ext-0"]["company_tier"] > 0  # Google
+    assert by_id["ext-1"]["company_tier"] == 0  # Acme
+    assert "python" in by_id["ext-0"]["extracted_skills"]
+    assert by_id["ext-0"]["salary_min"] == 1_200_000
+
+
+def test_public_listing_offset_and_cursor_pages_agree(client, db):
+    _scrape(db, 45)
+    first = client.get("/api/jobs/public", params={"limit": 20}).json()
+    assert first["total"] == 45 and first["has_more"]
+    assert first["jobs"][0]["job_id"] == "ext-0"  # newest first
+    assert "description" not in first["jobs"][0]
+
+    offset_ids = []
+    for skip in (0, 20, 40):
+        offset_ids += [j["id"] for j in client.get("/api/jobs/public", params={"limit": 20, "skip": skip}).json()["jobs"]]
+
+    cursor_ids, cursor = [], None
+    while True:
+        params = {"limit": 20, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/jobs/public", params=params).json()
+        cursor_ids += [j["id"] for j in page["jobs"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert cursor_ids == offset_ids and len(set(cursor_ids)) == 45
+
+    assert client.get("/api/jobs/public", params={"cursor": "garbage"}).status_code == 400
+
+
+def test_search_and_filters(client, db):
+    _scrape(db, 40)
+    res = client.get("/api/jobs/public", params={"search": "google", "search_type": "company"}).json()
+    assert res["total"] == 10 and all(j["company"] == "Google" for j in res["jobs"])
+
+    res = client.get("/api/jobs/search/filter", params={"query": "spark", "remote_only": True}).json()
+    assert res["total"] == len(res["jobs"]) > 0
+    assert all(j["is_remote"] for j in res["jobs"])
+
+
+def test_indexed_search_ranks_by_relevance(client, db, monkeypatch):
+    monkeypatch.setattr(jobs_sync, "ready", False)  # restored after the test
+    _scrape(db, 40)
+    jobs_sync.refresh(full=True)
+
+    res = client.get("/api/jobs/public", params={"search": "python engineer", "limit": 5}).json()
+    # Backend Engineer + python beats title-only and description-only matches
+    assert res["total"] == 30 and res["jobs"][0]["role"] == "Backend Engineer"
+    ids = [j["id"] for j in res["jobs"]]
+    while res["next_cursor"]:
+        res = client.get("/api/jobs/public", params={"search": "python engineer", "limit": 5, "cursor": res["next_cursor"]}).json()
+        ids += [j["id"] for j in res["jobs"]]
+    assert len(set(ids)) == 30
+
+    res = client.get("/api/jobs/search/filter", params={"query": "spark", "remote_only": True}).json()
+    assert res["total"] == len(res["jobs"]) > 0
+    assert all(j["is_remote"] and j["role"] == "Data Scientist" for j in res["jobs"])
+
+    db.table("jobs").update({"is_active": False, "updated_at": "2099-01-01T00:00:00"}).eq("job_id", "ext-2").execute()
+    jobs_sync.refresh()
+    assert client.get("/api/jobs/public", params={"search": "spark"}).json()["total"] == 9
+
+    # Type-ahead prefixes still match, like the ilike search
+    res = client.get("/api/jobs/public", params={"search": "Goog", "search_type": "company"}).json()
+    assert res["total"] == 10 and {j["company"] for j in res["jobs"]} == {"Google"}
+
+
+def test_public_facets(client, db, monkeypatch):
+    monkeypatch.setattr(jobs_sync, "ready", False)
+    assert client.get("/api/jobs/public/facets").status_code == 503
+    _scrape(db, 40)
+    jobs_sync.refresh(full=True)
+
+    res = client.get("/api/jobs/public/facets", params={"search": "python", "location": "pune"}).json()
+    listing = client.get("/api/jobs/public", params={"search": "python", "location": "pune"}).json()
+    assert res["total"] == listing["total"] > 0
+    locations = {f["value"]: f["count"] for f in res["facets"]["location"]}
+    assert set(locations) == {"Bengaluru", "Pune", "Remote"}  # location counts ignore the location filter
+    assert {f["value"] for f in res["facets"]["salary"]} <= {"10-20L", "Not specified"}
+
+
+def test_autocomplete_offers_scraped_companies(client, db, monkeypatch):
+    monkeypatch.setattr(jobs_sync, "ready", False)
+    _scrape(db, 8)
+    jobs_sync.refresh(full=True)
+
+    res = client.get("/api/constants/autocomplete", params={"q": "goo", "kind": "company"}).json()
+    assert res == [{"value": "Google", "kind": "company", "jobs": 2}]
+    roles = [s["value"] for s in client.get("/api/constants/autocomplete", params={"q": "eng"}).json()]
+    assert roles[:2] == ["Backend Engineer", "DevOps Engineer"]
+    assert client.get("/api/constants/autocomplete", params={"q": "x", "kind": "city"}).status_code == 400
+
+
+def test_reads_are_served_from_the_jobs_snapshot(client, db, monkeypatch):
+    monkeypatch.setattr(jobs_sync, "ready", False)
+    _scrape(db, 45)
+    database = client.get("/api/jobs/public", params={"limit": 10, "location": "pune"}).json()
+    jobs_sync.refresh(full=True)
+
+    first = client.get("/api/jobs/public", params={"limit": 10, "location": "pune"})
+    assert "0 queries" in first.headers["Server-Timing"]
+    assert first.json()["jobs"] == database["jobs"] and first.json()["total"] == database["total"]
+    second = client.get("/api/jobs/public", params={"limit": 10, "location": "pune", "cursor": first.json()["next_cursor"]})
+    assert len(second.json()["jobs"]) == 5 and not second.json()["has_more"]
+
+    detail = client.get("/api/jobs/public/ext-3")
+    assert "0 queries" in detail.headers["Server-Timing"] and detail.json()["job"]["job_id"] == "ext-3"
+
+    # A scraper update reaches readers on the next delta sync
+    _scrape(db, 1, start=100)
+    jobs_sync.refresh()
+    newest = client.get("/api/jobs/public", params={"limit": 1}).json()
+    assert newest["total"] == 46 and client.get("/health").json()["jobs_snapshot"]["jobs"] == 46
+
+
+def test_searches_skip_a_shared_snapshot_until_the_index_is_ready(client, db, monkeypatch, tmp_path):
+    _scrape(db, 40)
+    path = str(tmp_path / "jobs.snap")
+    rows = db.table("jobs").select(jobs_sync.select_columns).execute().data
+    JobsSnapshot.build(rows, version=1).write(path)
+    monkeypatch.setattr(jobs_sync, "ready", False)
+    monkeypatch.setattr(settings, "JOBS_SNAPSHOT_POLL_SECONDS", 0)
+    monkeypatch.setattr(jobs_snapshot, "path", path)
+    monkeypatch.setattr(jobs_snapshot, "current", None)
+    monkeypatch.setattr(jobs_snapshot, "_file_id", None)
+
+    listing = client.get("/api/jobs/public", params={"limit": 5})
+    assert "0 queries" in listing.headers["Server-Timing"] and listing.json()["total"] == 40
+
+    res = client.get("/api/jobs/public", params={"search": "google", "search_type": "company"}).json()
+    assert res["total"] == 10 and {j["company"] for j in res["jobs"]} == {"Google"}
+    res = client.get("/api/jobs/search/filter", params={"query": "spark"}).json()
+    assert res["total"] == 10 and {j["role"] for j in res["jobs"]} == {"Data Scientist"}
+
+
+def test_save_list_and_unsave(client, db):
+    _scrape(db, 5)
+    assert client.post("/api/jobs/save", params={"job_id": "ext-3"}).json()["message"] == "Job saved successfully"
+    assert client.post("/api/jobs/save", params={"job_id": "ext-3"}).json()["message"] == "Job already saved"
+
+    saved = client.get("/api/jobs/saved/list").json()
+    assert saved["total"] == 1
+    assert saved["saved_jobs"][0]["job"]["job_id"] == "ext-3"
+
+    client.delete("/api/jobs/save/ext-3")
+    assert client.get("/api/jobs/saved/list").json()["total"] == 0
+
+
+def test_save_and_unsave_take_one_round_trip_once_resolved(client, db):
+    _scrape(db, 3)
+    first = client.post("/api/jobs/save", params={"job_id": "ext-1"})
+    assert "2 queries" in first.headers["Server-Timing"]  # resolve + upsert
+    again = client.post("/api/jobs/save", params={"job_id": "ext-1"})
+    assert again.json()["message"] == "Job already saved"
+    assert "1 query," in again.headers["Server-Timing"]
+
+    removed = client.delete("/api/jobs/save/ext-1")
+    assert "1 query," in removed.headers["Server-Timing"]
+    assert client.delete("/api/jobs/save/ext-1").status_code == 200  # idempotent
+    assert client.post("/api/jobs/save", params={"job_id": "missing"}).status_code == 404
+
+
+def test_listed_jobs_resolve_without_a_lookup(client, db):
+    _scrape(db, 5)
+    client.get("/api/jobs/public", params={"limit": 5})
+
+    detail = client.get("/api/jobs/public/ext-2")
+    assert detail.json()["job"]["job_id"] == "ext-2"
+    assert "1 query," in detail.headers["Server-Timing"]  # by primary key
+    saved = client.post("/api/jobs/save", params={"job_id": "ext-4"})
+    assert "1 query," in saved.headers["Server-Timing"]
+    assert client.get("/api/jobs/public/not-a-uuid").status_code == 404
+
+
+def test_save_of_a_deleted_job_is_404(client, db):
+    _scrape(db, 2)
+    client.post("/api/jobs/save", params={"job_id": "ext-0"})
+    client.delete("/api/jobs/save/ext-0")
+    db.table("jobs").delete().eq("job_id", "ext-0").execute()
+    assert client.post("/api/jobs/save", params={"job_id": "ext-0"}).status_code == 404
+    assert job_id_cache.get("ext-0") is None
+
+
+def test_saved_list_is_one_round_trip_with_a_maintained_total(client, db):
+    _scrape(db, 30)
+    for i in range(25):
+        client.post("/api/jobs/save", params={"job_id": f"ext-{i}"})
+
+    first = client.get("/api/jobs/saved/list", params={"limit": 10})
+    assert first.json()["total"] == 25 and len(first.json()["saved_jobs"]) == 10
+    assert "1 query," in first.headers["Server-Timing"]
+
+    client.delete("/api/jobs/save/ext-0")
+    client.post("/api/jobs/save", params={"job_id": "ext-29"})
+    client.post("/api/jobs/save", params={"job_id": "ext-29"})  # already saved: no change
+    page = client.get("/api/jobs/saved/list", params={"limit": 10, "cursor": first.json()["next_cursor"]})
+    assert page.json()["total"] == 25
+    assert db.table("saved_jobs").select("id", count="exact").execute().count == 25
+
+
+def test_personalized_feed_ranks_skill_matches_first(client, db):
+    _scrape(db, 40)
+    db.table("profiles").insert({
+        "user_id": USER_ID,
+        "experience_years": 3,
+        "preferred_role": "Data Scientist",
+        "preferred_location": "Pune",
+        "skills": ["python", "spark", "sql"],
+    }).execute()
+
+    first = client.get("/api/jobs/personalized", params={"limit": 10}).json()
+    assert first["jobs"][0]["role"] == "Data Scientist"
+    scores = [j["match_score"] for j in first["jobs"]]
+    assert scores == sorted(scores, reverse=True)
+
+    second = client.get("/api/jobs/personalized", params={"limit": 10, "cursor": first["next_cursor"]}).json()
+    assert not {j["id"] for j in first["jobs"]} & {j["id"] for j in second["jobs"]}
+
+
+def test_personalized_cursor_from_an_older_ranking_restarts(client, db, monkeypatch):
+    _scrape(db, 40)
+    db.table("profiles").insert({"user_id": USER_ID, "skills": ["python", "spark"]}).execute()
+    first = client.get("/api/jobs/personalized", params={"limit": 10}).json()
+    assert first["cursor_reset"] is False
+
+    monkeypatch.setattr(jobs_sync, "version", jobs_sync.version + 1)  # a sync re-ranks the feed
+    again = client.get("/api/jobs/personalized", params={"limit": 10, "cursor": first["next_cursor"]}).json()
+    assert again["cursor_reset"] is True
+    assert [j["id"] for j in again["jobs"]] == [j["id"] for j in first["jobs"]]
+
+    following = client.get("/api/jobs/personalized", params={"limit": 10, "cursor": again["next_cursor"]}).json()
+    assert following["cursor_reset"] is False
+    assert not {j["id"] for j in again["jobs"]} & {j["id"] for j in following["jobs"]}
+
+
+def test_cold_personalized_feed_stays_within_its_query_budget(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ENFORCE", True)
+    monkeypatch.setattr(jobs_sync, "ready", False)
+    _scrape(db, settings.SKILL_INDEX_MAX_CANDIDATES)
+    jobs_sync.refresh(full=True)
+    monkeypatch.setattr(jobs_snapshot, "current", None)  # candidates come from the database in id chunks
+    db.table("profiles").insert({"user_id": USER_ID, "skills": ["python", "aws", "react", "docker"]}).execute()
+
+    response = client.get("/api/jobs/personalized", params={"limit": 20})
+    assert response.status_code == 200 and response.json()["total"] == settings.SKILL_INDEX_MAX_CANDIDATES
+    assert '11 queries' in response.headers["Server-Timing"]
+
+
+def test_profile_update_refreshes_cached_profile(client, db):
+    db.table("profiles").insert({
+        "user_id": USER_ID,
+        "preferred_role": "Data Scientist",
+        "parsed_data": {"skills": {"all_skills": ["Python", "SQL", "Teamwork"], "technical": ["Python", "SQL"]}},
+    }).execute()
+    status = client.get("/api/auth/profile/status").json()
+    assert status["skills"] == ["Python", "SQL", "Teamwork"]  # the parsed display list, not the matching inputs
+    assert status["preferred_role"] == "Data Scientist"
+
+    client.patch("/api/auth/profile/update", data={"preferred_role": "ML Engineer"})
+    assert client.get("/api/auth/profile/status").json()["preferred_role"] == "ML Engineer"
+
+
+def test_api_performance(client, db):
+    """Simple latency check on a realistic table size"""
+    _scrape(db, 500)
+    client.get("/api/jobs/public", params={"limit": 50})
     start = time.time()
-    response = client.get("/jobs/latest?limit=50")
+    response = client.get("/api/jobs/public", params={"limit": 50, "skip": 400})
     duration = time.time() - start
+    assert response.status_code == 200
     assert duration < 0.5, f"API too slow: {duration}s"
@@ -0,0 +1,86 @@
+import pytest
+
+import app.supabase_db as supabase_db
+from app.config import settings
+from app.profile_cache import ProfileCache, flatten_skills, split_locations
+
+USER_ID = "00000000-0000-0000-0000-0000000000bb"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "SQLITE_PATH", ":memory:")
+    monkeypatch.setattr(supabase_db, "supabase", None)
+    client = supabase_db.get_supabase_client()
+    client.table("profiles").insert({
+        "user_id": USER_ID,
+        "experience_years": 4,
+        "preferred_role": "Data Engineer",
+        "preferred_location": "Pune, Remote",
+        "skills": ["Python", " SQL ", "python"],
+    }).execute()
+    return client
+
+
+def test_flatten_skills_fallbacks():
+    assert flatten_skills({"skills": ["Python", "python ", "", "Go"]}) == ("python", "go")
+    assert flatten_skills({"skills": {"technical": ["AWS"], "tools_frameworks": ["Django"]}}) == ("aws", "django")
+    assert flatten_skills({"skills": {"all_skills_normalized": ["rust"], "technical": ["AWS"]}}) == ("rust",)
+    # Raw all_skills is not a matching input; the categories are
+    parsed = {"skills": [], "parsed_data": {"skills": {"all_skills": ["React"], "technical": ["css"]}}}
+    assert flatten_skills(parsed) == ("css",)
+    assert flatten_skills({"parsed_data": {"skills": {"programming_languages": ["Java"]}}}) == ("java",)
+    assert flatten_skills({"parsed_data": None}) == ()
+
+
+def test_split_locations():
+    assert split_locations("Pune, Remote ,") == ("pune", "remote")
+    assert split_locations(None) == ()
+
+
+def test_load_normalizes_once_and_serves_from_cache(db):
+    cache = ProfileCache(ttl_seconds=60, max_entries=10)
+    view = cache.load(USER_ID)
+    assert view.skills == {"python", "sql"}
+    assert view.experience_years == 4
+    assert view.preferred_locations == ("pune", "remote")
+
+    db.table("profiles").update({"preferred_role": "ML Engineer"}).eq("user_id", USER_ID).execute()
+    assert cache.load(USER_ID) is view  # cached until invalidated
+
+    cache.invalidate(USER_ID)
+    fresh = cache.load(USER_ID)
+    assert fresh.preferred_role == "ML Engineer"
+    assert fresh.version > view.version
+
+
+def test_missing_profiles_and_expired_entries_are_not_served(db):
+    cache = ProfileCache(ttl_seconds=0, max_entries=10)
+    assert cache.load("00000000-0000-0000-0000-0000000000cc") is None
+    first = cache.load(USER_ID)
+    assert cache.load(USER_ID) is not first
+
+
+def test_load_racing_an_invalidation_is_not_cached(db, monkeypatch):
+    cache = ProfileCache(ttl_seconds=60, max_entries=10)
+    real_execute = type(db.table("profiles").select("*")).execute
+
+    def execute_then_write(query):
+        res = real_execute(query)
+        cache.invalidate(USER_ID)  # profile written while the read was in flight
+        return res
+
+    monkeypatch.setattr(type(db.table("profiles").select("*")), "execute", execute_then_write)
+    assert cache.load(USER_ID) is not None
+    assert len(cache) == 0
+
+
+def test_versions_are_bounded_with_the_entries(db):
+    cache = ProfileCache(ttl_seconds=60, max_entries=2)
+    for i in range(50):
+        cache.invalidate(f"user-{i}")
+    cache.load(USER_ID)
+    assert len(cache._versions) == 2 and len(cache) == 1
+    cache.invalidate(USER_ID)
+    assert cache.load(USER_ID).version == 51
@@ -0,0 +1,25 @@
+import re
+from pathlib import Path
+
+from app.projections import CARD_COLUMNS, PROJECTIONS, projection
+
+SCHEMA = (Path(__file__).resolve().parents[1] / "create_tables.py").read_text()
+
+
+def _jobs_table_columns():
+    block = re.search(r"create table if not exists public\.jobs \((.*?)\n\);", SCHEMA, re.S).group(1)
+    return {line.split()[0] for line in block.splitlines() if line.strip() and not line.strip().startswith("--")}
+
+
+def test_projections_only_name_existing_job_columns():
+    columns = _jobs_table_columns()
+    for name, projected in PROJECTIONS.items():
+        assert set(projected) <= columns, name
+        assert len(set(projected)) == len(projected), name
+
+
+def test_list_projections_leave_out_the_description():
+    assert "description" not in CARD_COLUMNS
+    assert "description" in PROJECTIONS["detail"]
+    assert "description" in PROJECTIONS["scoring"]
+    assert projection("card").startswith("id,job_id,")
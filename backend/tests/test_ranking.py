@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from app.ranking import top_k
+
+
+def test_top_k_orders_by_score_then_recency():
+    items = [
+        ("a", 50, "2024-03-01T10:00:00+00:00"),
+        ("b", 80, "2024-01-01T10:00:00+00:00"),
+        ("c", 50, "2024-03-05T10:00:00+00:00"),
+        ("d", 50, None),
+        ("e", 10, "2024-03-09T10:00:00+00:00"),
+    ]
+    ranked = top_k(items, 4, score=lambda x: x[1], posted_at=lambda x: x[2])
+    assert [x[0] for x in ranked] == ["b", "c", "a", "d"]
+
+
+def test_top_k_matches_full_sort_and_handles_datetimes():
+    items = [(i % 7, datetime(2024, 1, 1 + i % 5)) for i in range(50)]
+    expected = sorted(items, key=lambda x: (x[0], x[1]), reverse=True)[:12]
+    assert top_k(items, 12, score=lambda x: x[0], posted_at=lambda x: x[1]) == expected
+    assert top_k(items, 0, score=lambda x: x[0], posted_at=lambda x: x[1]) == []
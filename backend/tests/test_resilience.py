@@ -0,0 +1,167 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from postgrest import APIError
+
+import app.routes_jobs_public as routes_jobs_public
+import app.supabase_db as supabase_db
+from app.api.main import app
+from app.config import settings
+from app.count_cache import count_cache
+from app.database import DatabaseTimeout
+from app.jobs_sync import jobs_sync
+from app.resilience import (
+    CircuitBreaker,
+    CircuitOpen,
+    db_breaker,
+    guarded,
+    is_backend_failure,
+    listing_snapshots,
+    schedule_refresh,
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "SQLITE_PATH", ":memory:")
+    monkeypatch.setattr(settings, "LISTING_REFRESH_ATTEMPTS", 0)
+    monkeypatch.setattr(supabase_db, "supabase", None)
+    supabase_db.get_supabase_client().table("jobs").insert([
+        {"job_id": f"j{i}", "company": "Acme", "role": "Engineer", "location": "Pune"} for i in range(3)
+    ]).execute()
+    count_cache.clear()
+    listing_snapshots.clear()
+    db_breaker.reset()
+    yield TestClient(app)
+    count_cache.clear()
+    listing_snapshots.clear()
+    db_breaker.reset()
+
+
+def _database_down(monkeypatch):
+    calls = []
+
+    async def timeout(query, timeout=None):
+        calls.append(query)
+        raise DatabaseTimeout("Database call timed out after 10s")
+
+    monkeypatch.setattr(routes_jobs_public, "execute", timeout)
+    return calls
+
+
+def test_breaker_opens_half_opens_and_closes(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    assert 0 < breaker.retry_after() <= 60
+
+    breaker.opened_at -= 60
+    assert breaker.allow()  # the probe
+    assert not breaker.allow()  # everyone else waits for it
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.opened_at -= 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.trips == 1
+
+
+def test_only_backend_errors_count_as_failures():
+    assert is_backend_failure(DatabaseTimeout())
+    assert is_backend_failure(httpx.ConnectError("refused"))
+    assert is_backend_failure(APIError({"code": "57014", "message": "canceling statement due to statement timeout"}))
+    assert not is_backend_failure(APIError({"code": "42703", "message": "column does not exist"}))
+    assert not is_backend_failure(ValueError("bad cursor"))
+
+
+def test_failing_listing_serves_last_known_good_snapshot(client, monkeypatch):
+    fresh = client.get("/api/jobs/public", params={"location": "pune"})
+    assert fresh.status_code == 200 and "Warning" not in fresh.headers
+
+    _database_down(monkeypatch)
+    stale = client.get("/api/jobs/public", params={"location": "pune"})
+    assert stale.status_code == 200
+    assert stale.json() == fresh.json()
+    assert stale.headers["Warning"] == '110 - "Response is Stale"'
+    assert int(stale.headers["Age"]) >= 0
+
+    # Nothing cached for these filters: no made-up listings
+    missing = client.get("/api/jobs/public", params={"location": "delhi"})
+    assert missing.status_code == 503 and "Retry-After" in missing.headers
+
+
+def test_open_breaker_stops_calling_the_database(client, monkeypatch):
+    client.get("/api/jobs/public")
+    calls = _database_down(monkeypatch)
+    for _ in range(settings.DB_BREAKER_FAILURE_THRESHOLD):
+        client.get("/api/jobs/public")
+    assert db_breaker.state == "open"
+
+    attempted = len(calls)
+    response = client.get("/api/jobs/public")
+    assert response.status_code == 200 and "Warning" in response.headers
+    assert len(calls) == attempted
+    assert client.get("/health").json()["db_breaker"]["state"] == "open"
+
+
+def test_listings_served_from_memory_bypass_the_breaker(client, monkeypatch):
+    monkeypatch.setattr(jobs_sync, "ready", False)  # restored after the test
+    jobs_sync.refresh(full=True)
+    calls = _database_down(monkeypatch)
+
+    for _ in range(settings.DB_BREAKER_FAILURE_THRESHOLD - 1):
+        db_breaker.record_failure()
+    for params in ({}, {"location": "pune"}, {"search": "engineer"}):
+        response = client.get("/api/jobs/public", params=params)
+        assert response.status_code == 200 and response.json()["total"] == 3
+    # Memory hits neither reset the failure count nor count as probes
+    assert db_breaker.stats()["consecutive_failures"] == settings.DB_BREAKER_FAILURE_THRESHOLD - 1
+
+    db_breaker.record_failure()
+    assert db_breaker.state == "open"
+    response = client.get("/api/jobs/public", params={"location": "delhi"})
+    assert response.status_code == 200 and "Warning" not in response.headers
+    assert db_breaker.state == "open" and not calls
+
+
+def test_background_refresh_replaces_the_snapshot(monkeypatch):
+    monkeypatch.setattr(settings, "LISTING_REFRESH_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "LISTING_REFRESH_BACKOFF_SECONDS", 0)
+    db_breaker.reset()
+    attempts = []
+
+    async def load():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise DatabaseTimeout()
+        return {"jobs": ["fresh"]}
+
+    async def main():
+        schedule_refresh(("k",), load)
+        schedule_refresh(("k",), load)  # one refresh per key
+        await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+    assert len(attempts) == 2
+    assert listing_snapshots.get(("k",))[0] == {"jobs": ["fresh"]}
+    listing_snapshots.clear()
+    db_breaker.reset()
+
+
+def test_guarded_raises_circuit_open_without_calling():
+    db_breaker.reset()
+    for _ in range(settings.DB_BREAKER_FAILURE_THRESHOLD):
+        db_breaker.record_failure()
+
+    async def load():
+        raise AssertionError("should not be called")
+
+    with pytest.raises(CircuitOpen):
+        asyncio.run(guarded(load))
+    db_breaker.reset()
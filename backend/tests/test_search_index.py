@@ -0,0 +1,108 @@
+import time
+
+from app.search_index import SearchIndex, ilike_filter, index_tokens, listing_filter, tokenize
+
+
+def _job(job_id, role="", company="", description="", **extra):
+    return {"id": job_id, "role": role, "company": company, "description": description, **extra}
+
+
+def test_tokenize_keeps_tech_terms_and_folds_plurals():
+    assert tokenize("Senior C++ / C# Engineers, Node.js and the APIs.") == [
+        "senior", "c++", "c#", "engineer", "node.js", "api",
+    ]
+    assert tokenize(None) == []
+
+
+def test_dotted_tokens_are_indexed_by_part():
+    assert index_tokens("Node.js and ASP.NET") == ["node.js", "node", "js", "asp.net", "asp", "net"]
+    assert tokenize("Node.js") == ["node.js"]
+
+
+def test_partial_words_match_like_the_ilike_search():
+    index = SearchIndex()
+    index.reset([
+        _job("g", role="Backend Engineer", company="Google"),
+        _job("n", role="Developer", company="Acme", description="Node.js services"),
+        _job("m", role="Manager", company="Goodyear"),
+    ])
+    assert index.matches("Goog", ["company"]) == {"g"}
+    assert index.matches("node", ["description"]) == {"n"}
+    assert index.matches("eng", ["role"]) == {"g"}
+    assert index.matches("google dev") == {"g", "n"}  # only the last term is a prefix
+    assert index.matches("goo manager") == {"m"}
+    assert index.matches("e", ["role"]) == set()  # too short to expand
+
+    index.upsert([_job("z", company="Zomato")])
+    assert index.matches("zom", ["company"]) == {"z"}
+    index.remove(["z"])
+    assert index.matches("zom", ["company"]) == set() and "zomato" not in index._sorted_terms
+
+
+def test_field_weights_rank_role_above_description():
+    index = SearchIndex()
+    index.reset([
+        _job("desc", role="Engineer", company="Acme", description="we use python daily"),
+        _job("role", role="Python Developer", company="Acme", description="backend work"),
+        _job("none", role="Designer", company="Acme", description="figma"),
+    ])
+    ranked, total = index.search("python")
+    assert [job_id for job_id, _ in ranked] == ["role", "desc"] and total == 2
+
+
+def test_more_matching_terms_rank_higher_and_ties_go_to_newest():
+    index = SearchIndex()
+    index.reset([
+        _job("a", role="Engineer", description="python", posted_at="2024-06-01"),
+        _job("b", role="Engineer", description="python", posted_at="2024-06-03"),
+        _job("c", role="Engineer", description="python django"),
+    ])
+    ranked, _ = index.search("python django")
+    assert [job_id for job_id, _ in ranked] == ["c", "b", "a"]
+    ranked, total = index.search("python django", limit=1)
+    assert [job_id for job_id, _ in ranked] == ["c"] and total == 3
+
+
+def test_fields_and_filters_restrict_matches():
+    index = SearchIndex()
+    index.reset([
+        _job("g", company="Google", location="Pune", is_remote=True, min_years_experience=2),
+        _job("d", role="Engineer", description="ex-google team", location="Delhi", min_years_experience=8),
+    ])
+    assert index.matches("google", ["company"]) == {"g"}
+    where = listing_filter(location="pun", remote_only=True, experience=1)
+    assert [j for j, _ in index.search("google", where=where)[0]] == ["g"]
+    assert index.search("google", where=listing_filter(experience=5))[1] == 1
+    assert listing_filter() is None
+
+
+def test_upsert_and_deactivation_update_postings():
+    index = SearchIndex()
+    index.reset([_job("a", role="Python Developer"), _job("b", role="Go Developer", is_active=False)])
+    assert len(index) == 1
+    index.upsert([_job("a", role="Rust Developer")])
+    assert index.matches("python") == set() and index.matches("rust") == {"a"}
+    index.upsert([_job("a", role="Rust Developer", is_active=False)])
+    assert len(index) == 0 and index.matches("developer") == set()
+    index.upsert([_job("b", role="Go Developer")])
+    index.remove(["b"])
+    assert len(index) == 0
+
+
+def test_multi_keyword_search_is_fast():
+    index = SearchIndex()
+    words = ["python", "java", "react", "aws", "sql", "docker", "kubernetes", "spark", "go", "css"]
+    index.reset([
+        _job(str(i), role=f"{words[i % 10]} Engineer", company=f"Company {i % 50}",
+             description=" ".join(words[(i + k) % 10] for k in range(60)))
+        for i in range(10000)
+    ])
+    start = time.perf_counter()
+    ranked, total = index.search("python kubernetes", limit=20)
+    assert time.perf_counter() - start < 0.5
+    assert total == 10000 and int(ranked[0][0]) % 10 in (0, 6)  # title matches first
+
+
+def test_ilike_fallback_filter():
+    assert ilike_filter("google x", "company") == "company.ilike.%google%"
+    assert ilike_filter("spark", None) == "role.ilike.%spark%,company.ilike.%spark%,description.ilike.%spark%"
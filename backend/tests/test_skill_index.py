@@ -0,0 +1,57 @@
+from app.config import settings
+from app.skill_index import SkillIndex
+
+
+def test_candidates_ranked_by_skill_hits():
+    index = SkillIndex(["python", "go", "react"])
+    index.reset([
+        {"id": 1, "skills_required": ["Python"], "description": "Backend in Go"},
+        {"id": 2, "skills_required": [], "description": "React frontend"},
+        {"id": 3, "skills_required": ["Kafka"], "description": "python pipelines"},
+    ])
+    assert index.candidates({"python", "go"}, limit=10) == ["1", "3"]
+    assert index.candidates({"kafka"}, limit=10) == ["3"]
+    assert index.candidates({"rust"}, limit=10) == []
+
+
+def test_upsert_and_remove_update_postings():
+    index = SkillIndex(["python", "react"])
+    index.reset([{"id": "a", "skills_required": None, "description": "python"}])
+    index.upsert([{"id": "a", "skills_required": None, "description": "react only"}])
+    assert index.candidates({"python"}, limit=10) == []
+    assert index.candidates({"react"}, limit=10) == ["a"]
+    index.remove(["a"])
+    assert len(index) == 0
+    assert index.candidates({"react"}, limit=10) == []
+
+
+def test_equal_hits_rank_newest_first():
+    index = SkillIndex(["python"])
+    index.reset([
+        {"id": f"j{i}", "skills_required": ["Python"], "description": "", "posted_at": f"2024-06-{i + 1:02d}"}
+        for i in range(9)
+    ] + [{"id": "old", "skills_required": ["Python", "Go"], "description": "", "posted_at": "2023-01-01"}])
+    assert index.candidates({"python", "go"}, limit=3) == ["old", "j8", "j7"]
+
+
+def test_observed_skills_are_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "SKILL_INDEX_MAX_OBSERVED_SKILLS", 2)
+    index = SkillIndex(["python"])
+    index.observe(["Python", "Zig"])
+    index.observe(["Elixir", "Nim"])
+    index.reset([{"id": "a", "skills_required": [], "description": "zig, elixir and nim"}])
+    assert index.candidates({"zig"}, limit=10) == []
+    assert index.candidates({"elixir"}, limit=10) == ["a"] and index.candidates({"nim"}, limit=10) == ["a"]
+
+
+def test_corpus_skills_are_matched_in_descriptions_only_once_profiles_ask():
+    index = SkillIndex(["python"])
+    rows = [
+        {"id": "a", "skills_required": ["ClickHouse"], "description": ""},
+        {"id": "b", "skills_required": [], "description": "clickhouse analytics", "extracted_skills": []},
+    ]
+    index.reset(rows)
+    assert index.candidates({"clickhouse"}, limit=10) == ["a"]
+    index.observe(["ClickHouse"])
+    index.reset(rows)
+    assert sorted(index.candidates({"clickhouse"}, limit=10)) == ["a", "b"]
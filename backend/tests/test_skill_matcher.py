@@ -0,0 +1,48 @@
+import random
+import re
+
+from app.skill_matcher import SkillMatcher, get_skill_matcher
+
+SKILLS = {"python", "java", "javascript", "c", "c#", "r", "go", "ml", "node.js", "js", "c++", ".n"}
+
+
+def _reference(description, skills):
+    desc_lower = description.lower()
+    matched = set()
+    for skill in skills:
+        if len(skill) <= 2:
+            if re.search(r'\b' + re.escape(skill) + r'\b', desc_lower):
+                matched.add(skill)
+        elif skill in desc_lower:
+            matched.add(skill)
+    return matched
+
+
+def test_matches_reference_on_random_text():
+    rng = random.Random(3)
+    tokens = list(SKILLS) + ["requirements", "golang", "C#.NET", "x", " ", ",", "(", "_", "Go!", "R&D", "ML-ops"]
+    matcher = SkillMatcher(SKILLS)
+    for _ in range(500):
+        text = "".join(rng.choice(tokens) + rng.choice(["", " ", ".", "/"]) for _ in range(30))
+        assert set(matcher.match(text)) == _reference(text, SKILLS)
+
+
+def test_short_skills_require_word_boundaries():
+    matcher = SkillMatcher({"r", "go", "c"})
+    assert matcher.match("Strong requirements in Golang") == []
+    assert sorted(matcher.match("Go, R and C.")) == ["c", "go", "r"]
+
+
+def test_matcher_is_cached_per_skill_set():
+    assert get_skill_matcher({"python", "go"}) is get_skill_matcher(frozenset({"go", "python"}))
+    assert len(get_skill_matcher({"python", ""})) == 1
+
+
+def test_overlapping_short_skills_are_all_found():
+    skills = {"c", "c#", "#c", "go", "og", "o", ".n", "n."}
+    rng = random.Random(5)
+    tokens = ["c", "#", "go", "o", ".", "n", " ", "x"]
+    matcher = SkillMatcher(skills)
+    for _ in range(500):
+        text = "".join(rng.choice(tokens) for _ in range(20))
+        assert set(matcher.match(text)) == _reference(text, skills)
@@ -0,0 +1,130 @@
+import pytest
+from postgrest import APIError
+
+from app.database.sqlite_backend import SQLiteClient
+from app.pagination import apply_keyset, keyset_order, keyset_page
+
+
+@pytest.fixture
+def client():
+    return SQLiteClient(":memory:")
+
+
+def _job(i, **extra):
+    row = {
+        "job_id": f"ext-{i}",
+        "company": ["Google", "Acme", "Meta"][i % 3],
+        "role": ["Backend Engineer", "Frontend Dev", "Data Scientist"][i % 3],
+        "location": ["Bengaluru", "Pune", "Remote"][i % 3],
+        "description": "python aws" if i % 2 else "react",
+        "is_remote": i % 4 == 0,
+        "skills_required": ["python"] if i % 2 else [],
+        "posted_at": f"2024-01-{1 + i % 5:02d}T00:00:00+00:00",
+    }
+    row.update(extra)
+    return row
+
+
+def test_upsert_on_conflict_updates_and_returns_rows(client):
+    jobs = client.table("jobs")
+    first = jobs.upsert([_job(i) for i in range(3)], on_conflict="job_id").execute().data
+    assert len(first) == 3 and all(r["id"] and r["updated_at"] for r in first)
+    assert first[0]["skills_required"] == [] and first[1]["skills_required"] == ["python"]
+    assert first[0]["is_remote"] is True
+
+    again = jobs.upsert([_job(0, role="Staff Engineer")], on_conflict="job_id").execute().data
+    assert again[0]["id"] == first[0]["id"]
+    assert again[0]["role"] == "Staff Engineer"
+    assert again[0]["updated_at"] >= first[0]["updated_at"]
+    assert jobs.select("id", count="exact", head=True).execute().count == 3
+
+
+def test_insert_unique_violation_and_unknown_column_raise_api_error(client):
+    users = client.table("local_users")
+    users.insert({"email": "a@x.io", "password_hash": "h"}).execute()
+    with pytest.raises(APIError) as err:
+        users.insert({"email": "a@x.io", "password_hash": "h"}).execute()
+    assert err.value.code == "23505"
+    with pytest.raises(APIError) as err:
+        users.insert({"email": "b@x.io", "nope": 1}).execute()
+    assert err.value.code == "PGRST204"
+
+
+def test_filters_or_trees_and_counts(client):
+    client.table("jobs").insert([_job(i) for i in range(12)]).execute()
+    jobs = client.table("jobs")
+
+    res = jobs.select("id,company", count="exact").ilike("location", "%bengal%").execute()
+    assert res.count == 4 and {r["company"] for r in res.data} == {"Google"}
+
+    res = jobs.select("id").eq("is_remote", True).execute()
+    assert len(res.data) == 3
+
+    res = jobs.select("id,role").or_("role.ilike.%data%,and(company.eq.Google,is_remote.is.true)").execute()
+    assert len(res.data) == 4 + 1  # i % 3 == 2, plus i == 0
+
+    res = jobs.select("id").in_("job_id", ["ext-1", "ext-2", "missing"]).execute()
+    assert len(res.data) == 2
+
+    with pytest.raises(APIError):
+        jobs.select("salary").execute()
+
+
+def test_keyset_pages_match_offset_pages(client):
+    rows = [_job(i) for i in range(23)]
+    rows[5]["posted_at"] = None
+    rows[9]["posted_at"] = None
+    client.table("jobs").insert(rows).execute()
+
+    def page(cursor=None, skip=0):
+        query = client.table("jobs").select("id,posted_at")
+        if cursor:
+            query = keyset_order(apply_keyset(query, "posted_at", cursor), "posted_at").limit(6)
+        else:
+            query = keyset_order(query, "posted_at").range(skip, skip + 5)
+        return keyset_page(query.execute().data, 5, "posted_at")
+
+    offset_ids = []
+    for skip in range(0, 25, 5):
+        offset_ids += [r["id"] for r in page(skip=skip)[0]]
+
+    keyset_ids, cursor = [], None
+    while True:
+        data, cursor = page(cursor)
+        keyset_ids += [r["id"] for r in data]
+        if not cursor:
+            break
+    assert keyset_ids == offset_ids and len(set(keyset_ids)) == 23
+
+
+def test_embedded_select_update_and_delete(client):
+    job = client.table("jobs").insert(_job(1)).execute().data[0]
+    saved = client.table("saved_jobs")
+    saved.insert({"user_id": "u1", "job_id": job["id"], "notes": "later"}).execute()
+
+    rows = saved.select("*, jobs(id,role)").eq("user_id", "u1").execute().data
+    assert rows[0]["jobs"] == {"id": job["id"], "role": job["role"]}
+    assert rows[0]["notes"] == "later"
+
+    updated = client.table("jobs").update({"role": "Principal"}).eq("id", job["id"]).execute().data
+    assert updated[0]["role"] == "Principal" and updated[0]["updated_at"] >= job["updated_at"]
+
+    deleted = saved.delete().eq("user_id", "u1").eq("job_id", job["id"]).execute().data
+    assert len(deleted) == 1
+    assert saved.select("id", count="exact").execute().count == 0
+
+
+def test_inner_embeds_filter_rows_and_counts(client):
+    user = client.table("local_users").insert({"email": "a@example.com"}).execute().data[0]
+    profiles = client.table("profiles")
+    profiles.insert([{"user_id": user["id"]}, {"user_id": "00000000-0000-0000-0000-000000000000"}]).execute()
+
+    assert len(profiles.select("id, local_users(email)").execute().data) == 2
+    res = profiles.select("id, local_users!inner(email)", count="exact").execute()
+    assert res.count == 1 and res.data[0]["local_users"] == {"email": "a@example.com"}
+
+
+def test_saved_jobs_reference_existing_jobs(client):
+    with pytest.raises(APIError) as e:
+        client.table("saved_jobs").insert({"user_id": "u1", "job_id": "missing"}).execute()
+    assert e.value.code == "23503"
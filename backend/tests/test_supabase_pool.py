@@ -0,0 +1,107 @@
+import contextvars
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.instrumentation import TracedQuery, start_request
+from app.supabase_db import MeteredTransport
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(float(self.path.strip("/") or 0))
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients that time out close their socket mid-response
+
+
+@pytest.fixture
+def server_url():
+    server = _QuietServer(("127.0.0.1", 0), _SlowHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _client(max_connections, pool_timeout=1.0, read_timeout=5.0):
+    transport = MeteredTransport(
+        max_connections=max_connections,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+    timeout = httpx.Timeout(connect=1.0, read=read_timeout, write=1.0, pool=pool_timeout)
+    return httpx.Client(transport=transport, timeout=timeout), transport
+
+
+def test_keep_alive_reuses_one_connection(server_url):
+    client, transport = _client(max_connections=4)
+    for _ in range(5):
+        client.get(f"{server_url}/0")
+    stats = transport.stats()
+    assert stats["requests"] == 5
+    assert stats["open_connections"] == 1
+    assert stats["idle_connections"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_saturated_pool_times_out_and_is_counted(server_url):
+    client, transport = _client(max_connections=1, pool_timeout=0.05)
+    errors = []
+
+    def slow():
+        client.get(f"{server_url}/0.3")
+
+    holder = threading.Thread(target=slow)
+    holder.start()
+    time.sleep(0.05)
+    try:
+        client.get(f"{server_url}/0")
+    except httpx.PoolTimeout as e:
+        errors.append(e)
+    holder.join()
+
+    assert errors
+    stats = transport.stats()
+    assert stats["pool_timeouts"] == 1
+    assert stats["peak_in_flight"] == 2
+
+
+def test_hung_backend_is_a_bounded_read_timeout(server_url):
+    client, transport = _client(max_connections=1, read_timeout=0.05)
+    with pytest.raises(httpx.ReadTimeout):
+        client.get(f"{server_url}/0.5")
+    assert transport.stats()["read_timeouts"] == 1
+
+
+def test_response_bytes_are_reported_to_the_traced_query(server_url):
+    client, _ = _client(max_connections=1)
+
+    class _Request:
+        def execute(self):
+            client.get(f"{server_url}/0")
+            return type("Response", (), {"data": []})()
+
+    def traced():
+        stats = start_request()
+        TracedQuery(_Request(), "jobs").execute()
+        return stats
+
+    stats = contextvars.copy_context().run(traced)
+    assert stats.queries[0].payload_bytes == len(b"[]")